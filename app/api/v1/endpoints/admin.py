@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import IMPORT_CHUNK_SIZE
+from app.db.database import get_session
+from app.models.user import User
+from app.schemas.bulk import ImportResult
+from app.services.import_service import ImportService
+from app.utils.streaming import iter_lines
+from app.utils.user import get_admin_user
+
+router = APIRouter()
+
+
+@router.post("/bulk", response_model=ImportResult)
+async def bulk_import(
+    request: Request,
+    job: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    recompute: bool = True,
+    session: AsyncSession = Depends(get_session),
+    admin: User = Depends(get_admin_user),
+):
+    """
+    Imports a JSONL body of users, categories, threads and posts. Sending
+    the same body again with the same `job` resumes after the last
+    committed chunk.
+    """
+    return await ImportService(session).run(
+        job, iter_lines(request.stream()),
+        chunk_size=chunk_size, recompute=recompute)
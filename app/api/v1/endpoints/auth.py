@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.schemas.user import UserCreate, UserLogin
 from app.db.database import get_session
 from app.services.auth_service import AuthService
@@ -11,20 +11,21 @@ router = APIRouter()
 
 
 @router.post("/register")
-def register(
+async def register(
     user: UserCreate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    return AuthService(session).register_user(user.email, user.username, user.password)
+    return await AuthService(session).register_user(
+        user.email, user.username, user.password)
 
 
 @router.post("/login")
-def login(
+async def login(
     form_data: UserLogin,
     request: Request,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    user = AuthService(session).authenticate_user(
+    user = await AuthService(session).authenticate_user(
         form_data.email, form_data.password)
     if not user:
         raise HTTPException(
@@ -32,14 +33,14 @@ def login(
             detail="Incorrect username or password"
         )
 
-    return AuthService(session).login_user(user, request)
+    return await AuthService(session).login_user(user, request)
 
 
 @router.post("/logout")
 async def logout(
     payload: LogoutRequest,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     refresh_token = payload.refresh_token
 
@@ -49,12 +50,12 @@ async def logout(
             detail="Refresh token is required"
         )
 
-    return AuthService(session).logout_user(refresh_token, current_user)
+    return await AuthService(session).logout_user(refresh_token, current_user)
 
 
 @router.post("/refresh", response_model=TokenResponse)
-def refresh(
+async def refresh(
     data: TokenRefreshRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    return AuthService(session).refresh_token(data.refresh_token)
+    return await AuthService(session).refresh_token(data.refresh_token)
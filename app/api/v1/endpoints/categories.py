@@ -1,51 +1,65 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.category import Category
 from app.db.database import get_session
 from app.utils.user import get_current_user
 from app.schemas.category import CategoryCreate, CategoryUpdate
 from app.services.category_service import CategoryService
+from app.utils.conditional import cached_response
+from app.utils.streaming import (
+    STREAM_BATCH_SIZE,
+    get_stream_media_type,
+    stream_rows
+)
 from typing import List
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Category])
-def list_categories(
-    session: Session = Depends(get_session),
+async def list_categories(
+    request: Request,
+    stream: bool = False,
+    session: AsyncSession = Depends(get_session),
 ):
     service = CategoryService(session)
-    return service.get_all()
+    media_type = get_stream_media_type(request, stream)
+    if media_type:
+        return stream_rows(
+            service.stream_all(batch_size=STREAM_BATCH_SIZE), media_type)
+    return cached_response(request, await service.get_all_cached())
 
 
 @router.post("/", response_model=Category)
-def create_category(
+async def create_category(
     data: CategoryCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
-    return CategoryService(session).create(data)
+    return await CategoryService(session).create(data)
 
 
 @router.get("/{category_id}", response_model=Category)
-def get_category(
+async def get_category(
     category_id: int,
-    session: Session = Depends(get_session),
+    request: Request,
+    session: AsyncSession = Depends(get_session),
 ):
-    return CategoryService(session).get_by_id(category_id)
+    return cached_response(
+        request, await CategoryService(session).get_cached_by_id(category_id))
 
 
 @router.put("/{category_id}", response_model=Category)
-def update_category(
+async def update_category(
     category_id: int,
     data: CategoryUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
-    return CategoryService(session).update(category_id, data)
+    return await CategoryService(session).update(category_id, data)
 
 
 @router.delete("/{category_id}")
-def delete_category(
+async def delete_category(
     category_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
-    return CategoryService(session).delete(category_id)
+    return await CategoryService(session).delete(category_id)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from app.db.database import engine, replicas
+from app.models.user import User
+from app.db.pool_metrics import get_pool_metrics
+from app.utils.admission import admission_limiters
+from app.utils.auth import auth_session_cache
+from app.utils.counters import post_votes, thread_views
+from app.utils.password import password_hasher
+from app.utils.revocation import revoked_sessions
+from app.utils.search import search_index
+from app.utils.service_cache import service_cache, thread_page_cache, user_cache
+from app.utils.user import get_admin_user
+from app.utils.versioned_cache import category_cache
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics(admin: User = Depends(get_admin_user)):
+    return {
+        "db_pool": get_pool_metrics(engine.pool),
+        "db_replicas": replicas.stats(),
+        "admission": {
+            name: limiter.stats()
+            for name, limiter in admission_limiters.items()
+        },
+        "auth_session_cache": auth_session_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "revoked_sessions": {
+            "size": len(revoked_sessions),
+            "last_sync": revoked_sessions.last_sync,
+        },
+        "thread_views": thread_views.stats(),
+        "post_votes": post_votes.stats(),
+        "service_cache": service_cache.stats(),
+        "category_cache": category_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "thread_page_cache": thread_page_cache.stats(),
+        "search_index": search_index.stats(),
+    }
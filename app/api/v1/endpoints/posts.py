@@ -1,54 +1,161 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Literal, Optional, Union
+from app.core.config import PAGE_MAX_LIMIT
 from app.db.database import get_session
 from app.models.user import User
-from app.utils.user import get_current_user
+from app.utils.user import get_current_user, get_user_loader
 from app.models.post import Post
+from app.schemas.pagination import CursorPage
 from app.schemas.post import PostCreate, PostUpdate
+from app.schemas.vote import VoteCreate, VoteRead
 from app.services.post_service import PostService
+from app.services.vote_service import VoteService
+from app.utils.conditional import (
+    POST_VERSION_FIELDS,
+    Validators,
+    get_validator_headers,
+    get_validators,
+    is_not_modified,
+    not_modified
+)
+from app.utils.counters import post_votes
+from app.utils.loaders import UserLoader, embed_authors
+from app.utils.serialization import (
+    FastJSONResponse,
+    page_to_dict,
+    rows_to_dicts
+)
+from app.utils.streaming import (
+    STREAM_BATCH_SIZE,
+    get_stream_media_type,
+    stream_rows
+)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Post])
-def list_posts(
-    session: Session = Depends(get_session),
+@router.get("/", response_model=Union[List[Post], CursorPage[Post]])
+async def list_posts(
+    request: Request,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=PAGE_MAX_LIMIT),
+    stream: bool = False,
+    include: Optional[Literal["author"]] = None,
+    session: AsyncSession = Depends(get_session),
+    loader: UserLoader = Depends(get_user_loader),
 ):
-    return PostService(session).get_all()
+    media_type = get_stream_media_type(request, stream)
+    if media_type:
+        return stream_rows(
+            PostService(session).stream_all(batch_size=STREAM_BATCH_SIZE),
+            media_type
+        )
+    service = PostService(session)
+    # Revalidating a page only needs its version columns
+    if "if-none-match" in request.headers:
+        _, validators = await load_post_page(
+            service, skip, limit, cursor, include, versions_only=True)
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+
+    result, validators = await load_post_page(
+        service, skip, limit, cursor, include)
+    if cursor is not None:
+        post_votes.apply_pending(result.items)
+        content = page_to_dict(result, Post)
+        items = content["items"]
+    else:
+        post_votes.apply_pending(result)
+        content = items = rows_to_dicts(result, Post)
+    if include == "author":
+        await embed_authors(loader, items)
+    return FastJSONResponse(
+        content, headers=get_validator_headers(validators))
+
+
+async def load_post_page(
+    service: PostService,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    include: Optional[str],
+    versions_only: bool = False
+) -> tuple[Union[List[Post], CursorPage[Post]], Validators]:
+    # An empty cursor (?cursor=) requests the first page in cursor mode
+    if cursor is not None:
+        result = await service.get_by_cursor(
+            cursor=cursor, limit=limit, versions_only=versions_only)
+        posts, extra = result.items, (result.next_cursor, include)
+    else:
+        result = posts = await service.get_paginated(
+            skip=skip, limit=limit, versions_only=versions_only)
+        extra = (include,)
+    return result, get_validators(
+        posts, POST_VERSION_FIELDS, pending=post_votes, extra=extra,
+        with_last_modified=False)
 
 
 @router.get("/{post_id}", response_model=Post)
-def get_post(
+async def get_post(
     post_id: int,
-    session: Session = Depends(get_session),
+    request: Request,
+    session: AsyncSession = Depends(get_session),
 ):
-    return PostService(session).get_by_id(post_id)
+    service = PostService(session)
+    validators = get_validators(
+        [await service.get_version(post_id)],
+        POST_VERSION_FIELDS,
+        pending=post_votes,
+        with_last_modified=False
+    )
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+
+    post = await service.get_by_id(post_id)
+    post_votes.apply_pending([post])
+    return FastJSONResponse(
+        rows_to_dicts([post], Post)[0],
+        headers=get_validator_headers(validators)
+    )
 
 
 @router.post("/", response_model=Post)
-def create_post(
+async def create_post(
     data: PostCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    return PostService(session).create(data, user_id=current_user.id)
+    return await PostService(session).create(data, user_id=current_user.id)
 
 
 @router.put("/{post_id}", response_model=Post)
-def update_post(
+async def update_post(
     post_id: int,
     data: PostUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    return PostService(session).update(post_id, data, user_id=current_user.id)
+    return await PostService(session).update(
+        post_id, data, user_id=current_user.id)
 
 
 @router.delete("/{post_id}")
-def delete_post(
+async def delete_post(
+    post_id: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    return await PostService(session).delete(post_id, user_id=current_user.id)
+
+
+@router.post("/{post_id}/vote", response_model=VoteRead)
+async def vote_post(
     post_id: int,
-    session: Session = Depends(get_session),
+    data: VoteCreate,
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    return PostService(session).delete(post_id, user_id=current_user.id)
+    return await VoteService(session).vote(
+        post_id, user_id=current_user.id, value=data.value)
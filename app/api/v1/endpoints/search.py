@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
+from app.db.database import get_session
+from app.schemas.search import SearchResults
+from app.services.search_service import SearchService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResults)
+async def search(
+    q: str,
+    category_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20,
+    session: AsyncSession = Depends(get_session),
+):
+    return await SearchService(session).search(
+        q, category_id=category_id, skip=skip, limit=limit)
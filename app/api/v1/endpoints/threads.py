@@ -1,61 +1,231 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Literal, Optional, Union
+from app.core.config import PAGE_MAX_LIMIT
 from app.db.database import get_session
 from app.models.user import User
-from app.utils.user import get_current_user
+from app.utils.user import get_current_user, get_user_loader
 from app.models.thread import Thread
-from app.schemas.thread import ThreadCreate, ThreadUpdate
+from app.models.post import Post
+from app.schemas.pagination import BidirectionalCursorPage, CursorPage
+from app.schemas.thread import ThreadCreate, ThreadFull, ThreadUpdate
+from app.services.post_service import PostService
 from app.services.thread_service import ThreadService
+from app.utils.conditional import (
+    POST_VERSION_FIELDS,
+    THREAD_VERSION_FIELDS,
+    CachedBody,
+    Validators,
+    cached_response,
+    get_validator_headers,
+    get_validators,
+    is_not_modified,
+    not_modified
+)
+from app.utils.compression import encode_all
+from app.utils.counters import post_votes, thread_views
+from app.utils.loaders import UserLoader, embed_authors
+from app.utils.serialization import (
+    FastJSONResponse,
+    page_to_dict,
+    rows_to_dicts
+)
+from app.utils.service_cache import thread_page_cache
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Thread])
-def list_threads(
-    skip: int = 0,
-    limit: int = 10,
-    session: Session = Depends(get_session),
+@router.get("/", response_model=Union[List[Thread], CursorPage[Thread]])
+async def list_threads(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    order_by: Literal["created_at", "last_post_at"] = "created_at",
+    include: Optional[Literal["author"]] = None,
+    session: AsyncSession = Depends(get_session),
+    loader: UserLoader = Depends(get_user_loader),
 ):
-    service = ThreadService(session)
-    return service.get_paginated(skip=skip, limit=limit)
+    # Rendered pages are shared by all clients until a thread or post
+    # write, or THREAD_PAGE_CACHE_TTL_SECONDS
+    key = (skip, limit, cursor, order_by, include)
+    version = thread_page_cache.version()
+    cached = thread_page_cache.get(key, version)
+    if cached is None:
+        service = ThreadService(session)
+        # Revalidating a page only needs its version columns
+        if "if-none-match" in request.headers:
+            _, validators = await load_thread_page(
+                service, skip, limit, cursor, order_by, include,
+                versions_only=True)
+            if is_not_modified(request, validators):
+                return not_modified(validators)
+        cached = await render_thread_page(
+            service, loader, skip, limit, cursor, order_by, include)
+        thread_page_cache.set(key, cached, version)
+    return cached_response(request, cached)
+
+
+async def load_thread_page(
+    service: ThreadService,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    order_by: str,
+    include: Optional[str],
+    versions_only: bool = False
+) -> tuple[Union[List[Thread], CursorPage[Thread]], Validators]:
+    # An empty cursor (?cursor=) requests the first page in cursor mode
+    if cursor is not None:
+        result = await service.get_by_cursor(
+            cursor=cursor, limit=limit, order_by=order_by,
+            versions_only=versions_only)
+        threads, extra = result.items, (result.next_cursor, include)
+    else:
+        result = threads = await service.get_paginated(
+            skip=skip, limit=limit, versions_only=versions_only)
+        extra = (include,)
+    return result, get_validators(
+        threads, THREAD_VERSION_FIELDS, weak=True, extra=extra,
+        with_last_modified=False)
+
+
+def get_post_page_validators(page: BidirectionalCursorPage[Post]) -> Validators:
+    return get_validators(
+        page.items,
+        POST_VERSION_FIELDS,
+        pending=post_votes,
+        extra=(page.next_cursor, page.prev_cursor),
+        with_last_modified=False
+    )
+
+
+async def render_thread_page(
+    service: ThreadService,
+    loader: UserLoader,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    order_by: str,
+    include: Optional[str]
+) -> CachedBody:
+    result, validators = await load_thread_page(
+        service, skip, limit, cursor, order_by, include)
+    if cursor is not None:
+        thread_views.apply_pending(result.items)
+        content = page_to_dict(result, Thread)
+        items = content["items"]
+    else:
+        thread_views.apply_pending(result)
+        content = items = rows_to_dicts(result, Thread)
+    if include == "author":
+        await embed_authors(loader, items)
+    body = FastJSONResponse(content).body
+    return CachedBody(body, validators, encode_all(body))
 
 
 @router.get("/{thread_id}", response_model=Thread)
-def get_thread(
+async def get_thread(
     thread_id: int,
-    session: Session = Depends(get_session),
+    request: Request,
+    session: AsyncSession = Depends(get_session),
 ):
     service = ThreadService(session)
-    return service.get_by_id(thread_id)
+    validators = get_validators(
+        [await service.get_version(thread_id)],
+        THREAD_VERSION_FIELDS,
+        weak=True,
+        with_last_modified=False
+    )
+    thread_views.add(thread_id, "view_count")
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+
+    thread = await service.get_by_id(thread_id)
+    thread_views.apply_pending([thread])
+    return FastJSONResponse(
+        rows_to_dicts([thread], Thread)[0],
+        headers=get_validator_headers(validators)
+    )
+
+
+@router.get("/{thread_id}/posts", response_model=BidirectionalCursorPage[Post])
+async def list_thread_posts(
+    thread_id: int,
+    request: Request,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=PAGE_MAX_LIMIT),
+    session: AsyncSession = Depends(get_session),
+):
+    await ThreadService(session).get_version(thread_id)
+    service = PostService(session)
+    # Revalidating a page only needs its version columns
+    if "if-none-match" in request.headers:
+        versions = await service.get_by_thread(
+            thread_id, after=after, before=before, limit=limit,
+            versions_only=True)
+        validators = get_post_page_validators(versions)
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+
+    page = await service.get_by_thread(
+        thread_id, after=after, before=before, limit=limit)
+    validators = get_post_page_validators(page)
+    post_votes.apply_pending(page.items)
+    return FastJSONResponse(
+        page_to_dict(page, Post), headers=get_validator_headers(validators))
+
+
+@router.get("/{thread_id}/full", response_model=ThreadFull)
+async def get_thread_full(
+    thread_id: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=PAGE_MAX_LIMIT),
+    session: AsyncSession = Depends(get_session),
+):
+    full = await ThreadService(session).get_full(
+        thread_id, after=after, before=before, limit=limit)
+    thread_views.add(thread_id, "view_count")
+    thread_views.apply_pending([full.thread])
+    post_votes.apply_pending(full.posts.items)
+    return FastJSONResponse({
+        "thread": rows_to_dicts([full.thread], Thread)[0],
+        "posts": page_to_dict(full.posts, Post),
+        "authors": {
+            str(user_id): dict(author)
+            for user_id, author in full.authors.items()
+        },
+    })
 
 
 @router.post("/", response_model=Thread)
-def create_thread(
+async def create_thread(
     data: ThreadCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     service = ThreadService(session)
-    return service.create(data, user_id=current_user.id)
+    return await service.create(data, user_id=current_user.id)
 
 
 @router.put("/{thread_id}", response_model=Thread)
-def update_thread(
+async def update_thread(
     thread_id: int,
     data: ThreadUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     service = ThreadService(session)
-    return service.update(thread_id, data, user_id=current_user.id)
+    return await service.update(thread_id, data, user_id=current_user.id)
 
 
 @router.delete("/{thread_id}")
-def delete_thread(
+async def delete_thread(
     thread_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     service = ThreadService(session)
-    return service.delete(thread_id, user_id=current_user.id)
+    return await service.delete(thread_id, user_id=current_user.id)
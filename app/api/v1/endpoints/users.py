@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserRead
 from app.db.database import get_session
@@ -10,18 +10,15 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=UserRead)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
 
 @router.get("/")
-def get_users(session: Session = Depends(get_session)):
+async def get_users(session: AsyncSession = Depends(get_session)):
     return UserService(session)
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user(user_id: int, session: Session = Depends(get_session)):
-    user = session.exec(select(User).where(User.id == user_id)).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+async def get_user(user_id: int, session: AsyncSession = Depends(get_session)):
+    return await UserService(session).get_public_profile(user_id)
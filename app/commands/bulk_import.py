@@ -0,0 +1,61 @@
+"""
+Imports users, categories, threads and posts from a JSONL file.
+
+    python -m app.commands.bulk_import FILE [--job NAME] [--chunk-size N]
+                                            [--no-recompute]
+
+Each line is one object with a "type" (user, category, thread or post)
+and the row's "id" in the source forum, which is remapped. Running the
+same job again resumes after its last committed chunk. A finished
+import makes the running workers rebuild their search indexes.
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import AsyncIterator
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models  # noqa: F401
+from app.core.config import IMPORT_CHUNK_SIZE
+from app.db.database import engine
+from app.services.import_service import ImportService
+
+
+async def read_lines(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        for line in file:
+            yield line
+
+
+async def main(path: str, job: str, chunk_size: int, recompute: bool) -> None:
+    started = time.perf_counter()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        result = await ImportService(session).run(
+            job, read_lines(path), chunk_size=chunk_size, recompute=recompute)
+    await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    total = sum(result.inserted.values())
+    print(f"Job {job}: {total} rows in {elapsed:.1f}s "
+          f"({total / elapsed:,.0f} rows/s), resumed after line "
+          f"{result.resumed_from}")
+    for kind, count in result.inserted.items():
+        print(f"  {kind}: {count}")
+    if result.skipped:
+        print(f"Skipped {result.skipped} lines:")
+        for error in result.errors:
+            print(f"  line {error.line}: {error.message}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path")
+    parser.add_argument("--job", help="defaults to the file name")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--no-recompute", dest="recompute",
+                        action="store_false")
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.job or os.path.basename(args.path),
+                     args.chunk_size, args.recompute))
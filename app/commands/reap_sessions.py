@@ -0,0 +1,29 @@
+"""
+Deletes expired and revoked user sessions in small batches.
+
+    python -m app.commands.reap_sessions [--batch-size N]
+"""
+import argparse
+import asyncio
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models  # noqa: F401
+from app.core.config import SESSION_REAP_BATCH_SIZE
+from app.db.database import engine
+from app.services.auth_service import AuthService
+
+
+async def main(batch_size: int) -> None:
+    async with AsyncSession(engine) as session:
+        deleted = await AuthService(session).reap_sessions(batch_size)
+    await engine.dispose()
+    print(f"Deleted {deleted} sessions")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--batch-size", type=int, default=SESSION_REAP_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
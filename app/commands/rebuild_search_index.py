@@ -0,0 +1,34 @@
+"""
+Rebuilds the search index from every thread and post and saves it.
+
+    python -m app.commands.rebuild_search_index [--batch-size N] [--path PATH]
+
+Running workers keep their own index; they load the new file on their
+next start.
+"""
+import argparse
+import asyncio
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models  # noqa: F401
+from app.core.config import SEARCH_INDEX_BATCH_SIZE, SEARCH_INDEX_PATH
+from app.db.database import engine
+from app.services.search_service import SearchService
+
+
+async def main(batch_size: int, path: str) -> None:
+    async with AsyncSession(engine) as session:
+        index = await SearchService(session).rebuild(batch_size)
+    await engine.dispose()
+    index.save(path)
+    print(f"Indexed {len(index)} documents into {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--batch-size", type=int, default=SEARCH_INDEX_BATCH_SIZE)
+    parser.add_argument("--path", default=SEARCH_INDEX_PATH)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.path))
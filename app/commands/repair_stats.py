@@ -0,0 +1,30 @@
+"""
+Recomputes the thread, category and post vote counters from the source rows.
+
+    python -m app.commands.repair_stats [--batch-size N]
+
+Vote deltas still buffered by a running app are applied on top of the
+recomputed counts, so run it while the app is stopped for exact results.
+"""
+import argparse
+import asyncio
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models  # noqa: F401
+from app.db.database import engine
+from app.services.stats_service import StatsService
+
+
+async def main(batch_size: int) -> None:
+    async with AsyncSession(engine) as session:
+        await StatsService(session).recompute(batch_size)
+    await engine.dispose()
+    print("Statistics recomputed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
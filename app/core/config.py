@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import os
+import tempfile
 
 
 load_dotenv()
@@ -11,11 +12,158 @@ ALGORITHM = os.getenv("ALGORITHM", "HS256")
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL")
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+# Connection pool configuration (ignored for in-memory SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+# Recycle below MySQL's wait_timeout so stale connections are never used
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Read replicas (comma separated URLs, empty disables them). GET and HEAD
+# requests read from one picked by REPLICA_BALANCE, "round_robin" or
+# "least_connections"; writes and auth checks always use the primary.
+# Clients that wrote within REPLICA_STICKINESS_SECONDS read from the
+# primary too. A replica that fails is skipped for REPLICA_RETRY_SECONDS.
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+REPLICA_BALANCE = os.getenv("REPLICA_BALANCE", "round_robin")
+REPLICA_STICKINESS_SECONDS = int(os.getenv("REPLICA_STICKINESS_SECONDS", 5))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", 30))
 
 # Other common values
+# Largest page the list endpoints return (?limit=)
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", 100))
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
+# Password hashing. bcrypt runs in a process pool; requests beyond
+# PASSWORD_HASH_MAX_PENDING in flight are rejected with 503. Changing
+# BCRYPT_ROUNDS rehashes each password on its next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+
+# Admission control, per worker and route class: /api/v1/auth requests,
+# other reads (GET, HEAD, OPTIONS) and other writes. Each class runs at
+# most *_CONCURRENCY requests at once (0 removes its limit) and queues
+# up to *_QUEUE more for ADMISSION_QUEUE_TIMEOUT_SECONDS. Anything beyond
+# gets 503 with Retry-After: ADMISSION_RETRY_AFTER_SECONDS. Keep reads
+# plus writes near DB_POOL_SIZE + DB_MAX_OVERFLOW so requests wait here,
+# cheaply, rather than on the connection pool.
+ADMISSION_AUTH_CONCURRENCY = int(os.getenv("ADMISSION_AUTH_CONCURRENCY", 8))
+ADMISSION_AUTH_QUEUE = int(os.getenv("ADMISSION_AUTH_QUEUE", 32))
+ADMISSION_READ_CONCURRENCY = int(os.getenv("ADMISSION_READ_CONCURRENCY", 24))
+ADMISSION_READ_QUEUE = int(os.getenv("ADMISSION_READ_QUEUE", 128))
+ADMISSION_WRITE_CONCURRENCY = int(os.getenv("ADMISSION_WRITE_CONCURRENCY", 8))
+ADMISSION_WRITE_QUEUE = int(os.getenv("ADMISSION_WRITE_QUEUE", 32))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", 2))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", 1))
+
+# Access token verification: "stateless" trusts the JWT signature and exp
+# plus the in-memory revocation list, "session" also checks user_sessions
+AUTH_VERIFY_MODE = os.getenv("AUTH_VERIFY_MODE", "stateless")
+# How often each worker reloads revoked sessions from the database. This
+# bounds how long a logout takes to reach the other workers.
+REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", 30))
+
+# Expired and revoked sessions are deleted in batches of
+# SESSION_REAP_BATCH_SIZE every SESSION_REAP_INTERVAL_SECONDS (0 disables
+# the background reaper, `python -m app.commands.reap_sessions` still works)
+SESSION_REAP_INTERVAL_SECONDS = int(os.getenv("SESSION_REAP_INTERVAL_SECONDS", 3600))
+SESSION_REAP_BATCH_SIZE = int(os.getenv("SESSION_REAP_BATCH_SIZE", 1000))
+
+# Thread views are counted in memory and written every
+# VIEW_COUNT_FLUSH_SECONDS, or sooner once VIEW_COUNT_FLUSH_THRESHOLD
+# threads have pending views. Unflushed views are lost if a worker dies.
+VIEW_COUNT_FLUSH_SECONDS = float(os.getenv("VIEW_COUNT_FLUSH_SECONDS", 5))
+VIEW_COUNT_FLUSH_THRESHOLD = int(os.getenv("VIEW_COUNT_FLUSH_THRESHOLD", 1000))
+# Same for the post vote counters. post_votes stays the source of truth,
+# the counters on posts can lag behind it by one flush.
+VOTE_COUNT_FLUSH_SECONDS = float(os.getenv("VOTE_COUNT_FLUSH_SECONDS", 2))
+VOTE_COUNT_FLUSH_THRESHOLD = int(os.getenv("VOTE_COUNT_FLUSH_THRESHOLD", 1000))
+
+# Authenticated session cache (per process). Entries also expire with
+# the token, and logout/refresh invalidate them in the handling process.
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", 10000))
+
+# Backend of the service caches (categories, user profiles, thread list
+# pages). "local" keeps a CACHE_MAX_ENTRIES LRU in each worker, "shared"
+# a memory-mapped file at SHARED_CACHE_PATH that all workers of a host
+# use, so an invalidation in one worker reaches the others at once.
+# Keep the file on tmpfs; values over SHARED_CACHE_SLOT_SIZE bytes
+# (pickled) are not cached. No entry outlives CACHE_TTL_SECONDS. A file
+# that is not owned by the app's user with mode 0600 is refused.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 3600))
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "/dev/shm/loopsociety-cache")
+SHARED_CACHE_SLOTS = int(os.getenv("SHARED_CACHE_SLOTS", 4096))
+SHARED_CACHE_SLOT_SIZE = int(os.getenv("SHARED_CACHE_SLOT_SIZE", 16384))
+
+# Category cache. Workers compare the cached version with cache_versions
+# at most every CATEGORY_CACHE_CHECK_SECONDS, which bounds how long they
+# serve categories changed on another host (or through another worker
+# with the local backend). Entries also expire after
+# CATEGORY_CACHE_TTL_SECONDS so thread_count and post_count, which do
+# not bump the version, catch up.
+CATEGORY_CACHE_CHECK_SECONDS = float(os.getenv("CATEGORY_CACHE_CHECK_SECONDS", 5))
+CATEGORY_CACHE_TTL_SECONDS = int(os.getenv("CATEGORY_CACHE_TTL_SECONDS", 60))
+
+# User profiles and thread list pages are cached for this long. Writes
+# through a worker invalidate them, but reputation and view counts can
+# lag by up to the TTL.
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+THREAD_PAGE_CACHE_TTL_SECONDS = int(os.getenv("THREAD_PAGE_CACHE_TTL_SECONDS", 5))
+
+# Response compression. Bodies under COMPRESSION_MIN_SIZE bytes are sent
+# as they are. brotli and zstd are offered when the brotli/zstandard
+# packages are installed.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+
+# Directory for files the app keeps between restarts, shared by the
+# workers of a host. Point it at a persistent volume in production; the
+# default under the system temp directory does not survive reboots.
+DATA_DIR = os.path.abspath(os.getenv(
+    "DATA_DIR", os.path.join(tempfile.gettempdir(), "loopsociety")))
+
+# Full-text search. Each worker keeps its own index, picks up rows
+# changed or deleted through other workers every SEARCH_INDEX_SYNC_SECONDS
+# and saves it to SEARCH_INDEX_PATH every SEARCH_INDEX_SAVE_SECONDS (empty
+# disables saving). Rows updated within SEARCH_INDEX_SYNC_OVERLAP_SECONDS
+# of the last sync are indexed again, covering transactions that
+# committed late. Deletions are kept for SEARCH_TOMBSTONE_RETENTION_DAYS;
+# a saved index older than that is rebuilt on startup.
+SEARCH_INDEX_PATH = os.getenv(
+    "SEARCH_INDEX_PATH", os.path.join(DATA_DIR, "search_index.json"))
+SEARCH_INDEX_SYNC_SECONDS = float(os.getenv("SEARCH_INDEX_SYNC_SECONDS", 10))
+SEARCH_INDEX_SYNC_OVERLAP_SECONDS = int(os.getenv("SEARCH_INDEX_SYNC_OVERLAP_SECONDS", 60))
+SEARCH_INDEX_SAVE_SECONDS = float(os.getenv("SEARCH_INDEX_SAVE_SECONDS", 300))
+SEARCH_INDEX_BATCH_SIZE = int(os.getenv("SEARCH_INDEX_BATCH_SIZE", 1000))
+SEARCH_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SEARCH_TOMBSTONE_RETENTION_DAYS", 7))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", 100))
+
+# Bulk imports (app.commands.bulk_import and POST /api/v1/admin/bulk).
+# Every chunk of IMPORT_CHUNK_SIZE lines is inserted together with its
+# checkpoint, so an interrupted job resumes after its last chunk.
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 5000))
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", 100))
+
+# Comma separated ids of the users allowed to use the admin endpoints
+# and /api/v1/internal/metrics
+ADMIN_USER_IDS = {
+    int(user_id) for user_id in os.getenv("ADMIN_USER_IDS", "").split(",")
+    if user_id.strip()
+}
+
 # CORS configuration
 ORIGINS = [
     "http://localhost:3000",
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import (
+    REVOCATION_SYNC_SECONDS,
+    SEARCH_INDEX_BATCH_SIZE,
+    SEARCH_INDEX_PATH,
+    SEARCH_INDEX_SAVE_SECONDS,
+    SEARCH_INDEX_SYNC_SECONDS,
+    SEARCH_TOMBSTONE_RETENTION_DAYS,
+    SESSION_REAP_INTERVAL_SECONDS,
+    VIEW_COUNT_FLUSH_SECONDS,
+    VOTE_COUNT_FLUSH_SECONDS
+)
+from app.db.database import engine
+from app.services.auth_service import AuthService
+from app.services.search_service import SearchService
+from app.utils.counters import CounterBuffer, post_votes, thread_views
+from app.utils.password import password_hasher
+from app.utils.search import SearchIndex, search_index, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+async def sync_revoked_sessions():
+    while True:
+        try:
+            async with AsyncSession(engine) as session:
+                await AuthService(session).load_revoked_sessions()
+        except Exception:
+            logger.exception("Failed to sync revoked sessions")
+        await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+
+
+async def reap_sessions():
+    while True:
+        await asyncio.sleep(SESSION_REAP_INTERVAL_SECONDS)
+        try:
+            async with AsyncSession(engine) as session:
+                deleted = await AuthService(session).reap_sessions()
+            logger.info("Reaped %d user sessions", deleted)
+        except Exception:
+            logger.exception("Failed to reap user sessions")
+
+
+async def flush_counters(buffer: CounterBuffer, interval: float):
+    while True:
+        await buffer.wait_for_flush(interval)
+        await flush_counter_buffer(buffer)
+
+
+async def flush_counter_buffer(buffer: CounterBuffer):
+    try:
+        async with AsyncSession(engine) as session:
+            await buffer.flush(session)
+    except Exception:
+        logger.exception("Failed to flush %s counters",
+                         buffer.model.__tablename__)
+
+
+async def load_search_index():
+    """Starts from the saved index when there is one, else rebuilds it."""
+    index = SearchIndex()
+    loaded = SEARCH_INDEX_PATH and await asyncio.to_thread(
+        index.load, SEARCH_INDEX_PATH)
+    # Deletions older than the tombstones kept would be missed
+    if (not loaded or index.watermark is None
+            or index.watermark < datetime.utcnow() - timedelta(
+                days=SEARCH_TOMBSTONE_RETENTION_DAYS)):
+        async with AsyncSession(engine) as session:
+            index = await SearchService(session).rebuild(
+                SEARCH_INDEX_BATCH_SIZE)
+    # Local writes since startup come back with the first sync, as the
+    # watermark predates them
+    search_index.replace(index)
+
+
+async def save_search_index():
+    data = search_index.dump()
+    await asyncio.to_thread(write_snapshot, SEARCH_INDEX_PATH, data)
+
+
+async def sync_search_index():
+    try:
+        await load_search_index()
+    except Exception:
+        # The first sync below then indexes every row in place
+        logger.exception("Failed to load the search index")
+    saved_at = time.monotonic()
+    while True:
+        try:
+            async with AsyncSession(engine) as session:
+                service = SearchService(session)
+                await service.index_changes(
+                    batch_size=SEARCH_INDEX_BATCH_SIZE)
+                if time.monotonic() - saved_at >= SEARCH_INDEX_SAVE_SECONDS:
+                    await service.reap_tombstones()
+                    if SEARCH_INDEX_PATH:
+                        await save_search_index()
+                    saved_at = time.monotonic()
+        except Exception:
+            logger.exception("Failed to sync the search index")
+        await asyncio.sleep(SEARCH_INDEX_SYNC_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = [
+        asyncio.create_task(sync_revoked_sessions()),
+        asyncio.create_task(
+            flush_counters(thread_views, VIEW_COUNT_FLUSH_SECONDS)),
+        asyncio.create_task(
+            flush_counters(post_votes, VOTE_COUNT_FLUSH_SECONDS)),
+        asyncio.create_task(sync_search_index()),
+    ]
+    if SESSION_REAP_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(reap_sessions()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await flush_counter_buffer(thread_views)
+        await flush_counter_buffer(post_votes)
+        if SEARCH_INDEX_PATH and search_index.watermark is not None:
+            try:
+                await save_search_index()
+            except Exception:
+                logger.exception("Failed to save the search index")
+        password_hasher.shutdown()
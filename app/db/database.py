@@ -1,12 +1,102 @@
-from sqlmodel import Session, create_engine
-from app.core.config import DATABASE_URL
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import (
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    REPLICA_BALANCE,
+    REPLICA_RETRY_SECONDS
+)
+from app.db.pool_metrics import InstrumentedQueuePool
+from app.db.replicas import (
+    SAFE_METHODS,
+    ReplicaSet,
+    RoutingSession,
+    is_sticky
+)
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Alembic keeps using the synchronous driver from DATABASE_URL, the app
+# swaps it for the matching async driver.
+ASYNC_DRIVERS = {
+    "mysql": "mysql+asyncmy",
+    "sqlite": "sqlite+aiosqlite",
+}
 
 
-def get_session():
-    session = Session(engine)
-    try:
-        yield session
-    finally:
-        session.close()
+def get_async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.drivername in ASYNC_DRIVERS.values():
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_pool_options(url: str) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (
+            None, "", ":memory:"):
+        # In-memory SQLite lives on a single shared connection
+        return {}
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+def create_engine(url: str):
+    return create_async_engine(
+        get_async_url(url),
+        echo=DB_ECHO,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        **get_pool_options(url)
+    )
+
+
+engine = create_engine(DATABASE_URL)
+replicas = ReplicaSet(
+    [create_engine(url) for url in DATABASE_REPLICA_URLS],
+    strategy=REPLICA_BALANCE,
+    retry_after=REPLICA_RETRY_SECONDS
+)
+
+
+def get_request_session(request: Request) -> AsyncSession:
+    """
+    Unit of work shared by the middlewares, dependencies and services
+    handling one request. AsyncSession only checks out a connection on
+    its first query, and DBSessionMiddleware closes it after the
+    response has been sent. It reads from the primary until get_session
+    routes it.
+    """
+    session = getattr(request.state, "db_session", None)
+    if session is None:
+        session = AsyncSession(
+            engine,
+            expire_on_commit=False,
+            sync_session_class=RoutingSession
+        )
+        request.state.db_session = session
+    return session
+
+
+async def get_session(request: Request) -> AsyncSession:
+    session = get_request_session(request)
+    # Decided once, after AuthMiddleware checked the token on the primary
+    if "replica" not in session.info:
+        session.info["replica"] = (
+            replicas.pick()
+            if request.method in SAFE_METHODS and not is_sticky(request)
+            else None
+        )
+    return session
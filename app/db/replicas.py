@@ -0,0 +1,126 @@
+import itertools
+import time
+from typing import Optional
+
+from sqlalchemy import Delete, Insert, Update, event
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+from starlette.requests import HTTPConnection
+
+from app.core.config import REPLICA_STICKINESS_SECONDS
+from app.utils.cache import TTLCache
+
+# Set on responses to successful writes; while it is valid the client
+# reads its own writes from the primary
+STICKY_COOKIE = "read_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Same for API clients that drop cookies, per process and by user id
+sticky_users = TTLCache(maxsize=100000, ttl=REPLICA_STICKINESS_SECONDS)
+
+
+class ReplicaSet:
+    """
+    Read replicas, handed out round robin or to the one with the fewest
+    checked out connections. A replica that fails is skipped until
+    `retry_after` seconds have passed.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], strategy: str,
+                 retry_after: float):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unknown replica balancing strategy {strategy}")
+        self.engines = engines
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._turn = itertools.count()
+        self._down_until: dict[AsyncEngine, float] = {}
+        self.picks = {engine: 0 for engine in engines}
+        self.failures = {engine: 0 for engine in engines}
+        for engine in engines:
+            event.listen(engine.sync_engine, "handle_error",
+                         self._on_error(engine))
+
+    def pick(self) -> Optional[AsyncEngine]:
+        now = time.monotonic()
+        healthy = [
+            engine for engine in self.engines
+            if self._down_until.get(engine, 0) <= now
+        ]
+        if not healthy:
+            return None
+        if self.strategy == "least_connections":
+            engine = min(healthy, key=checked_out)
+        else:
+            engine = healthy[next(self._turn) % len(healthy)]
+        self.picks[engine] += 1
+        return engine
+
+    def mark_failed(self, engine: AsyncEngine) -> None:
+        self._down_until[engine] = time.monotonic() + self.retry_after
+        self.failures[engine] += 1
+
+    def _on_error(self, engine: AsyncEngine):
+        def handle_error(context) -> None:
+            # Connection and server side failures, not bad statements
+            if context.is_disconnect or isinstance(
+                    context.sqlalchemy_exception,
+                    (OperationalError, InterfaceError)):
+                self.mark_failed(engine)
+        return handle_error
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                # Position in DATABASE_REPLICA_URLS; hosts and credentials
+                # stay out of the metrics
+                "replica": index,
+                "driver": engine.url.drivername,
+                "healthy": self._down_until.get(engine, 0) <= now,
+                "picks": self.picks[engine],
+                "failures": self.failures[engine],
+                "checked_out": checked_out(engine),
+            }
+            for index, engine in enumerate(self.engines)
+        ]
+
+
+def checked_out(engine: AsyncEngine) -> int:
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if checkedout else 0
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to `info["replica"]` when one was chosen for the request,
+    and flushes, DML and every later statement of the session to the
+    primary, so a request reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = self.info.get("replica")
+        if replica is not None:
+            if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+                self.info["replica"] = None
+            else:
+                return replica.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def get_sticky_cookie() -> str:
+    until = int(time.time()) + REPLICA_STICKINESS_SECONDS
+    return (f"{STICKY_COOKIE}={until}; Max-Age={REPLICA_STICKINESS_SECONDS}; "
+            "Path=/; HttpOnly; SameSite=Lax")
+
+
+def is_sticky(connection: HTTPConnection) -> bool:
+    """Whether the client wrote recently enough to read from the primary."""
+    try:
+        if int(connection.cookies.get(STICKY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    user_id = getattr(connection.state, "user_id", None)
+    return user_id is not None and sticky_users.get(user_id) is not None
@@ -1,13 +1,21 @@
 from fastapi import FastAPI
-from app.api.v1.endpoints import users, auth, categories, threads, posts
+from app.api.v1.endpoints import (
+    users, auth, categories, threads, posts, search, admin, internal
+)
+from app.middlewares.admission import AdmissionMiddleware
+from app.middlewares.compression import CompressionMiddleware
 from app.middlewares.process_header import ProcessHeader
 from app.middlewares.auth_middleware import AuthMiddleware
+from app.middlewares.db_session import DBSessionMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import ORIGINS
+from app.core.lifespan import lifespan
 
-app = FastAPI(title="LoopSociety Forum API")
+app = FastAPI(title="LoopSociety Forum API", lifespan=lifespan)
 
 # Middleware setup
+# Innermost, so X-Process-Time includes compressing the first chunk
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(ProcessHeader)
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +25,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.add_middleware(AuthMiddleware)
+# Outside auth, so shed requests are turned away before any work
+app.add_middleware(AdmissionMiddleware)
+# Outermost, so the shared session outlives every middleware using it
+app.add_middleware(DBSessionMiddleware)
 
 # Router setup
 app.include_router(users.router, prefix="/api/v1/users", tags=["User"])
@@ -25,3 +37,7 @@ app.include_router(categories.router,
                    prefix="/api/v1/categories", tags=["Categories"])
 app.include_router(threads.router, prefix="/api/v1/threads", tags=["Threads"])
 app.include_router(posts.router, prefix="/api/v1/posts", tags=["Posts"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["Search"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
+app.include_router(internal.router,
+                   prefix="/api/v1/internal", tags=["Internal"])
@@ -0,0 +1,53 @@
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import ADMISSION_RETRY_AFTER_SECONDS
+from app.utils.admission import (
+    AdmissionLimiter,
+    admission_limiters,
+    route_class
+)
+
+
+class AdmissionMiddleware:
+    """
+    Holds a slot of the request's route class until the response is
+    complete, and answers 503 with Retry-After when none frees up in
+    time. Sits outside AuthMiddleware, so rejected requests cost neither
+    a token check nor a database connection.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiters: Optional[dict[str, AdmissionLimiter]] = None
+    ):
+        self.app = app
+        self.limiters = admission_limiters if limiters is None else limiters
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters.get(
+            route_class(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = JSONResponse(
+                {"detail": f"Too many {limiter.name} requests in progress"},
+                status_code=503,
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
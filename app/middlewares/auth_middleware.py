@@ -1,10 +1,11 @@
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 from fastapi.responses import JSONResponse
 from jose import jwt, JWTError
-from app.core.config import SECRET_KEY, ALGORITHM
-from app.db.database import get_session
-from app.utils.auth import get_token_hash
+from app.core.config import SECRET_KEY, ALGORITHM, AUTH_VERIFY_MODE
+from app.db.database import get_request_session
+from app.utils.auth import auth_session_cache, snapshot_user
+from app.utils.revocation import revoked_sessions
 from app.models.user import User
 from app.models.user_session import UserSession
 from sqlmodel import select
@@ -15,52 +16,77 @@ EXCLUDED_PREFIX = {
 }
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if self.is_excluded_path(request.url.path):
-            return await call_next(request)
+class AuthMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or self.is_excluded_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        response = await self.authenticate(request)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    async def authenticate(self, request: Request) -> JSONResponse | None:
         token = self.extract_token(request)
         if not token:
             return self.unauthorized("Authorization header missing or invalid")
 
         try:
-            user_id = self.decode_token(token)
-        except JWTError:
+            user_id, session_id, expires_at = self.decode_token(token)
+        except (JWTError, KeyError, TypeError, ValueError):
             return self.unauthorized("Invalid token")
 
-        session_gen = get_session()
-        session = next(session_gen)
+        if revoked_sessions.is_revoked(session_id):
+            return self.unauthorized("Session inactive or expired")
 
-        try:
-            if not self.is_valid_session(session, user_id, token):
+        # Enough for get_current_user to load the user only when needed
+        request.state.user_id = user_id
+        request.state.session_id = session_id
+        request.state.token_expires_at = expires_at
+
+        cache_key = (user_id, session_id)
+        snapshot = auth_session_cache.get(cache_key)
+
+        if snapshot is None and AUTH_VERIFY_MODE == "session":
+            session = get_request_session(request)
+
+            if not await self.is_valid_session(session, user_id, session_id):
                 return self.unauthorized("Session inactive or expired")
 
-            user = self.get_user(session, user_id)
+            user = await self.get_user(session, user_id)
             if not user:
                 return JSONResponse(status_code=404, content={"detail": "User not found"})
 
-            request.state.user = user
-        finally:
-            session_gen.close()
+            snapshot = snapshot_user(user)
+            auth_session_cache.set(cache_key, snapshot, expires_at=expires_at)
 
-        return await call_next(request)
+        if snapshot is not None:
+            request.state.user = User(**snapshot)
+        return None
 
     def is_excluded_path(self, path: str) -> bool:
         return any(path.startswith(p) for p in EXCLUDED_PREFIX)
 
-    def decode_token(self, token: str) -> int:
+    def decode_token(self, token: str) -> tuple[int, int, int]:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return int(payload.get("sub"))
+        if payload.get("type") != "access":
+            raise JWTError("Not an access token")
+        return int(payload["sub"]), int(payload["sid"]), payload["exp"]
 
-    def is_valid_session(self, session, user_id: int, token: str) -> bool:
-        token_hash = get_token_hash(token)
-        statement = select(UserSession).where(
+    async def is_valid_session(self, session, user_id: int, session_id: int) -> bool:
+        statement = select(UserSession.id).where(
+            UserSession.id == session_id,
             UserSession.user_id == user_id,
-            UserSession.refresh_token_hash == token_hash,
             UserSession.is_active == True
         )
-        return session.exec(statement).first() is not None
+        return (await session.exec(statement)).first() is not None
 
     def extract_token(self, request: Request) -> str | None:
         auth_header = request.headers.get("Authorization")
@@ -69,8 +95,8 @@ class AuthMiddleware(BaseHTTPMiddleware):
 
         return auth_header.split(" ")[1]
 
-    def get_user(self, session, user_id: int) -> User | None:
-        return session.exec(select(User).where(User.id == user_id)).first()
+    async def get_user(self, session, user_id: int) -> User | None:
+        return (await session.exec(select(User).where(User.id == user_id))).first()
 
     def unauthorized(self, message: str) -> JSONResponse:
         return JSONResponse(status_code=401, content={"detail": message})
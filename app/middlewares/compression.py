@@ -0,0 +1,107 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import COMPRESSION_MIN_SIZE
+from app.utils.compression import (
+    COMPRESSORS,
+    choose_encoding,
+    is_compressible
+)
+
+
+class CompressionMiddleware:
+    """
+    Compresses compressible responses with the best encoding the client
+    accepts. Complete bodies under `minimum_size` are left alone, and
+    streamed bodies are compressed chunk by chunk, each flushed so the
+    client can decode it straight away. Responses that already carry a
+    Content-Encoding, such as pre-compressed cached bodies, pass through.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+        compressor = None
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, compressor
+
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows how large
+                # the response is
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(scope=start)
+                compressible = (
+                    start["status"] not in (204, 304)
+                    and is_compressible(headers.get("content-type", ""))
+                    and "content-encoding" not in headers
+                )
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                if (not compressible or encoding is None
+                        or (not more_body and len(body) < self.minimum_size)):
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = COMPRESSORS[encoding]()
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The compressed bytes differ, but If-None-Match
+                    # compares weakly so the tag keeps matching
+                    headers["ETag"] = "W/" + etag
+                if more_body:
+                    del headers["Content-Length"]
+                    body = compressor.compress(body)
+                else:
+                    body = compressor.compress(body, flush=False)
+                    body += compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                await send({
+                    "type": "http.response.body",
+                    "body": body,
+                    "more_body": more_body,
+                })
+                return
+
+            if compressor is None:
+                await send(message)
+                return
+
+            if more_body:
+                body = compressor.compress(body)
+            else:
+                body = compressor.compress(body, flush=False)
+                body += compressor.finish()
+            await send({
+                "type": "http.response.body",
+                "body": body,
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,47 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.database import replicas
+from app.db.replicas import SAFE_METHODS, get_sticky_cookie, sticky_users
+
+
+class DBSessionMiddleware:
+    """
+    Closes the request's shared database session, if anything opened
+    one, once the response is complete. Must wrap every middleware that
+    touches the database. With read replicas configured, it also marks
+    clients whose writes succeeded so they read from the primary for a
+    while.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Create the state dict here so copies of the scope made further
+        # down the stack all share it
+        state = scope.setdefault("state", {})
+        if replicas.engines and scope["method"] not in SAFE_METHODS:
+            send = self.mark_writes(state, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session = state.pop("db_session", None)
+            if session is not None:
+                await session.close()
+
+    def mark_writes(self, state: dict, send: Send) -> Send:
+        async def send_wrapper(message: Message):
+            if (message["type"] == "http.response.start"
+                    and message["status"] < 400):
+                MutableHeaders(scope=message).append(
+                    "set-cookie", get_sticky_cookie())
+                user_id = state.get("user_id")
+                if user_id is not None:
+                    sticky_users.set(user_id, True)
+            await send(message)
+        return send_wrapper
@@ -3,5 +3,10 @@ from .thread import Thread
 from .post import Post
 from .category import Category
 from .user_session import UserSession
+from .vote import PostVote
+from .cache_version import CacheVersion
+from .bulk_import import ImportCheckpoint, ImportIdMap
+from .search_tombstone import SearchTombstone
 
-__all__ = ["User", "Thread", "Post", "Category", "UserSession"]
+__all__ = ["User", "Thread", "Post", "Category", "UserSession", "PostVote",
+           "CacheVersion", "ImportCheckpoint", "ImportIdMap", "SearchTombstone"]
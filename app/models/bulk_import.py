@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class ImportCheckpoint(SQLModel, table=True):
+    __tablename__ = "import_checkpoints"
+
+    # Last input line committed by the import job
+    job: str = Field(primary_key=True, max_length=100)
+    line: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ImportIdMap(SQLModel, table=True):
+    __tablename__ = "import_id_maps"
+
+    # Id of an imported row in the source forum and in this database
+    job: str = Field(primary_key=True, max_length=100)
+    kind: str = Field(primary_key=True, max_length=20)
+    source_id: int = Field(primary_key=True)
+    target_id: int
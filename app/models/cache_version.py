@@ -0,0 +1,11 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class CacheVersion(SQLModel, table=True):
+    __tablename__ = "cache_versions"
+
+    # Bumped on every write to the cached table
+    name: str = Field(primary_key=True, max_length=50)
+    version: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
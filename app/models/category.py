@@ -12,5 +12,8 @@ class Category(SQLModel, table=True):
     description: Optional[str] = None
     icon: Optional[str] = Field(default=None, max_length=50)
     position: int = Field(default=0)
+    # Maintained by StatsService when threads or posts are added or removed
+    thread_count: int = Field(default=0)
+    post_count: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
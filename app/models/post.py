@@ -1,10 +1,17 @@
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Index
 from typing import Optional
 from datetime import datetime
 
 
 class Post(SQLModel, table=True):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_thread_id_created_at_id",
+              "thread_id", "created_at", "id"),
+        # Search index sync
+        Index("ix_posts_updated_at", "updated_at"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int
     thread_id: int = Field(foreign_key="threads.id")
@@ -0,0 +1,13 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class SearchTombstone(SQLModel, table=True):
+    __tablename__ = "search_tombstones"
+
+    # A deleted thread or post, for the search indexes of other workers
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(max_length=20)
+    row_id: int
+    deleted_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -1,9 +1,15 @@
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Index
 from typing import Optional
 from datetime import datetime
 
 class Thread(SQLModel, table=True):
     __tablename__ = "threads"
+    __table_args__ = (
+        Index("ix_threads_created_at_id", "created_at", "id"),
+        Index("ix_threads_last_post_at_id", "last_post_at", "id"),
+        # Search index sync
+        Index("ix_threads_updated_at", "updated_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
@@ -14,6 +20,10 @@ class Thread(SQLModel, table=True):
     is_pinned: bool = False
     is_locked: bool = Field(default=False)
     is_closed: bool = Field(default=False)
+    # Maintained by StatsService when posts are added or removed
+    post_count: int = Field(default=0)
     last_post_at: Optional[datetime] = None
+    last_post_user_id: Optional[int] = Field(
+        default=None, foreign_key="users.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
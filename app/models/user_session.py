@@ -1,15 +1,21 @@
-from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import BINARY
+from sqlmodel import SQLModel, Field, Index, Relationship
 from typing import Optional
 from datetime import datetime
 
 class UserSession(SQLModel, table=True):
     __tablename__ = "user_sessions"
+    __table_args__ = (
+        Index("ix_user_sessions_user_id_is_active", "user_id", "is_active"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
-    refresh_token_hash: str
+    # SHA-256 of the refresh token
+    refresh_token_digest: bytes = Field(sa_type=BINARY(32), index=True)
     user_agent: Optional[str] = None
     ip_address: Optional[str] = None
     is_active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    expires_at: datetime
+    expires_at: datetime = Field(index=True)
+    revoked_at: Optional[datetime] = Field(default=None, index=True)
@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class PostVote(SQLModel, table=True):
+    __tablename__ = "post_votes"
+
+    # One vote per user per post
+    post_id: int = Field(foreign_key="posts.id", primary_key=True)
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    value: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Annotated, Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, Field
+
+
+# One JSONL line each. `id` and the references are ids from the source
+# forum; parents must come before the rows referring to them.
+class UserImport(BaseModel):
+    type: Literal["user"]
+    id: int
+    username: str = Field(max_length=50)
+    email: str = Field(max_length=255)
+    password_hash: str = Field(max_length=255)
+    title: Optional[str] = Field(default=None, max_length=100)
+    avatar_url: Optional[str] = Field(default=None, max_length=255)
+    bio: Optional[str] = None
+    reputation: int = 0
+    level: str = Field(default="Member", max_length=50)
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CategoryImport(BaseModel):
+    type: Literal["category"]
+    id: int
+    name: str = Field(max_length=100)
+    slug: str = Field(max_length=100)
+    description: Optional[str] = None
+    icon: Optional[str] = Field(default=None, max_length=50)
+    position: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ThreadImport(BaseModel):
+    type: Literal["thread"]
+    id: int
+    user_id: int
+    category_id: int
+    title: str = Field(max_length=255)
+    slug: str = Field(max_length=255)
+    view_count: int = 0
+    is_pinned: bool = False
+    is_locked: bool = False
+    is_closed: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PostImport(BaseModel):
+    type: Literal["post"]
+    id: int
+    user_id: int
+    thread_id: int
+    content: str = Field(max_length=2000)
+    is_edited: bool = False
+    edited_at: Optional[datetime] = None
+    edited_by: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+ImportRecord = Annotated[
+    Union[UserImport, CategoryImport, ThreadImport, PostImport],
+    Field(discriminator="type")
+]
+
+
+class ImportLineError(BaseModel):
+    line: int
+    message: str
+
+
+class ImportResult(BaseModel):
+    job: str
+    # Lines already committed by an earlier run of the job
+    resumed_from: int
+    lines: int
+    inserted: Dict[str, int]
+    skipped: int
+    # The first IMPORT_MAX_REPORTED_ERRORS of them
+    errors: List[ImportLineError]
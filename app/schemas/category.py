@@ -16,6 +16,8 @@ class CategoryRead(BaseModel):
     description: Optional[str] = None
     icon: Optional[str] = None
     position: int = 0
+    thread_count: int = 0
+    post_count: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,18 @@
+from typing import List, Literal
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    type: Literal["thread", "post"]
+    id: int
+    thread_id: int
+    category_id: int
+    title: str
+    # Start of the post content around the first match, empty for threads
+    snippet: str
+    score: float
+
+
+class SearchResults(BaseModel):
+    items: List[SearchHit]
+    total: int
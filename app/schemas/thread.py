@@ -1,5 +1,10 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Dict, Optional
+from app.models.post import Post
+from app.models.thread import Thread
+from app.schemas.pagination import BidirectionalCursorPage
+from app.schemas.user import UserSummary
 
 
 class ThreadCreate(BaseModel):
@@ -14,6 +19,9 @@ class ThreadRead(BaseModel):
     user_id: int
     category_id: int
     view_count: int
+    post_count: int
+    last_post_at: Optional[datetime] = None
+    last_post_user_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -22,3 +30,10 @@ class ThreadUpdate(BaseModel):
     title: str
     category_id: int
     updated_at: datetime
+
+
+class ThreadFull(BaseModel):
+    thread: Thread
+    posts: BidirectionalCursorPage[Post]
+    # Everyone the thread and the page of posts refer to, by user id
+    authors: Dict[int, UserSummary]
@@ -35,3 +35,11 @@ class UserRead(BaseModel):
     last_seen: Optional[datetime] = None
     is_active: bool
     created_at: datetime
+
+
+class UserSummary(BaseModel):
+    id: int
+    username: str
+    avatar_url: Optional[str] = None
+    level: str
+    reputation: int
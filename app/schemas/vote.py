@@ -0,0 +1,14 @@
+from typing import Literal
+from pydantic import BaseModel
+
+
+class VoteCreate(BaseModel):
+    # 0 withdraws the current vote
+    value: Literal[-1, 0, 1]
+
+
+class VoteRead(BaseModel):
+    post_id: int
+    value: int
+    upvote_count: int
+    downvote_count: int
@@ -1,40 +1,59 @@
+import hmac
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import HTTPException, Request, status
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlmodel import Session, select
+from sqlmodel import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.user import User
 from app.models.user_session import UserSession
 from app.schemas.auth import TokenResponse
-from app.utils.auth import create_token, get_token_hash
+from app.utils.auth import (
+    create_token,
+    get_token_digest,
+    invalidate_cached_session
+)
+from app.utils.password import password_hasher
+from app.utils.revocation import revoked_sessions
 from app.core.config import (
     SECRET_KEY,
     ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
-    REFRESH_TOKEN_EXPIRE_DAYS
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    SESSION_REAP_BATCH_SIZE
 )
 
 
 class AuthService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
     # ---------- User Authentication ----------
-    def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
-
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
-
-    def register_user(self, email: str, username: str, password: str) -> dict:
-        user_exists = self.session.exec(
+    async def hash_password(self, password: str) -> str:
+        return await password_hasher.hash(password)
+
+    async def verify_password(
+        self,
+        plain_password: str,
+        hashed_password: str
+    ) -> bool:
+        valid, _ = await password_hasher.verify_and_update(
+            plain_password, hashed_password)
+        return valid
+
+    async def register_user(
+        self,
+        email: str,
+        username: str,
+        password: str
+    ) -> dict:
+        user_exists = (await self.session.exec(
             select(User).where((User.email == email)
                                | (User.username == username))
-        ).first()
+        )).first()
 
         if user_exists:
             raise HTTPException(
@@ -44,81 +63,121 @@ class AuthService:
         user = User(
             email=email,
             username=username,
-            password_hash=self.hash_password(password)
+            password_hash=await self.hash_password(password)
         )
 
         self.session.add(user)
-        self.session.commit()
-        self.session.refresh(user)
+        await self.session.commit()
 
         return {"id": user.id, "username": user.username, "email": user.email}
 
-    def authenticate_user(self, email: str, password: str) -> Optional[User]:
-        user = self.session.exec(
-            select(User).where(User.email == email)).first()
+    async def authenticate_user(
+        self,
+        email: str,
+        password: str
+    ) -> Optional[User]:
+        user = (await self.session.exec(
+            select(User).where(User.email == email))).first()
 
-        if not user or not self.verify_password(password, user.password_hash):
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
 
+        valid, new_hash = await password_hasher.verify_and_update(
+            password, user.password_hash)
+        if not valid:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid credentials"
+            )
+
+        # Stored hash predates the current cost parameters
+        if new_hash:
+            user.password_hash = new_hash
+            self.session.add(user)
+            await self.session.commit()
+
         return user
 
     # ---------- Token Handling ----------
-    def _generate_tokens(self, user_id: int) -> tuple[str, str, datetime]:
+    def _generate_tokens(
+        self,
+        user_id: int,
+        session_id: int
+    ) -> tuple[str, str, datetime]:
+        # The session id lets access tokens be verified and revoked
+        # without looking up the refresh token
         access_token, _ = create_token(
-            {"sub": str(user_id)},
+            {"sub": str(user_id), "sid": session_id, "type": "access"},
             timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         )
+        # jti keeps a rotated refresh token distinct from the previous one
+        # even when both are issued within the same second
         refresh_token, refresh_exp = create_token(
-            {"sub": str(user_id)},
+            {
+                "sub": str(user_id),
+                "sid": session_id,
+                "type": "refresh",
+                "jti": secrets.token_hex(16),
+            },
             timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
         )
         return access_token, refresh_token, refresh_exp
 
-    def login_user(self, user: User, request: Request) -> TokenResponse:
-        access_token, refresh_token, refresh_expires = self._generate_tokens(
-            user.id)
-
+    async def login_user(self, user: User, request: Request) -> TokenResponse:
+        # Flushed before the tokens are created so they can carry its id
         session = UserSession(
             user_id=user.id,
-            refresh_token_hash=get_token_hash(refresh_token),
+            refresh_token_digest=bytes(32),
             ip_address=request.client.host if request.client else "unknown",
             user_agent=request.headers.get("User-Agent", "unknown"),
             is_active=True,
             created_at=datetime.utcnow(),
-            expires_at=refresh_expires
+            expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
         )
 
         self.session.add(session)
-        self.session.commit()
+        await self.session.flush()
+
+        access_token, refresh_token, refresh_expires = self._generate_tokens(
+            user.id, session.id)
+        session.refresh_token_digest = get_token_digest(refresh_token)
+        session.expires_at = refresh_expires
+        await self.session.commit()
 
         return TokenResponse(
             access_token=access_token,
             refresh_token=refresh_token
         )
 
-    def refresh_token(self, refresh_token: str) -> TokenResponse:
-        user_id = self._get_user_id_from_token(refresh_token)
+    async def refresh_token(self, refresh_token: str) -> TokenResponse:
+        user_id, session_id = self._decode_refresh_token(refresh_token)
 
-        session = self._get_active_session(user_id, refresh_token)
+        session = await self._get_active_session(
+            user_id, session_id, refresh_token)
 
         new_access_token, new_refresh_token, new_expiry = self._generate_tokens(
-            user_id)
+            user_id, session.id)
 
-        session.refresh_token_hash = get_token_hash(new_refresh_token)
+        invalidate_cached_session(user_id, session.id)
+        session.refresh_token_digest = get_token_digest(new_refresh_token)
         session.expires_at = new_expiry
         self.session.add(session)
-        self.session.commit()
+        await self.session.commit()
 
         return TokenResponse(
             access_token=new_access_token,
             refresh_token=new_refresh_token
         )
 
-    def logout_user(self, refresh_token: str, current_user: User) -> dict:
-        user_id = self._get_user_id_from_token(refresh_token)
+    async def logout_user(
+        self,
+        refresh_token: str,
+        current_user: User
+    ) -> dict:
+        user_id, session_id = self._decode_refresh_token(refresh_token)
 
         if user_id != current_user.id:
             raise HTTPException(
@@ -126,36 +185,111 @@ class AuthService:
                 detail="User not authorized to logout this session."
             )
 
-        session = self._get_active_session(user_id, refresh_token)
+        session = await self._get_active_session(
+            user_id, session_id, refresh_token)
 
         session.is_active = False
+        session.revoked_at = datetime.utcnow()
         self.session.add(session)
-        self.session.commit()
+        await self.session.commit()
+
+        # Other workers pick the revocation up on their next sync
+        revoked_sessions.revoke(
+            session.id, until=self._access_token_deadline(session.revoked_at))
+        invalidate_cached_session(user_id, session.id)
 
         return {"message": "Successfully logged out."}
 
+    async def load_revoked_sessions(self) -> None:
+        since = datetime.utcnow() - timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        rows = (await self.session.exec(
+            select(UserSession.id, UserSession.revoked_at).where(
+                UserSession.revoked_at >= since)
+        )).all()
+
+        for session_id, revoked_at in rows:
+            revoked_sessions.revoke(
+                session_id, until=self._access_token_deadline(revoked_at))
+        revoked_sessions.purge()
+        revoked_sessions.last_sync = datetime.utcnow()
+
+    async def reap_sessions(
+        self,
+        batch_size: int = SESSION_REAP_BATCH_SIZE
+    ) -> int:
+        """
+        Deletes expired sessions, and revoked ones once their access tokens
+        can no longer be presented, committing after every batch so no
+        lock is held for long. Returns the number of deleted rows.
+        """
+        now = datetime.utcnow()
+        revoked_before = now - timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        deleted = 0
+
+        for condition in (
+            UserSession.expires_at < now,
+            UserSession.revoked_at < revoked_before,
+        ):
+            while True:
+                ids = (await self.session.exec(
+                    select(UserSession.id).where(condition).limit(batch_size)
+                )).all()
+                if not ids:
+                    break
+
+                await self.session.exec(
+                    delete(UserSession).where(UserSession.id.in_(ids)))
+                await self.session.commit()
+                deleted += len(ids)
+
+                if len(ids) < batch_size:
+                    break
+
+        return deleted
+
     # ---------- Helpers ----------
-    def _get_user_id_from_token(self, token: str) -> int:
+    def _access_token_deadline(self, revoked_at: datetime) -> datetime:
+        return revoked_at + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    def _decode_refresh_token(self, token: str) -> tuple[int, Optional[int]]:
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             user_id = int(payload.get("sub"))
-            return user_id
+            session_id = payload.get("sid")
+            return user_id, int(session_id) if session_id is not None else None
         except (JWTError, TypeError, ValueError):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token."
             )
 
-    def _get_active_session(self, user_id: int, refresh_token: str) -> UserSession:
-        token_hash = get_token_hash(refresh_token)
-
-        session = self.session.exec(
-            select(UserSession).where(
-                UserSession.user_id == user_id,
-                UserSession.refresh_token_hash == token_hash,
-                UserSession.is_active == True
-            )
-        ).first()
+    async def _get_active_session(
+        self,
+        user_id: int,
+        session_id: Optional[int],
+        refresh_token: str
+    ) -> UserSession:
+        token_digest = get_token_digest(refresh_token)
+
+        if session_id is not None:
+            session = await self.session.get(UserSession, session_id)
+            # The digest check rejects refresh tokens that were rotated out
+            if session and not (
+                session.user_id == user_id
+                and session.is_active
+                and hmac.compare_digest(
+                    session.refresh_token_digest, token_digest)
+            ):
+                session = None
+        else:
+            # Refresh tokens issued before they carried the session id
+            session = (await self.session.exec(
+                select(UserSession).where(
+                    UserSession.refresh_token_digest == token_digest,
+                    UserSession.user_id == user_id,
+                    UserSession.is_active == True
+                )
+            )).first()
 
         if not session:
             raise HTTPException(
@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models.cache_version import CacheVersion
+
+
+class CacheVersionService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, name: str) -> int:
+        version = (await self.session.exec(
+            select(CacheVersion.version).where(CacheVersion.name == name)
+        )).first()
+        return version or 0
+
+    async def bump(self, name: str) -> None:
+        """Part of the caller's transaction, which commits it."""
+        result = await self.session.exec(
+            update(CacheVersion)
+            .where(CacheVersion.name == name)
+            .values(version=CacheVersion.version + 1,
+                    updated_at=datetime.utcnow())
+        )
+        if result.rowcount == 0:
+            self.session.add(CacheVersion(name=name, version=1))
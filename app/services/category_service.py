@@ -1,17 +1,41 @@
-from sqlmodel import Session, select
+from datetime import datetime
+from typing import AsyncIterator, List, Sequence
+from pydantic import TypeAdapter
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
 from app.models.category import Category
-from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.schemas.category import CategoryCreate, CategoryRead, CategoryUpdate
+from app.services.cache_version_service import CacheVersionService
+from app.utils.compression import encode_all
+from app.utils.conditional import CachedBody, Validators, make_etag
+from app.utils.versioned_cache import category_cache
+
+# Validated once per cache miss, which also puts the keys in field order
+CATEGORY_JSON = TypeAdapter(CategoryRead)
+CATEGORY_LIST_JSON = TypeAdapter(List[CategoryRead])
+
+
+def cache_body(adapter: TypeAdapter, value) -> CachedBody:
+    validated = adapter.validate_python(value, from_attributes=True)
+    body = adapter.dump_json(validated)
+    # Lists only get an ETag, as deleting a row does not move their
+    # newest updated_at
+    last_modified = None
+    if not isinstance(validated, list):
+        last_modified = validated.updated_at
+    return CachedBody(
+        body, Validators(make_etag(body), last_modified), encode_all(body))
 
 
 class CategoryService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def get_by_id(self, category_id: int) -> Category:
-        category = self.session.exec(
+    async def get_by_id(self, category_id: int) -> Category:
+        category = (await self.session.exec(
             select(Category).where(Category.id == category_id)
-        ).first()
+        )).first()
 
         if not category:
             raise HTTPException(
@@ -21,19 +45,56 @@ class CategoryService:
 
         return category
 
-    def get_all(self) -> list[Category]:
-        return self.session.exec(select(Category)).all()
+    async def get_all(self) -> list[Category]:
+        return (await self.session.exec(select(Category))).all()
+
+    # ---------- Cached JSON ----------
+    async def get_all_cached(self) -> CachedBody:
+        await self._sync_cache()
+        cached = category_cache.get("all")
+        if cached is None:
+            cached = cache_body(CATEGORY_LIST_JSON, await self.get_all())
+            category_cache.set("all", cached)
+        return cached
+
+    async def get_cached_by_id(self, category_id: int) -> CachedBody:
+        await self._sync_cache()
+        cached = category_cache.get(category_id)
+        if cached is None:
+            cached = cache_body(
+                CATEGORY_JSON, await self.get_by_id(category_id))
+            category_cache.set(category_id, cached)
+        return cached
+
+    async def _sync_cache(self) -> None:
+        if category_cache.needs_check():
+            category_cache.sync(
+                await CacheVersionService(self.session).get(category_cache.name))
+
+    async def stream_all(
+        self,
+        batch_size: int = 500
+    ) -> AsyncIterator[Sequence[Category]]:
+        statement = select(Category).order_by(Category.id)
+        result = await self.session.stream_scalars(
+            statement.execution_options(yield_per=batch_size))
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
 
-    def get_paginated(self, skip: int = 0, limit: int = 10) -> list[Category]:
-        return self.session.exec(select(Category).offset(skip).limit(limit)).all()
+    async def get_paginated(self, skip: int = 0, limit: int = 10) -> list[Category]:
+        return (await self.session.exec(
+            select(Category).offset(skip).limit(limit))).all()
 
-    def exists(self, name: str) -> bool:
-        return self.session.exec(
+    async def exists(self, name: str) -> bool:
+        return (await self.session.exec(
             select(Category).where(Category.name == name)
-        ).first() is not None
+        )).first() is not None
 
-    def create(self, data: CategoryCreate) -> Category:
-        if self.exists(data.name):
+    async def create(self, data: CategoryCreate) -> Category:
+        if await self.exists(data.name):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category already exists"
@@ -41,23 +102,28 @@ class CategoryService:
 
         new_category = Category(**data.model_dump())
         self.session.add(new_category)
-        self.session.commit()
-        self.session.refresh(new_category)
+        await CacheVersionService(self.session).bump(category_cache.name)
+        await self.session.commit()
+        category_cache.invalidate()
         return new_category
 
-    def update(self, category_id: int, data: CategoryUpdate) -> Category:
-        category = self.get_by_id(category_id)
+    async def update(self, category_id: int, data: CategoryUpdate) -> Category:
+        category = await self.get_by_id(category_id)
 
         for field, value in data.model_dump(exclude_unset=True).items():
             setattr(category, field, value)
+        category.updated_at = datetime.utcnow()
 
         self.session.add(category)
-        self.session.commit()
-        self.session.refresh(category)
+        await CacheVersionService(self.session).bump(category_cache.name)
+        await self.session.commit()
+        category_cache.invalidate()
         return category
 
-    def delete(self, category_id: int) -> None:
-        category = self.get_by_id(category_id)
+    async def delete(self, category_id: int) -> None:
+        category = await self.get_by_id(category_id)
 
-        self.session.delete(category)
-        self.session.commit()
+        await self.session.delete(category)
+        await CacheVersionService(self.session).bump(category_cache.name)
+        await self.session.commit()
+        category_cache.invalidate()
@@ -0,0 +1,230 @@
+from datetime import datetime
+from typing import AsyncIterable, Dict, List, Tuple
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import IMPORT_CHUNK_SIZE, IMPORT_MAX_REPORTED_ERRORS
+from app.models.bulk_import import ImportCheckpoint, ImportIdMap
+from app.models.category import Category
+from app.models.post import Post
+from app.models.thread import Thread
+from app.models.user import User
+from app.schemas.bulk import ImportLineError, ImportRecord, ImportResult
+from app.services.cache_version_service import CacheVersionService
+from app.services.stats_service import StatsService
+from app.utils.search import SEARCH_VERSION
+from app.utils.service_cache import thread_page_cache, user_cache
+from app.utils.versioned_cache import category_cache
+
+RECORD = TypeAdapter(ImportRecord)
+
+# Insert order within a chunk, and the references each kind remaps
+KINDS: Dict[str, Tuple[type[SQLModel], Dict[str, str]]] = {
+    "user": (User, {}),
+    "category": (Category, {}),
+    "thread": (Thread, {"user_id": "user", "category_id": "category"}),
+    "post": (Post, {"user_id": "user", "thread_id": "thread",
+                    "edited_by": "user"}),
+}
+
+# Only these need their ids kept for later chunks and resumed runs
+REFERENCED_KINDS = {
+    parent for _, references in KINDS.values() for parent in references.values()
+}
+
+# A chunk whose ids were taken by a concurrent insert is tried again
+CHUNK_ATTEMPTS = 3
+
+
+class ImportService:
+    """
+    Bulk import of forum history from JSONL. Ids are allocated after the
+    current maximum and recorded per job, rows are written with one
+    multi-row INSERT per kind and chunk, and denormalized counters are
+    recomputed once at the end.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def run(
+        self,
+        job: str,
+        lines: AsyncIterable[bytes],
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        recompute: bool = True
+    ) -> ImportResult:
+        if not 0 < len(job) <= 100 or chunk_size < 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Job names take 1-100 characters and chunk_size >= 1"
+            )
+
+        checkpoint = await self.session.get(ImportCheckpoint, job)
+        resumed_from = checkpoint.line if checkpoint else 0
+        id_maps = await self._load_id_maps(job)
+        result = ImportResult(
+            job=job,
+            resumed_from=resumed_from,
+            lines=resumed_from,
+            inserted={kind: 0 for kind in KINDS},
+            skipped=0,
+            errors=[]
+        )
+
+        chunk: List[Tuple[int, bytes]] = []
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if line_number <= resumed_from or not line.strip():
+                continue
+            chunk.append((line_number, line))
+            if len(chunk) >= chunk_size:
+                await self._import_chunk(job, chunk, id_maps, result)
+                chunk = []
+        if chunk:
+            await self._import_chunk(job, chunk, id_maps, result)
+
+        if recompute:
+            await StatsService(self.session).recompute()
+        versions = CacheVersionService(self.session)
+        await versions.bump(category_cache.name)
+        # Imported rows keep their own updated_at, which the search sync
+        # of every worker has already passed
+        await versions.bump(SEARCH_VERSION)
+        await self.session.commit()
+        category_cache.invalidate()
+        thread_page_cache.invalidate()
+        user_cache.invalidate()
+        return result
+
+    async def _load_id_maps(self, job: str) -> Dict[str, Dict[int, int]]:
+        id_maps = {kind: {} for kind in KINDS}
+        rows = await self.session.exec(
+            select(ImportIdMap.kind, ImportIdMap.source_id,
+                   ImportIdMap.target_id)
+            .where(ImportIdMap.job == job)
+        )
+        for kind, source_id, target_id in rows:
+            id_maps[kind][source_id] = target_id
+        return id_maps
+
+    async def _import_chunk(
+        self,
+        job: str,
+        chunk: List[Tuple[int, bytes]],
+        id_maps: Dict[str, Dict[int, int]],
+        result: ImportResult
+    ) -> None:
+        records = {kind: [] for kind in KINDS}
+        errors = []
+        for line_number, line in chunk:
+            try:
+                record = RECORD.validate_json(line)
+            except ValidationError as exc:
+                error = exc.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                errors.append((line_number, f"{location}: {error['msg']}"))
+                continue
+            records[record.type].append((line_number, record))
+
+        for attempt in range(CHUNK_ATTEMPTS):
+            new_ids = {kind: {} for kind in KINDS}
+            chunk_errors = list(errors)
+            inserted = {}
+            try:
+                for kind, rows in records.items():
+                    inserted[kind] = await self._insert(
+                        kind, rows, id_maps, new_ids, chunk_errors)
+                await self._save_progress(job, chunk[-1][0], new_ids)
+                await self.session.commit()
+                break
+            except IntegrityError as exc:
+                await self.session.rollback()
+                if attempt == CHUNK_ATTEMPTS - 1:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail=(f"Lines {chunk[0][0]}-{chunk[-1][0]} could "
+                                f"not be imported: {exc.orig}")
+                    )
+
+        for kind, ids in new_ids.items():
+            if kind in REFERENCED_KINDS:
+                id_maps[kind].update(ids)
+            result.inserted[kind] += inserted[kind]
+        result.lines = chunk[-1][0]
+        result.skipped += len(chunk_errors)
+        for line_number, message in chunk_errors:
+            if len(result.errors) < IMPORT_MAX_REPORTED_ERRORS:
+                result.errors.append(
+                    ImportLineError(line=line_number, message=message))
+
+    async def _insert(
+        self,
+        kind: str,
+        rows: list,
+        id_maps: Dict[str, Dict[int, int]],
+        new_ids: Dict[str, Dict[int, int]],
+        errors: list
+    ) -> int:
+        if not rows:
+            return 0
+        model, references = KINDS[kind]
+        next_id = (await self.session.exec(
+            select(func.coalesce(func.max(model.id), 0)))).one() + 1
+
+        values = []
+        for line_number, record in rows:
+            data = record.model_dump(exclude={"type", "id"})
+            missing = None
+            for field, parent in references.items():
+                source_id = data[field]
+                if source_id is None:
+                    continue
+                target_id = (new_ids[parent].get(source_id)
+                             or id_maps[parent].get(source_id))
+                if target_id is None:
+                    missing = f"Unknown {parent} {source_id}"
+                    break
+                data[field] = target_id
+            if missing:
+                errors.append((line_number, missing))
+                continue
+            # Posts are only checked within their chunk
+            if record.id in new_ids[kind] or record.id in id_maps[kind]:
+                errors.append((line_number, f"Duplicate {kind} {record.id}"))
+                continue
+
+            data["id"] = new_ids[kind][record.id] = next_id + len(values)
+            values.append(data)
+
+        if values:
+            # executemany, which drivers send as multi-row inserts
+            await self.session.exec(model.__table__.insert(), params=values)
+        return len(values)
+
+    async def _save_progress(
+        self,
+        job: str,
+        line: int,
+        new_ids: Dict[str, Dict[int, int]]
+    ) -> None:
+        id_rows = [
+            {"job": job, "kind": kind, "source_id": source_id,
+             "target_id": target_id}
+            for kind, ids in new_ids.items() if kind in REFERENCED_KINDS
+            for source_id, target_id in ids.items()
+        ]
+        if id_rows:
+            await self.session.exec(
+                ImportIdMap.__table__.insert(), params=id_rows)
+
+        checkpoint = await self.session.get(ImportCheckpoint, job)
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint(job=job)
+        checkpoint.line = line
+        checkpoint.updated_at = datetime.utcnow()
+        self.session.add(checkpoint)
@@ -1,17 +1,41 @@
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence
 from fastapi import HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.post import Post
+from app.models.search_tombstone import SearchTombstone
+from app.models.vote import PostVote
+from app.schemas.pagination import BidirectionalCursorPage, CursorPage
 from app.schemas.post import PostCreate, PostUpdate
+from app.services.stats_service import StatsService
+from app.utils.counters import post_votes
+from app.utils.conditional import POST_VERSION_FIELDS
+from app.utils.search import POST, search_index
+from app.utils.service_cache import thread_page_cache
+from app.utils.pagination import (
+    decode_cursor,
+    encode_cursor,
+    seek_after,
+    seek_before
+)
+
+# Enough for a page's validators and cursors, without loading the rows
+VERSION_COLUMNS = [getattr(Post, f) for f in POST_VERSION_FIELDS] + [
+    Post.created_at]
+
+
+def select_posts(versions_only: bool = False):
+    return select(*VERSION_COLUMNS) if versions_only else select(Post)
 
 
 class PostService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def get_by_id(self, post_id: int) -> Post:
-        post = self.session.exec(
-            select(Post).where(Post.id == post_id)).first()
+    async def get_by_id(self, post_id: int) -> Post:
+        post = (await self.session.exec(
+            select(Post).where(Post.id == post_id))).first()
         if not post:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -19,21 +43,150 @@ class PostService:
             )
         return post
 
-    def get_all(self) -> List[Post]:
-        return self.session.exec(select(Post)).all()
+    async def get_version(self, post_id: int):
+        """Only the columns the post's validators are built from."""
+        version = (await self.session.exec(
+            select(*(getattr(Post, f) for f in POST_VERSION_FIELDS))
+            .where(Post.id == post_id)
+        )).first()
+        if not version:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found"
+            )
+        return version
+
+    async def get_all(self) -> List[Post]:
+        return (await self.session.exec(select(Post))).all()
+
+    async def stream_all(
+        self,
+        batch_size: int = 500
+    ) -> AsyncIterator[Sequence[Post]]:
+        statement = select(Post).order_by(Post.id)
+        result = await self.session.stream_scalars(
+            statement.execution_options(yield_per=batch_size))
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+
+    async def get_paginated(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        versions_only: bool = False
+    ) -> List[Post]:
+        return (await self.session.exec(
+            select_posts(versions_only)
+            .order_by(Post.id).offset(skip).limit(limit))).all()
+
+    async def get_by_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        versions_only: bool = False
+    ) -> CursorPage[Post]:
+        """
+        With `versions_only`, items are rows of VERSION_COLUMNS, for
+        answering conditional requests without loading whole posts.
+        """
+        statement = select_posts(versions_only).order_by(
+            Post.created_at.desc(), Post.id.desc())
+
+        if cursor:
+            created_at, post_id = decode_cursor(cursor, "created_at")
+            statement = statement.where(seek_before(
+                Post.created_at, Post.id, created_at, post_id))
+
+        posts = (await self.session.exec(statement.limit(limit + 1))).all()
+
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            last = posts[-1]
+            next_cursor = encode_cursor("created_at", last.created_at, last.id)
+
+        if versions_only:
+            return CursorPage[Post].model_construct(
+                items=posts, next_cursor=next_cursor)
+        return CursorPage[Post](items=posts, next_cursor=next_cursor)
+
+    async def get_by_thread(
+        self,
+        thread_id: int,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        limit: int = 20,
+        versions_only: bool = False
+    ) -> BidirectionalCursorPage[Post]:
+        if after and before:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either 'after' or 'before', not both"
+            )
+
+        # Posts are returned oldest first. Paging backwards walks the
+        # (thread_id, created_at, id) index in reverse and flips the page.
+        statement = select_posts(versions_only).where(
+            Post.thread_id == thread_id)
+        if before:
+            created_at, post_id = decode_cursor(before, "created_at")
+            statement = statement.where(seek_before(
+                Post.created_at, Post.id, created_at, post_id
+            )).order_by(Post.created_at.desc(), Post.id.desc())
+        else:
+            statement = statement.order_by(Post.created_at, Post.id)
+            if after:
+                created_at, post_id = decode_cursor(after, "created_at")
+                statement = statement.where(seek_after(
+                    Post.created_at, Post.id, created_at, post_id))
+
+        posts = (await self.session.exec(statement.limit(limit + 1))).all()
+        has_more = len(posts) > limit
+        posts = posts[:limit]
+        if before:
+            posts.reverse()
+            has_prev, has_next = has_more, True
+        else:
+            has_prev, has_next = bool(after), has_more
+
+        next_cursor = prev_cursor = None
+        if posts:
+            first, last = posts[0], posts[-1]
+            if has_prev:
+                prev_cursor = encode_cursor(
+                    "created_at", first.created_at, first.id)
+            if has_next:
+                next_cursor = encode_cursor(
+                    "created_at", last.created_at, last.id)
 
-    def get_paginated(self, skip: int = 0, limit: int = 10) -> List[Post]:
-        return self.session.exec(select(Post).offset(skip).limit(limit)).all()
+        if versions_only:
+            return BidirectionalCursorPage[Post].model_construct(
+                items=posts, next_cursor=next_cursor, prev_cursor=prev_cursor)
+        return BidirectionalCursorPage[Post](
+            items=posts,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor
+        )
 
-    def create(self, data: PostCreate, user_id: int) -> Post:
+    async def create(self, data: PostCreate, user_id: int) -> Post:
         new_post = Post(**data.model_dump(), user_id=user_id)
         self.session.add(new_post)
-        self.session.commit()
-        self.session.refresh(new_post)
+        await StatsService(self.session).post_added(new_post)
+        await self.session.commit()
+        search_index.add_post(new_post)
+        thread_page_cache.invalidate()
         return new_post
 
-    def update(self, post_id: int, data: PostUpdate, user_id: int) -> Post:
-        post = self.get_by_id(post_id)
+    async def update(
+        self,
+        post_id: int,
+        data: PostUpdate,
+        user_id: int
+    ) -> Post:
+        post = await self.get_by_id(post_id)
 
         if post.user_id != user_id:
             raise HTTPException(
@@ -43,14 +196,15 @@ class PostService:
 
         for field, value in data.dict(exclude_unset=True).items():
             setattr(post, field, value)
+        post.updated_at = datetime.utcnow()
 
         self.session.add(post)
-        self.session.commit()
-        self.session.refresh(post)
+        await self.session.commit()
+        search_index.add_post(post)
         return post
 
-    def delete(self, post_id: int, user_id: int) -> None:
-        post = self.get_by_id(post_id)
+    async def delete(self, post_id: int, user_id: int) -> None:
+        post = await self.get_by_id(post_id)
 
         if post.user_id != user_id:
             raise HTTPException(
@@ -58,5 +212,14 @@ class PostService:
                 detail="Not authorized to delete this post"
             )
 
-        self.session.delete(post)
-        self.session.commit()
+        await StatsService(self.session).post_removed(post)
+        # Votes reference the post, so they go first
+        await self.session.exec(
+            delete(PostVote).where(PostVote.post_id == post_id))
+        await self.session.delete(post)
+        # For the search indexes of the other workers
+        self.session.add(SearchTombstone(kind=POST, row_id=post_id))
+        await self.session.commit()
+        search_index.remove_post(post_id)
+        post_votes.discard(post_id)
+        thread_page_cache.invalidate()
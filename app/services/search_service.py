@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+from fastapi import HTTPException, status
+from sqlmodel import SQLModel, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import (
+    SEARCH_INDEX_SYNC_OVERLAP_SECONDS,
+    SEARCH_MAX_LIMIT,
+    SEARCH_TOMBSTONE_RETENTION_DAYS
+)
+from app.models.post import Post
+from app.models.search_tombstone import SearchTombstone
+from app.models.thread import Thread
+from app.schemas.search import SearchHit, SearchResults
+from app.services.cache_version_service import CacheVersionService
+from app.utils.search import (
+    POST,
+    SEARCH_VERSION,
+    THREAD,
+    SearchIndex,
+    make_snippet,
+    search_index,
+    tokenize
+)
+
+
+class SearchService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def search(
+        self,
+        query: str,
+        category_id: int | None = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> SearchResults:
+        if not tokenize(query):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search query has no searchable terms"
+            )
+        if skip < 0 or not 0 < limit <= SEARCH_MAX_LIMIT:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"'skip' must be >= 0 and 'limit' 1-{SEARCH_MAX_LIMIT}"
+            )
+
+        total, page = search_index.search(query, category_id, skip, limit)
+
+        # The rows, not the index, provide what is returned
+        post_ids = [row_id for (kind, row_id), _ in page if kind == POST]
+        posts = await self._get_by_ids(Post, post_ids)
+        thread_ids = {row_id for (kind, row_id), _ in page if kind == THREAD}
+        thread_ids.update(post.thread_id for post in posts.values())
+        threads = await self._get_by_ids(Thread, thread_ids)
+
+        items = []
+        for (kind, row_id), score in page:
+            post = posts.get(row_id) if kind == POST else None
+            thread = threads.get(post.thread_id if post else row_id)
+            if thread is None or (kind == POST and post is None):
+                # Deleted through another worker since it was indexed
+                if kind == POST:
+                    search_index.remove_post(row_id)
+                else:
+                    search_index.remove_thread(row_id)
+                total -= 1
+                continue
+
+            items.append(SearchHit(
+                type=kind,
+                id=row_id,
+                thread_id=thread.id,
+                category_id=thread.category_id,
+                title=thread.title,
+                snippet=make_snippet(post.content, query) if post else "",
+                score=score
+            ))
+
+        return SearchResults(items=items, total=total)
+
+    async def _get_by_ids(self, model: type[SQLModel], ids) -> dict:
+        if not ids:
+            return {}
+        rows = (await self.session.exec(
+            select(model).where(model.id.in_(ids)))).all()
+        return {row.id: row for row in rows}
+
+    # ---------- Indexing ----------
+    async def index_changes(
+        self,
+        index: SearchIndex = search_index,
+        batch_size: int = 1000
+    ) -> int:
+        """
+        Indexes the threads and posts updated since the index watermark,
+        or all of them for an empty index, and drops those deleted since.
+        An index behind the search version is rebuilt. Returns the number
+        of rows indexed.
+        """
+        version = await CacheVersionService(self.session).get(SEARCH_VERSION)
+        if index.watermark is not None and index.version != version:
+            index.replace(await self.rebuild(batch_size))
+            return len(index)
+
+        since = index.watermark
+        started = datetime.utcnow()
+        indexed = 0
+        if since is not None:
+            # Before the updates, as a deleted id can be taken again
+            tombstones = await self.session.exec(
+                select(SearchTombstone.kind, SearchTombstone.row_id)
+                .where(SearchTombstone.deleted_at >= since))
+            for kind, row_id in tombstones:
+                if kind == POST:
+                    index.remove_post(row_id)
+                else:
+                    index.remove_thread(row_id)
+        for model, add in ((Thread, index.add_thread), (Post, index.add_post)):
+            statement = select(model).order_by(model.id)
+            if since is not None:
+                statement = statement.where(model.updated_at >= since)
+            result = await self.session.stream_scalars(
+                statement.execution_options(yield_per=batch_size))
+            try:
+                async for partition in result.partitions():
+                    for row in partition:
+                        add(row)
+                    indexed += len(partition)
+            finally:
+                await result.close()
+
+        index.watermark = started - timedelta(
+            seconds=SEARCH_INDEX_SYNC_OVERLAP_SECONDS)
+        index.version = version
+        return indexed
+
+    async def rebuild(self, batch_size: int = 1000) -> SearchIndex:
+        """A new index over every thread and post, for `replace`."""
+        index = SearchIndex()
+        await self.index_changes(index, batch_size)
+        return index
+
+    async def reap_tombstones(self) -> None:
+        """Deletes tombstones older than any index kept in sync."""
+        cutoff = datetime.utcnow() - timedelta(
+            days=SEARCH_TOMBSTONE_RETENTION_DAYS)
+        await self.session.exec(
+            delete(SearchTombstone).where(SearchTombstone.deleted_at < cutoff))
+        await self.session.commit()
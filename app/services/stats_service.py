@@ -0,0 +1,151 @@
+from typing import Optional
+from sqlalchemy import func, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models.category import Category
+from app.models.post import Post
+from app.models.thread import Thread
+from app.models.vote import PostVote
+from app.utils.service_cache import thread_page_cache
+
+
+class StatsService:
+    """
+    Keeps the denormalized counters on threads and categories in step
+    with posts and threads. The incremental methods only issue UPDATEs
+    and leave committing to the caller, so they share its transaction.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    # ---------- Incremental updates ----------
+    async def post_added(self, post: Post) -> None:
+        await self._exec(
+            update(Thread).where(Thread.id == post.thread_id).values(
+                post_count=Thread.post_count + 1,
+                last_post_at=post.created_at,
+                last_post_user_id=post.user_id
+            )
+        )
+        await self._exec(
+            update(Category)
+            .where(Category.id == self._category_of(post.thread_id))
+            .values(post_count=Category.post_count + 1)
+        )
+
+    async def post_removed(self, post: Post) -> None:
+        # Served by ix_posts_thread_id_created_at_id
+        latest = (await self.session.exec(
+            select(Post.created_at, Post.user_id)
+            .where(Post.thread_id == post.thread_id, Post.id != post.id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(1)
+        )).first()
+
+        await self._exec(
+            update(Thread).where(Thread.id == post.thread_id).values(
+                post_count=Thread.post_count - 1,
+                last_post_at=latest[0] if latest else None,
+                last_post_user_id=latest[1] if latest else None
+            )
+        )
+        await self._exec(
+            update(Category)
+            .where(Category.id == self._category_of(post.thread_id))
+            .values(post_count=Category.post_count - 1)
+        )
+
+    async def thread_added(self, thread: Thread) -> None:
+        await self._move_thread(thread, None, thread.category_id)
+
+    async def thread_removed(self, thread: Thread) -> None:
+        await self._move_thread(thread, thread.category_id, None)
+
+    async def thread_moved(
+        self,
+        thread: Thread,
+        old_category_id: int
+    ) -> None:
+        if old_category_id != thread.category_id:
+            await self._move_thread(
+                thread, old_category_id, thread.category_id)
+
+    # ---------- Repair ----------
+    async def recompute(self, batch_size: int = 1000) -> None:
+        """
+        Recomputes every counter from the source rows with correlated
+        UPDATEs, one primary key range per transaction. Threads go
+        before categories, whose post_count is summed from them.
+        """
+        latest_post = (
+            select(Post.user_id)
+            .where(Post.thread_id == Thread.id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(1)
+        )
+        await self._recompute_in_batches(Thread, batch_size, {
+            "post_count": select(func.count(Post.id))
+            .where(Post.thread_id == Thread.id).scalar_subquery(),
+            "last_post_at": select(func.max(Post.created_at))
+            .where(Post.thread_id == Thread.id).scalar_subquery(),
+            "last_post_user_id": latest_post.scalar_subquery(),
+        })
+        await self._recompute_in_batches(Category, batch_size, {
+            "thread_count": select(func.count(Thread.id))
+            .where(Thread.category_id == Category.id).scalar_subquery(),
+            "post_count": select(func.coalesce(func.sum(Thread.post_count), 0))
+            .where(Thread.category_id == Category.id).scalar_subquery(),
+        })
+        await self._recompute_in_batches(Post, batch_size, {
+            "upvote_count": select(func.count())
+            .where(PostVote.post_id == Post.id, PostVote.value == 1)
+            .scalar_subquery(),
+            "downvote_count": select(func.count())
+            .where(PostVote.post_id == Post.id, PostVote.value == -1)
+            .scalar_subquery(),
+        })
+        thread_page_cache.invalidate()
+
+    # ---------- Helpers ----------
+    def _category_of(self, thread_id: int):
+        return select(Thread.category_id).where(
+            Thread.id == thread_id).scalar_subquery()
+
+    async def _move_thread(
+        self,
+        thread: Thread,
+        from_category_id: Optional[int],
+        to_category_id: Optional[int]
+    ) -> None:
+        for category_id, sign in ((from_category_id, -1), (to_category_id, 1)):
+            if category_id is None:
+                continue
+            await self._exec(
+                update(Category).where(Category.id == category_id).values(
+                    thread_count=Category.thread_count + sign,
+                    post_count=Category.post_count + sign * thread.post_count
+                )
+            )
+
+    async def _recompute_in_batches(
+        self,
+        model,
+        batch_size: int,
+        values: dict
+    ) -> None:
+        max_id = (await self.session.exec(select(func.max(model.id)))).one()
+        start = 0
+        while max_id is not None and start < max_id:
+            await self._exec(
+                update(model)
+                .where(model.id > start, model.id <= start + batch_size)
+                .values(values)
+            )
+            await self.session.commit()
+            start += batch_size
+
+    async def _exec(self, statement) -> None:
+        # Rows already loaded in the session are not refreshed
+        await self.session.exec(
+            statement.execution_options(synchronize_session=False))
@@ -1,17 +1,41 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from fastapi import HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.thread import Thread
-from app.schemas.thread import ThreadCreate, ThreadUpdate
+from app.models.search_tombstone import SearchTombstone
+from app.schemas.pagination import CursorPage
+from app.schemas.thread import ThreadCreate, ThreadFull, ThreadUpdate
+from app.services.post_service import PostService
+from app.services.stats_service import StatsService
+from app.services.user_service import UserService
+from app.utils.conditional import THREAD_VERSION_FIELDS
+from app.utils.pagination import decode_cursor, encode_cursor, seek_before
+from app.utils.search import THREAD, search_index
+from app.utils.service_cache import thread_page_cache
+
+SORT_COLUMNS = {
+    "created_at": Thread.created_at,
+    "last_post_at": Thread.last_post_at,
+}
+
+# Enough for a page's validators and cursors, without loading the rows
+VERSION_COLUMNS = [getattr(Thread, f) for f in THREAD_VERSION_FIELDS] + [
+    Thread.created_at]
+
+
+def select_threads(versions_only: bool = False):
+    return select(*VERSION_COLUMNS) if versions_only else select(Thread)
 
 
 class ThreadService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def get_by_id(self, thread_id: int) -> Thread:
-        thread = self.session.exec(
-            select(Thread).where(Thread.id == thread_id)).first()
+    async def get_by_id(self, thread_id: int) -> Thread:
+        thread = (await self.session.exec(
+            select(Thread).where(Thread.id == thread_id))).first()
         if not thread:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -19,21 +43,105 @@ class ThreadService:
             )
         return thread
 
-    def get_all(self) -> List[Thread]:
-        return self.session.exec(select(Thread)).all()
+    async def get_version(self, thread_id: int):
+        """Only the columns the thread's validators are built from."""
+        version = (await self.session.exec(
+            select(*(getattr(Thread, f) for f in THREAD_VERSION_FIELDS))
+            .where(Thread.id == thread_id)
+        )).first()
+        if not version:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Thread not found"
+            )
+        return version
+
+    async def get_full(
+        self,
+        thread_id: int,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        limit: int = 20
+    ) -> ThreadFull:
+        """
+        The thread, a page of its posts and their authors in three
+        queries, however many posts and authors the page has.
+        """
+        thread = await self.get_by_id(thread_id)
+        page = await PostService(self.session).get_by_thread(
+            thread_id, after=after, before=before, limit=limit)
+        authors = await UserService(self.session).get_summaries(
+            [thread.user_id, thread.last_post_user_id,
+             *(post.user_id for post in page.items)])
+        # Built from already validated rows
+        return ThreadFull.model_construct(
+            thread=thread, posts=page, authors=authors)
+
+    async def get_all(self) -> List[Thread]:
+        return (await self.session.exec(select(Thread))).all()
+
+    async def get_paginated(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        versions_only: bool = False
+    ) -> List[Thread]:
+        return (await self.session.exec(
+            select_threads(versions_only)
+            .order_by(Thread.id).offset(skip).limit(limit))).all()
+
+    async def get_by_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        order_by: str = "created_at",
+        versions_only: bool = False
+    ) -> CursorPage[Thread]:
+        """
+        With `versions_only`, items are rows of VERSION_COLUMNS, for
+        answering conditional requests without loading whole threads.
+        """
+        column = SORT_COLUMNS[order_by]
+        statement = select_threads(versions_only).order_by(
+            column.desc(), Thread.id.desc())
+
+        if cursor:
+            value, thread_id = decode_cursor(cursor, order_by)
+            statement = statement.where(seek_before(
+                column, Thread.id, value, thread_id,
+                nullable=order_by == "last_post_at"
+            ))
+
+        threads = (await self.session.exec(statement.limit(limit + 1))).all()
+
+        next_cursor = None
+        if len(threads) > limit:
+            threads = threads[:limit]
+            last = threads[-1]
+            next_cursor = encode_cursor(
+                order_by, getattr(last, order_by), last.id)
 
-    def get_paginated(self, skip: int = 0, limit: int = 10) -> List[Thread]:
-        return self.session.exec(select(Thread).offset(skip).limit(limit)).all()
+        if versions_only:
+            return CursorPage[Thread].model_construct(
+                items=threads, next_cursor=next_cursor)
+        return CursorPage[Thread](items=threads, next_cursor=next_cursor)
 
-    def create(self, data: ThreadCreate, user_id: int) -> Thread:
+    async def create(self, data: ThreadCreate, user_id: int) -> Thread:
         new_thread = Thread(**data.model_dump(), user_id=user_id)
         self.session.add(new_thread)
-        self.session.commit()
-        self.session.refresh(new_thread)
+        await StatsService(self.session).thread_added(new_thread)
+        await self.session.commit()
+        search_index.add_thread(new_thread)
+        thread_page_cache.invalidate()
         return new_thread
 
-    def update(self, thread_id: int, data: ThreadUpdate, user_id: int) -> Thread:
-        thread = self.get_by_id(thread_id)
+    async def update(
+        self,
+        thread_id: int,
+        data: ThreadUpdate,
+        user_id: int
+    ) -> Thread:
+        thread = await self.get_by_id(thread_id)
 
         if thread.user_id != user_id:
             raise HTTPException(
@@ -41,16 +149,22 @@ class ThreadService:
                 detail="Not authorized to update this thread"
             )
 
+        old_category_id = thread.category_id
         for field, value in data.dict(exclude_unset=True).items():
             setattr(thread, field, value)
+        # Set here, not by the client, as other workers' search indexes
+        # pick up changed threads by updated_at
+        thread.updated_at = datetime.utcnow()
 
         self.session.add(thread)
-        self.session.commit()
-        self.session.refresh(thread)
+        await StatsService(self.session).thread_moved(thread, old_category_id)
+        await self.session.commit()
+        search_index.add_thread(thread)
+        thread_page_cache.invalidate()
         return thread
 
-    def delete(self, thread_id: int, user_id: int) -> None:
-        thread = self.get_by_id(thread_id)
+    async def delete(self, thread_id: int, user_id: int) -> None:
+        thread = await self.get_by_id(thread_id)
 
         if thread.user_id != user_id:
             raise HTTPException(
@@ -58,5 +172,10 @@ class ThreadService:
                 detail="Not authorized to delete this thread"
             )
 
-        self.session.delete(thread)
-        self.session.commit()
+        await StatsService(self.session).thread_removed(thread)
+        await self.session.delete(thread)
+        # For the search indexes of the other workers
+        self.session.add(SearchTombstone(kind=THREAD, row_id=thread_id))
+        await self.session.commit()
+        search_index.remove_thread(thread_id)
+        thread_page_cache.invalidate()
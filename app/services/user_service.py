@@ -1,19 +1,22 @@
-from typing import List
+from typing import Any, Dict, Iterable, List
 from app.models.user import User
-from app.schemas.user import UserRead, UserUpdate
-from sqlmodel import Session, select
+from app.schemas.user import UserRead, UserSummary, UserUpdate
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
 from jose import jwt, JWTError
 from app.core.config import SECRET_KEY, ALGORITHM
+from app.utils.password import password_hasher
+from app.utils.service_cache import user_cache
 
 
 class UserService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def get_by_id(self, thread_id: int) -> UserRead:
-        user = self.session.exec(
-            select(User).where(User.id == thread_id)).first()
+    async def get_by_id(self, thread_id: int) -> UserRead:
+        user = (await self.session.exec(
+            select(User).where(User.id == thread_id))).first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -21,7 +24,51 @@ class UserService:
             )
         return user
 
-    def get_current_user(self, token: str) -> User:
+    async def get_profiles(
+        self,
+        user_ids: Iterable[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Public profile fields (UserRead) by id, from the user cache and
+        one IN query for the ids it misses; unknown ids are left out.
+        """
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return {}
+        version = user_cache.version()
+        profiles = user_cache.get_many(user_ids, version)
+        missing = user_ids - profiles.keys()
+        if missing:
+            rows = (await self.session.exec(
+                select(*(getattr(User, f) for f in UserRead.model_fields))
+                .where(User.id.in_(missing))
+            )).all()
+            for row in rows:
+                profiles[row.id] = profile = row._asdict()
+                user_cache.set(row.id, profile, version)
+        return profiles
+
+    async def get_public_profile(self, user_id: int) -> Dict[str, Any]:
+        profile = (await self.get_profiles([user_id])).get(user_id)
+        if profile is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        return profile
+
+    async def get_summaries(
+        self,
+        user_ids: Iterable[int]
+    ) -> Dict[int, UserSummary]:
+        profiles = await self.get_profiles(user_ids)
+        return {
+            user_id: UserSummary.model_construct(
+                **{field: profile[field] for field in UserSummary.model_fields})
+            for user_id, profile in profiles.items()
+        }
+
+    async def get_current_user(self, token: str) -> User:
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             user_id = payload.get("sub")
@@ -36,8 +83,8 @@ class UserService:
                 detail="Invalid token"
             )
 
-        user = self.session.exec(select(User).where(
-            User.id == int(user_id))).first()
+        user = (await self.session.exec(select(User).where(
+            User.id == int(user_id)))).first()
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -46,15 +93,15 @@ class UserService:
 
         return user
 
-    def get_profile(self, user_id: int) -> UserRead:
-        user = self.get_by_id(user_id)
+    async def get_profile(self, user_id: int) -> UserRead:
+        user = await self.get_by_id(user_id)
         return UserRead(id=user.id, username=user.username, email=user.email)
 
-    def update_user(self, user_id: int, data: UserUpdate) -> UserRead:
-        user = self.get_by_id(user_id)
+    async def update_user(self, user_id: int, data: UserUpdate) -> UserRead:
+        user = await self.get_by_id(user_id)
 
         if data.username:
-            existing = self.get_user_by_username(data.username)
+            existing = await self.get_user_by_username(data.username)
             if existing and existing.id != user_id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -63,7 +110,7 @@ class UserService:
             user.username = data.username
 
         if data.email:
-            existing = self.get_user_by_email(data.email)
+            existing = await self.get_user_by_email(data.email)
             if existing and existing.id != user_id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -72,30 +119,34 @@ class UserService:
             user.email = data.email
 
         self.session.add(user)
-        self.session.commit()
-        self.session.refresh(user)
+        await self.session.commit()
+        user_cache.invalidate()
         return UserRead(id=user.id, username=user.username, email=user.email)
 
-    def change_password(self, user_id: int, current_password: str, new_password: str):
-        user = self.get_by_id(user_id)
+    async def change_password(self, user_id: int, current_password: str, new_password: str):
+        user = await self.get_by_id(user_id)
 
-        if not self.verify_password(current_password, user.password_hash):
+        valid, _ = await password_hasher.verify_and_update(
+            current_password, user.password_hash)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
 
-        user.password_hash = self.hash_password(new_password)
+        user.password_hash = await password_hasher.hash(new_password)
         self.session.add(user)
-        self.session.commit()
+        await self.session.commit()
         return {"message": "Password updated successfully"}
 
-    def delete_user(self, user_id: int):
-        user = self.get_by_id(user_id)
-        self.session.delete(user)
-        self.session.commit()
+    async def delete_user(self, user_id: int):
+        user = await self.get_by_id(user_id)
+        await self.session.delete(user)
+        await self.session.commit()
+        user_cache.invalidate()
         return {"message": "User deleted"}
 
-    def list_users(self, skip: int = 0, limit: int = 10) -> List[UserRead]:
-        users = self.session.exec(select(User).offset(skip).limit(limit)).all()
+    async def list_users(self, skip: int = 0, limit: int = 10) -> List[UserRead]:
+        users = (await self.session.exec(
+            select(User).offset(skip).limit(limit))).all()
         return [UserRead(id=u.id, username=u.username, email=u.email) for u in users]
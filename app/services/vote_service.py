@@ -0,0 +1,100 @@
+from datetime import datetime
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models.vote import PostVote
+from app.schemas.vote import VoteRead
+from app.services.post_service import PostService
+from app.utils.counters import post_votes
+
+COUNTER_COLUMNS = {
+    1: "upvote_count",
+    -1: "downvote_count",
+}
+
+# Compare-and-set rounds before giving up on a vote that keeps changing
+VOTE_ATTEMPTS = 3
+
+
+def get_counter_deltas(previous: int, value: int) -> dict[str, int]:
+    deltas = {}
+    if previous == value:
+        return deltas
+    if previous:
+        deltas[COUNTER_COLUMNS[previous]] = -1
+    if value:
+        deltas[COUNTER_COLUMNS[value]] = 1
+    return deltas
+
+
+class VoteService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def vote(self, post_id: int, user_id: int, value: int) -> VoteRead:
+        post = await PostService(self.session).get_by_id(post_id)
+        # Read now, as a retried vote rolls back and expires the post
+        upvote_count, downvote_count = post.upvote_count, post.downvote_count
+        previous = await self._set_vote(post_id, user_id, value)
+
+        # The post row itself is only updated when post_votes is flushed
+        for column, delta in get_counter_deltas(previous, value).items():
+            post_votes.add(post_id, column, delta)
+
+        return VoteRead(
+            post_id=post_id,
+            value=value,
+            upvote_count=upvote_count
+            + post_votes.pending(post_id, "upvote_count"),
+            downvote_count=downvote_count
+            + post_votes.pending(post_id, "downvote_count")
+        )
+
+    async def _set_vote(self, post_id: int, user_id: int, value: int) -> int:
+        """
+        Stores the vote and returns the one it replaced. Each write only
+        applies if the row still holds the value read before it, so of
+        two concurrent requests from the same user only one gets to
+        count the change, and the other retries from the new value.
+        """
+        key = (PostVote.post_id == post_id, PostVote.user_id == user_id)
+        for _ in range(VOTE_ATTEMPTS):
+            previous = (await self.session.exec(
+                select(PostVote.value).where(*key))).first() or 0
+            if value == previous:
+                return previous
+
+            try:
+                if previous == 0:
+                    await self.session.exec(insert(PostVote).values(
+                        post_id=post_id, user_id=user_id, value=value))
+                    applied = True
+                elif value == 0:
+                    applied = await self._exec_if_unchanged(
+                        delete(PostVote), key, previous)
+                else:
+                    applied = await self._exec_if_unchanged(
+                        update(PostVote).values(
+                            value=value, updated_at=datetime.utcnow()),
+                        key, previous)
+            except IntegrityError:
+                # A concurrent request inserted the vote first
+                applied = False
+
+            if applied:
+                await self.session.commit()
+                return previous
+            await self.session.rollback()
+
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The vote changed concurrently, try again"
+        )
+
+    async def _exec_if_unchanged(self, statement, key, previous: int) -> bool:
+        result = await self.session.exec(
+            statement.where(*key, PostVote.value == previous)
+            .execution_options(synchronize_session=False))
+        return result.rowcount == 1
@@ -1,19 +1,44 @@
+import os
+import tempfile
+
+# Read by app.core.config on import: requests through the app use a
+# throwaway SQLite file, and cheap bcrypt
+TEST_DATABASE_PATH = os.path.join(
+    tempfile.gettempdir(), f"loopsociety-test-{os.getpid()}.db")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + TEST_DATABASE_PATH)
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("SEARCH_INDEX_PATH", "")
+
+import httpx
 import pytest
-import pytest
-from fastapi import HTTPException
-from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.utils.service_cache import service_cache
+
+
+# every test starts with new databases, so no cached rows carry over
+@pytest.fixture(autouse=True)
+def empty_service_cache():
+    service_cache.clear()
+    yield
+    service_cache.clear()
 
 
 # default session fixture for tests
 @pytest.fixture
-def session():
+async def session():
     # make a database in memory for testing
-    engine = create_engine("sqlite:///:memory:")
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as session:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
     # Clean up the database after tests
-    SQLModel.metadata.drop_all(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+    await engine.dispose()
 
 
 @pytest.fixture
@@ -21,3 +46,54 @@ def service_factory(session):
     def _create(service_class):
         return service_class(session)
     return _create
+
+
+# the whole app, middlewares included, on the DATABASE_URL engine
+@pytest.fixture
+async def client():
+    from app.db.database import engine
+    from app.main import app
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+            transport=transport, base_url="http://test") as client:
+        yield client
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+    await engine.dispose()
+    # Ids start over with the next database
+    from app.utils.auth import auth_session_cache
+    from app.utils.revocation import revoked_sessions
+    auth_session_cache.clear()
+    revoked_sessions._revoked.clear()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def stop_password_hasher():
+    yield
+    from app.utils.password import password_hasher
+    password_hasher.shutdown()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def remove_test_database():
+    yield
+    try:
+        os.remove(TEST_DATABASE_PATH)
+    except FileNotFoundError:
+        pass
+
+
+@pytest.fixture
+def register(client):
+    async def _register(username="user", password="password"):
+        email = f"{username}@example.com"
+        await client.post("/api/v1/auth/register", json={
+            "email": email, "username": username, "password": password})
+        tokens = (await client.post("/api/v1/auth/login", json={
+            "email": email, "password": password})).json()
+        tokens["headers"] = {
+            "Authorization": f"Bearer {tokens['access_token']}"}
+        return tokens
+    return _register
@@ -0,0 +1,101 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middlewares.admission import AdmissionMiddleware
+from app.utils.admission import (
+    AUTH,
+    READ,
+    WRITE,
+    AdmissionLimiter,
+    route_class
+)
+
+
+def test_route_classes():
+    assert route_class("POST", "/api/v1/auth/login") == AUTH
+    assert route_class("GET", "/api/v1/threads/") == READ
+    assert route_class("DELETE", "/api/v1/posts/1") == WRITE
+    assert route_class("GET", "/api/v1/internal/metrics") is None
+
+
+async def test_queue_hands_slots_over_in_order():
+    limiter = AdmissionLimiter("read", limit=1, max_queue=2, timeout=5)
+    assert await limiter.acquire()
+
+    order = []
+
+    async def request(name):
+        assert await limiter.acquire()
+        order.append(name)
+        limiter.release()
+
+    waiting = [asyncio.create_task(request(name)) for name in "ab"]
+    await asyncio.sleep(0)
+    assert limiter.stats()["queued"] == 2
+    # Full queue, rejected without waiting
+    assert not await limiter.acquire()
+
+    limiter.release()
+    await asyncio.gather(*waiting)
+    assert order == ["a", "b"]
+    stats = limiter.stats()
+    assert (stats["active"], stats["queued"]) == (0, 0)
+    assert (stats["admitted"], stats["rejected_queue_full"]) == (3, 1)
+
+
+async def test_waiters_give_up_at_the_deadline():
+    limiter = AdmissionLimiter("write", limit=1, max_queue=5, timeout=0.01)
+    assert await limiter.acquire()
+    assert not await limiter.acquire()
+    assert limiter.stats()["rejected_timeout"] == 1
+
+    # Cancelled waiters leave the queue and never take the slot
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    limiter.release()
+    assert limiter.stats()["queued"] == 0
+    assert limiter.active == 0
+
+
+async def test_slot_handed_over_at_the_deadline_is_kept(monkeypatch):
+    limiter = AdmissionLimiter("write", limit=1, max_queue=1, timeout=5)
+    assert await limiter.acquire()
+
+    async def wait_for(waiter, timeout):
+        # The waiter is resolved and times out in the same loop tick, as
+        # wait_for can report on Python 3.12+
+        limiter.release()
+        assert waiter.done()
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(asyncio, "wait_for", wait_for)
+    assert await limiter.acquire()
+    limiter.release()
+    stats = limiter.stats()
+    assert (stats["active"], stats["queued"]) == (0, 0)
+    assert stats["rejected_timeout"] == 0
+
+
+def test_middleware_sheds_with_retry_after():
+    app = FastAPI()
+    limiter = AdmissionLimiter("read", limit=1, max_queue=0, timeout=1)
+    app.add_middleware(AdmissionMiddleware, limiters={READ: limiter})
+
+    @app.get("/api/v1/things")
+    async def things():
+        return {"active": limiter.active}
+
+    client = TestClient(app)
+    assert client.get("/api/v1/things").json() == {"active": 1}
+    assert limiter.active == 0
+
+    limiter.active = 1
+    response = client.get("/api/v1/things")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    # Writes are another class, not limited here
+    assert client.post("/api/v1/things").status_code == 405
@@ -0,0 +1,171 @@
+import pytest
+from sqlalchemy import event
+
+from app.utils.compression import COMPRESSORS
+from app.utils.revocation import revoked_sessions
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/threads/",
+    "/api/v1/posts/",
+    "/api/v1/threads/1/posts",
+    "/api/v1/threads/1/full",
+])
+@pytest.mark.parametrize("limit", [0, -1, 101, 1000000])
+async def test_list_limit_is_bounded(client, register, path, limit):
+    user = await register()
+    response = await client.get(
+        path, params={"limit": limit}, headers=user["headers"])
+    assert response.status_code == 422
+
+
+async def test_list_limit_within_bounds(client, register):
+    user = await register()
+    response = await client.get(
+        "/api/v1/threads/", params={"limit": 100}, headers=user["headers"])
+    assert response.status_code == 200
+
+
+async def test_metrics_are_admin_only(client, register, monkeypatch):
+    user = await register()
+    response = await client.get(
+        "/api/v1/internal/metrics", headers=user["headers"])
+    assert response.status_code == 403
+
+    me = (await client.get("/api/v1/users/me", headers=user["headers"])).json()
+    monkeypatch.setattr("app.utils.user.ADMIN_USER_IDS", {me["id"]})
+    response = await client.get(
+        "/api/v1/internal/metrics", headers=user["headers"])
+    assert response.status_code == 200
+    assert "db_pool" in response.json()
+
+
+async def test_logout_rejects_the_access_token_at_once(client, register):
+    user = await register()
+    assert (await client.get(
+        "/api/v1/users/me", headers=user["headers"])).status_code == 200
+
+    response = await client.post(
+        "/api/v1/auth/logout",
+        json={"refresh_token": user["refresh_token"]},
+        headers=user["headers"])
+    assert response.status_code == 200
+    assert (await client.get(
+        "/api/v1/users/me", headers=user["headers"])).status_code == 401
+
+
+async def test_logout_evicts_the_cached_session(client, register, monkeypatch):
+    monkeypatch.setattr(
+        "app.middlewares.auth_middleware.AUTH_VERIFY_MODE", "session")
+    # Only the session cache and user_sessions decide here
+    monkeypatch.setattr(revoked_sessions, "is_revoked", lambda sid: False)
+    user = await register()
+    # Fills the session cache
+    assert (await client.get(
+        "/api/v1/users/me", headers=user["headers"])).status_code == 200
+
+    await client.post(
+        "/api/v1/auth/logout",
+        json={"refresh_token": user["refresh_token"]},
+        headers=user["headers"])
+    assert (await client.get(
+        "/api/v1/users/me", headers=user["headers"])).status_code == 401
+
+
+async def test_list_revalidation_reads_versions_and_sees_deletes(
+        client, register):
+    from app.db.database import engine
+    user = await register()
+    thread = (await client.post("/api/v1/threads/", json={
+        "title": "T", "slug": "t", "category_id": 1},
+        headers=user["headers"])).json()
+    post_ids = [
+        (await client.post("/api/v1/posts/", json={
+            "thread_id": thread["id"], "content": f"post {i}"},
+            headers=user["headers"])).json()["id"]
+        for i in range(3)
+    ]
+
+    for path in ("/api/v1/posts/", f"/api/v1/threads/{thread['id']}/posts"):
+        response = await client.get(path, headers=user["headers"])
+        # A delete does not move max(updated_at), so lists only get ETags
+        assert "last-modified" not in response.headers
+        etag = response.headers["etag"]
+
+        statements = []
+        listener = (lambda conn, cursor, statement, *args:
+                    statements.append(statement))
+        event.listen(engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            response = await client.get(
+                path, headers={**user["headers"], "If-None-Match": etag})
+        finally:
+            event.remove(
+                engine.sync_engine, "before_cursor_execute", listener)
+        assert response.status_code == 304
+        assert not any("posts.content" in s for s in statements)
+
+        await client.delete(
+            f"/api/v1/posts/{post_ids.pop()}", headers=user["headers"])
+        response = await client.get(
+            path, headers={**user["headers"], "If-None-Match": etag})
+        assert response.status_code == 200
+
+
+async def test_counters_change_single_resources(client, register):
+    user = await register()
+    thread = (await client.post("/api/v1/threads/", json={
+        "title": "T", "slug": "t", "category_id": 1},
+        headers=user["headers"])).json()
+    post_ids = [
+        (await client.post("/api/v1/posts/", json={
+            "thread_id": thread["id"], "content": f"post {i}"},
+            headers=user["headers"])).json()["id"]
+        for i in range(2)
+    ]
+    post_path = f"/api/v1/posts/{post_ids[0]}"
+    thread_path = f"/api/v1/threads/{thread['id']}"
+
+    # Votes and post_count do not move updated_at, so there is no
+    # Last-Modified that If-Modified-Since could match
+    for path in (post_path, thread_path):
+        response = await client.get(path, headers=user["headers"])
+        assert "last-modified" not in response.headers
+    since = "Fri, 31 Dec 9999 23:59:59 GMT"
+
+    await client.post(f"{post_path}/vote", json={"value": 1},
+                      headers=user["headers"])
+    response = await client.get(
+        post_path, headers={**user["headers"], "If-Modified-Since": since})
+    assert response.status_code == 200
+    assert response.json()["upvote_count"] == 1
+
+    await client.delete(f"/api/v1/posts/{post_ids[1]}",
+                        headers=user["headers"])
+    response = await client.get(
+        thread_path, headers={**user["headers"], "If-Modified-Since": since})
+    assert response.status_code == 200
+    assert response.json()["post_count"] == 1
+
+
+async def test_cached_thread_pages_are_compressed_once(
+        client, register, monkeypatch):
+    user = await register()
+    for i in range(10):
+        await client.post("/api/v1/threads/", json={
+            "title": f"Thread {i} " + "x" * 100, "slug": f"t{i}",
+            "category_id": 1}, headers=user["headers"])
+    headers = {**user["headers"], "Accept-Encoding": "gzip"}
+    first = await client.get("/api/v1/threads/", headers=headers)
+    assert first.headers["content-encoding"] == "gzip"
+
+    def gzip():
+        raise AssertionError("cached page compressed again")
+
+    # Also what CompressionMiddleware would use
+    monkeypatch.setitem(COMPRESSORS, "gzip", gzip)
+    second = await client.get("/api/v1/threads/", headers=headers)
+    assert second.headers["content-encoding"] == "gzip"
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["etag"].startswith('W/"')
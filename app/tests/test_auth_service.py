@@ -3,7 +3,14 @@ from fastapi import HTTPException
 from sqlmodel import SQLModel, Session, create_engine
 from app.services.auth_service import AuthService
 from app.models.user import User
+from app.models.user_session import UserSession
+from jose import jwt
+from app.core.config import SECRET_KEY, ALGORITHM
+from app.utils.auth import auth_session_cache
+from app.utils.password import _get_context, password_hasher
+from app.utils.revocation import revoked_sessions
 from sqlmodel import select
+from datetime import datetime, timedelta
 
 
 @pytest.fixture
@@ -11,44 +18,44 @@ def auth_service(service_factory):
     return service_factory(AuthService)
 
 
-def test_register_user(auth_service, session):
-    result = auth_service.register_user(
+async def test_register_user(auth_service, session):
+    result = await auth_service.register_user(
         email="test@example.com",
         username="testuser",
         password="testpassword",
     )
     assert result["username"] == "testuser"
     assert result["email"] == "test@example.com"
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.username == "testuser")
-    ).first()
+    )).first()
     assert user is not None
-    assert auth_service.verify_password("testpassword", user.password_hash)
+    assert await auth_service.verify_password("testpassword", user.password_hash)
 
 
-def test_register_user_duplicate(auth_service):
-    auth_service.register_user("a@b.com", "user1", "pass")
+async def test_register_user_duplicate(auth_service):
+    await auth_service.register_user("a@b.com", "user1", "pass")
     with pytest.raises(HTTPException) as exc:
-        auth_service.register_user("a@b.com", "user1", "pass")
+        await auth_service.register_user("a@b.com", "user1", "pass")
     assert exc.value.status_code == 400
 
 
-def test_authenticate_user_success(auth_service):
-    auth_service.register_user("b@c.com", "user2", "pass2")
-    user = auth_service.authenticate_user("b@c.com", "pass2")
+async def test_authenticate_user_success(auth_service):
+    await auth_service.register_user("b@c.com", "user2", "pass2")
+    user = await auth_service.authenticate_user("b@c.com", "pass2")
     assert user.username == "user2"
 
 
-def test_authenticate_user_invalid(auth_service):
-    auth_service.register_user("c@d.com", "user3", "pass3")
+async def test_authenticate_user_invalid(auth_service):
+    await auth_service.register_user("c@d.com", "user3", "pass3")
     with pytest.raises(HTTPException) as exc:
-        auth_service.authenticate_user("c@d.com", "wrongpass")
+        await auth_service.authenticate_user("c@d.com", "wrongpass")
     assert exc.value.status_code == 401
 
 
-def test_login_and_refresh(auth_service):
-    auth_service.register_user("d@e.com", "user4", "pass4")
-    user = auth_service.authenticate_user("d@e.com", "pass4")
+async def test_login_and_refresh(auth_service):
+    await auth_service.register_user("d@e.com", "user4", "pass4")
+    user = await auth_service.authenticate_user("d@e.com", "pass4")
 
     class DummyRequest:
         client = type("client", (), {"host": "127.0.0.1"})
@@ -56,24 +63,122 @@ def test_login_and_refresh(auth_service):
 
     request = DummyRequest()
     # Login
-    tokens = auth_service.login_user(user, request)
+    tokens = await auth_service.login_user(user, request)
     assert tokens.access_token
     assert tokens.refresh_token
 
 
-def test_logout(auth_service):
-    auth_service.register_user("e@f.com", "user5", "pass5")
-    user = auth_service.authenticate_user("e@f.com", "pass5")
+async def test_logout(auth_service):
+    await auth_service.register_user("e@f.com", "user5", "pass5")
+    user = await auth_service.authenticate_user("e@f.com", "pass5")
 
     class DummyRequest:
         client = type("client", (), {"host": "127.0.0.1"})
         headers = {"User-Agent": "pytest"}
 
     request = DummyRequest()
-    tokens = auth_service.login_user(user, request)
-    result = auth_service.logout_user(tokens.refresh_token, user)
+    tokens = await auth_service.login_user(user, request)
+    result = await auth_service.logout_user(tokens.refresh_token, user)
     assert result["message"] == "Successfully logged out."
     # Try to refresh after logout
     with pytest.raises(HTTPException) as exc:
-        auth_service.refresh_token(tokens.refresh_token)
+        await auth_service.refresh_token(tokens.refresh_token)
     assert exc.value.status_code == 401
+
+
+async def test_logout_invalidates_cached_session(auth_service):
+    await auth_service.register_user("f@g.com", "user6", "pass6")
+    user = await auth_service.authenticate_user("f@g.com", "pass6")
+
+    class DummyRequest:
+        client = type("client", (), {"host": "127.0.0.1"})
+        headers = {"User-Agent": "pytest"}
+
+    tokens = await auth_service.login_user(user, DummyRequest())
+    claims = jwt.decode(tokens.access_token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert claims["type"] == "access"
+    cache_key = (user.id, claims["sid"])
+    auth_session_cache.set(cache_key, {"id": user.id})
+
+    await auth_service.logout_user(tokens.refresh_token, user)
+    assert auth_session_cache.get(cache_key) is None
+    assert revoked_sessions.is_revoked(claims["sid"])
+
+
+async def test_load_revoked_sessions(auth_service, session):
+    await auth_service.register_user("g@h.com", "user7", "pass7")
+    user = await auth_service.authenticate_user("g@h.com", "pass7")
+
+    class DummyRequest:
+        client = type("client", (), {"host": "127.0.0.1"})
+        headers = {"User-Agent": "pytest"}
+
+    tokens = await auth_service.login_user(user, DummyRequest())
+    claims = jwt.decode(tokens.access_token, SECRET_KEY, algorithms=[ALGORITHM])
+    await auth_service.logout_user(tokens.refresh_token, user)
+
+    # Simulate a worker that did not handle the logout itself
+    revoked_sessions._revoked.clear()
+    await auth_service.load_revoked_sessions()
+    assert revoked_sessions.is_revoked(claims["sid"])
+
+
+async def test_authenticate_rehashes_outdated_hash(auth_service, session):
+    await auth_service.register_user("h@i.com", "user8", "pass8")
+    user = (await session.exec(
+        select(User).where(User.username == "user8")
+    )).first()
+    user.password_hash = _get_context(4).hash("pass8")
+    session.add(user)
+    await session.commit()
+
+    user = await auth_service.authenticate_user("h@i.com", "pass8")
+    assert user.password_hash.startswith(f"$2b${password_hasher.rounds:02d}$")
+
+
+async def test_refresh_rejects_rotated_token(auth_service):
+    await auth_service.register_user("i@j.com", "user9", "pass9")
+    user = await auth_service.authenticate_user("i@j.com", "pass9")
+
+    class DummyRequest:
+        client = type("client", (), {"host": "127.0.0.1"})
+        headers = {"User-Agent": "pytest"}
+
+    tokens = await auth_service.login_user(user, DummyRequest())
+    await auth_service.refresh_token(tokens.refresh_token)
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_service.refresh_token(tokens.refresh_token)
+    assert exc.value.status_code == 401
+
+
+async def test_reap_sessions(auth_service, session):
+    await auth_service.register_user("j@k.com", "user10", "pass10")
+    user = (await session.exec(
+        select(User).where(User.username == "user10")
+    )).first()
+    now = datetime.utcnow()
+
+    def make_session(**kwargs):
+        values = {
+            "user_id": user.id,
+            "refresh_token_digest": bytes(32),
+            "expires_at": now + timedelta(days=1),
+        }
+        values.update(kwargs)
+        return UserSession(**values)
+
+    session.add_all([
+        make_session(),
+        make_session(is_active=False, revoked_at=now),
+        make_session(is_active=False, revoked_at=now - timedelta(days=1)),
+        make_session(expires_at=now - timedelta(minutes=1)),
+        make_session(expires_at=now - timedelta(days=2)),
+    ])
+    await session.commit()
+
+    assert await auth_service.reap_sessions(batch_size=1) == 3
+
+    remaining = (await session.exec(select(UserSession))).all()
+    assert len(remaining) == 2
+    assert all(s.expires_at > now for s in remaining)
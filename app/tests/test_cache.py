@@ -0,0 +1,142 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from app.utils.cache import CacheNamespace, TTLCache
+from app.utils.shared_cache import SharedCache
+
+
+def test_get_and_set():
+    cache = TTLCache(maxsize=2, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expires_at_caps_ttl():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1, expires_at=time.time() - 1)
+    assert cache.get("a") is None
+
+
+def test_delete_where():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set((1, "x"), 1)
+    cache.set((1, "y"), 2)
+    cache.set((2, "x"), 3)
+    cache.delete_where(lambda key: key[0] == 1)
+    assert cache.stats()["size"] == 1
+
+
+@pytest.fixture
+def shared(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache"), slots=16, slot_size=256,
+                        ttl=60)
+    yield cache
+    cache.close()
+
+
+def test_shared_get_many_and_expiry(shared):
+    shared.set("a", {"x": 1})
+    shared.set(("b", 2), [1, 2])
+    shared.set("c", 3, expires_at=time.time() - 1)
+    assert shared.get_many(["a", ("b", 2), "c", "d"]) == {
+        "a": {"x": 1}, ("b", 2): [1, 2]}
+    stats = shared.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (2, 2, 2)
+
+    shared.delete("a")
+    assert shared.get("a") is None
+
+
+def test_shared_evicts_least_recently_used_and_skips_large_values(shared):
+    # One bucket of WAYS slots per 8 slots, so 16 keys fill both buckets
+    for i in range(40):
+        shared.set(i, i)
+        shared.get(0)
+    assert shared.get(0) == 0
+    assert shared.stats()["evictions"] > 0
+
+    shared.set("big", b"x" * 1000)
+    assert shared.get("big") is None
+    assert shared.stats()["oversized"] == 1
+
+
+def test_shared_refuses_files_others_can_write(tmp_path):
+    path = tmp_path / "cache"
+    path.touch(mode=0o666)
+    path.chmod(0o666)
+    with pytest.raises(PermissionError):
+        SharedCache(str(path), slots=16, slot_size=256, ttl=60)
+
+    if os.geteuid() == 0:
+        # Created first by another user
+        path.chmod(0o600)
+        os.chown(path, 1, 1)
+        with pytest.raises(PermissionError):
+            SharedCache(str(path), slots=16, slot_size=256, ttl=60)
+
+    link = tmp_path / "link"
+    link.symlink_to(tmp_path / "elsewhere")
+    with pytest.raises(OSError):
+        SharedCache(str(link), slots=16, slot_size=256, ttl=60)
+    assert not (tmp_path / "elsewhere").exists()
+
+
+def test_shared_reopens_after_fork_without_leaking(shared):
+    inherited = shared._map
+    # As seen from a forked child
+    shared._pid = None
+    shared.set("a", 1)
+    assert inherited.closed
+    assert shared.get("a") == 1
+
+
+def write_entry(path, key, value):
+    cache = SharedCache(path, slots=16, slot_size=256, ttl=60)
+    cache.set(key, value)
+    CacheNamespace(cache, "things").invalidate()
+    cache.close()
+
+
+def test_shared_entries_are_visible_to_other_processes(shared):
+    things = CacheNamespace(shared, "things")
+    things.set("k", "stale")
+
+    process = multiprocessing.get_context("spawn").Process(
+        target=write_entry, args=(shared.path, "from-child", 42))
+    process.start()
+    process.join(30)
+
+    assert process.exitcode == 0
+    assert shared.get("from-child") == 42
+    assert things.get("k") is None
+
+
+def test_namespace_invalidate_and_versions():
+    things = CacheNamespace(TTLCache(maxsize=100, ttl=60), "things", ttl=60)
+    things.set(1, "one")
+    assert things.get_many([1, 2]) == {1: "one"}
+
+    # A value loaded before an invalidation lands under the old version
+    version = things.version()
+    things.invalidate()
+    things.set(2, "stale", version)
+    assert things.get(1) is None
+    assert things.get(2) is None
+    assert things.stats()["invalidations"] == 1
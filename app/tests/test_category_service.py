@@ -1,3 +1,4 @@
+import json
 import pytest
 from fastapi import HTTPException
 import pytest
@@ -7,6 +8,8 @@ from sqlmodel import SQLModel, Session, create_engine, select
 from app.services.category_service import CategoryService
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.services.cache_version_service import CacheVersionService
+from app.utils.versioned_cache import category_cache
 
 
 @pytest.fixture
@@ -14,64 +17,121 @@ def category_service(service_factory):
     return service_factory(CategoryService)
 
 
-def test_create_category(category_service):
+async def test_create_category(category_service):
     data = CategoryCreate(name="Test Category", slug="test-category")
-    category = category_service.create(data)
+    category = await category_service.create(data)
     assert category.id is not None
     assert category.name == "Test Category"
     assert category.slug == "test-category"
 
 
-def test_create_duplicate_category_raises(category_service):
+async def test_create_duplicate_category_raises(category_service):
     data = CategoryCreate(name="Duplicate Category", slug="duplicate-category")
-    category_service.create(data)
+    await category_service.create(data)
     with pytest.raises(HTTPException) as exc:
-        category_service.create(data)
+        await category_service.create(data)
     assert exc.value.status_code == 400
 
 
-def test_get_by_id(category_service):
+async def test_get_by_id(category_service):
     data = CategoryCreate(name="GetById Category", slug="getbyid-category")
-    created = category_service.create(data)
-    found = category_service.get_by_id(created.id)
+    created = await category_service.create(data)
+    found = await category_service.get_by_id(created.id)
     assert found.id == created.id
     assert found.name == "GetById Category"
     assert found.slug == "getbyid-category"
 
 
-def test_get_by_id_not_found_raises(category_service):
+async def test_get_by_id_not_found_raises(category_service):
     with pytest.raises(HTTPException) as exc:
-        category_service.get_by_id(999)
+        await category_service.get_by_id(999)
     assert exc.value.status_code == 404
 
 
-def test_get_all(category_service):
-    category_service.create(CategoryCreate(name="Cat1", slug="cat1"))
-    category_service.create(CategoryCreate(name="Cat2", slug="cat2"))
-    categories = category_service.get_all()
+async def test_get_all(category_service):
+    await category_service.create(CategoryCreate(name="Cat1", slug="cat1"))
+    await category_service.create(CategoryCreate(name="Cat2", slug="cat2"))
+    categories = await category_service.get_all()
     assert len(categories) == 2
 
 
-def test_get_paginated(category_service):
+async def test_get_paginated(category_service):
     for i in range(15):
-        category_service.create(CategoryCreate(name=f"Cat{i}", slug=f"cat{i}"))
-    categories = category_service.get_paginated(skip=5, limit=5)
+        await category_service.create(CategoryCreate(name=f"Cat{i}", slug=f"cat{i}"))
+    categories = await category_service.get_paginated(skip=5, limit=5)
     assert len(categories) == 5
     assert categories[0].name == "Cat5"
 
 
-def test_update_category(category_service):
-    created = category_service.create(
+async def test_update_category(category_service):
+    created = await category_service.create(
         CategoryCreate(name="Old Name", slug="old-name"))
     update_data = CategoryUpdate(name="New Name")
-    updated = category_service.update(created.id, update_data)
+    updated = await category_service.update(created.id, update_data)
     assert updated.name == "New Name"
 
 
-def test_delete_category(category_service, session):
-    created = category_service.create(
+async def test_delete_category(category_service, session):
+    created = await category_service.create(
         CategoryCreate(name="ToDelete", slug="to-delete"))
-    category_service.delete(created.id)
-    result = session.exec(select(Category).where(
-        Category.id == created.id)).first()
+    await category_service.delete(created.id)
+    result = (await session.exec(select(Category).where(
+        Category.id == created.id))).first()
     assert result is None
+
+
+async def test_stream_all(category_service):
+    for i in range(3):
+        await category_service.create(CategoryCreate(name=f"Cat{i}", slug=f"cat{i}"))
+    batches = [batch async for batch in category_service.stream_all(batch_size=2)]
+    assert [[c.name for c in batch] for batch in batches] == [
+        ["Cat0", "Cat1"], ["Cat2"]]
+
+
+@pytest.fixture
+def cache():
+    category_cache.invalidate()
+    yield category_cache
+    category_cache.invalidate()
+
+
+async def test_get_all_json_serves_cached_bytes(category_service, cache):
+    await category_service.create(CategoryCreate(name="Cached", slug="cached"))
+
+    cached = await category_service.get_all_cached()
+    assert [c["name"] for c in json.loads(cached.body)] == ["Cached"]
+
+    hits = cache.stats()["hits"]
+    assert await category_service.get_all_cached() is cached
+    assert cache.stats()["hits"] == hits + 1
+
+
+async def test_write_invalidates_cached_json(category_service, cache):
+    category = await category_service.create(
+        CategoryCreate(name="Before", slug="before"))
+    before = await category_service.get_cached_by_id(category.id)
+
+    await category_service.update(category.id, CategoryUpdate(name="After"))
+    after = await category_service.get_cached_by_id(category.id)
+    assert json.loads(after.body)["name"] == "After"
+    assert after.validators.etag != before.validators.etag
+
+
+async def test_version_bump_from_other_worker(
+        category_service, session, cache, monkeypatch):
+    category = await category_service.create(
+        CategoryCreate(name="Before", slug="before"))
+    await category_service.get_all_cached()
+
+    # Another worker renames the category and bumps the version
+    category.name = "After"
+    session.add(category)
+    await CacheVersionService(session).bump(cache.name)
+    await session.commit()
+
+    cached = await category_service.get_all_cached()
+    assert json.loads(cached.body)[0]["name"] == "Before"
+
+    monkeypatch.setattr(cache, "check_interval", 0)
+    cached = await category_service.get_all_cached()
+    assert json.loads(cached.body)[0]["name"] == "After"
@@ -0,0 +1,91 @@
+import gzip
+
+import httpx
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+
+from app.middlewares.compression import CompressionMiddleware
+from app.utils.compression import choose_encoding
+
+LARGE = b'{"content": "' + b"x" * 4000 + b'"}'
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+
+@app.get("/small")
+async def small():
+    return {"ok": True}
+
+
+@app.get("/large")
+async def large():
+    return Response(LARGE, media_type="application/json",
+                    headers={"ETag": '"abc"'})
+
+
+@app.get("/stream")
+async def stream():
+    async def chunks():
+        for i in range(3):
+            yield f'{{"row": {i}}}\n'
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@app.get("/binary")
+async def binary():
+    return Response(b"\0" * 4000, media_type="application/octet-stream")
+
+
+@app.get("/encoded")
+async def encoded():
+    return Response(gzip.compress(LARGE), media_type="application/json",
+                    headers={"Content-Encoding": "gzip"})
+
+
+async def get(path: str, accept_encoding: str = "gzip") -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+            transport=transport, base_url="http://test") as client:
+        return await client.get(
+            path, headers={"Accept-Encoding": accept_encoding})
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("*") is not None
+    assert choose_encoding("") is None
+
+
+async def test_small_body_is_not_compressed():
+    response = await get("/small")
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+async def test_large_body_is_compressed():
+    response = await get("/large")
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(LARGE)
+    assert response.headers["etag"] == 'W/"abc"'
+    assert response.content == LARGE
+
+
+async def test_stream_is_compressed_per_chunk():
+    response = await get("/stream")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text.splitlines() == [f'{{"row": {i}}}' for i in range(3)]
+
+
+async def test_identity_and_non_compressible_pass_through():
+    assert "content-encoding" not in (
+        await get("/large", accept_encoding="identity")).headers
+    assert "content-encoding" not in (await get("/binary")).headers
+
+
+async def test_encoded_body_passes_through():
+    response = await get("/encoded")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == LARGE
@@ -0,0 +1,75 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi import Request
+
+from app.models.post import Post
+from app.utils.conditional import (
+    POST_VERSION_FIELDS,
+    get_validator_headers,
+    get_validators,
+    is_not_modified
+)
+from app.utils.counters import CounterBuffer
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [
+            (k.replace("_", "-").lower().encode(), v.encode())
+            for k, v in headers.items()
+        ],
+    })
+
+
+def make_post(**kwargs):
+    values = {
+        "id": 1,
+        "updated_at": datetime(2026, 1, 1, 12, 0, 0, 500),
+        "upvote_count": 0,
+        "downvote_count": 0,
+    }
+    values.update(kwargs)
+    return SimpleNamespace(**values)
+
+
+def test_etag_changes_with_version_fields():
+    before = get_validators([make_post()], POST_VERSION_FIELDS)
+    after = get_validators([make_post(upvote_count=1)], POST_VERSION_FIELDS)
+    assert before.etag != after.etag
+    assert before.last_modified == datetime(2026, 1, 1, 12, 0, 0, 500)
+
+
+def test_etag_includes_pending_counters():
+    buffer = CounterBuffer(Post, ("upvote_count",), flush_threshold=10)
+    before = get_validators([make_post()], POST_VERSION_FIELDS, pending=buffer)
+    buffer.add(1, "upvote_count")
+    after = get_validators([make_post()], POST_VERSION_FIELDS, pending=buffer)
+    assert before.etag != after.etag
+
+
+def test_if_none_match():
+    validators = get_validators([make_post()], POST_VERSION_FIELDS)
+    assert is_not_modified(
+        make_request(if_none_match=f'"x", {validators.etag}'), validators)
+    assert is_not_modified(
+        make_request(if_none_match=f"W/{validators.etag}"), validators)
+    assert not is_not_modified(make_request(if_none_match='"x"'), validators)
+    assert not is_not_modified(make_request(), validators)
+
+
+def test_if_modified_since():
+    validators = get_validators([make_post()], POST_VERSION_FIELDS)
+    last_modified = get_validator_headers(validators)["Last-Modified"]
+    assert last_modified == "Thu, 01 Jan 2026 12:00:00 GMT"
+    assert is_not_modified(
+        make_request(if_modified_since=last_modified), validators)
+    assert not is_not_modified(
+        make_request(if_modified_since="Thu, 01 Jan 2026 11:59:59 GMT"),
+        validators)
+    assert not is_not_modified(
+        make_request(if_modified_since="garbage"), validators)
+    # If-None-Match takes precedence
+    assert not is_not_modified(make_request(
+        if_none_match='"x"', if_modified_since=last_modified), validators)
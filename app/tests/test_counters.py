@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import text
+
+from app.models.thread import Thread
+from app.utils.counters import CounterBuffer
+
+
+@pytest.fixture
+async def threads(session):
+    rows = [
+        Thread(user_id=1, category_id=1, title=f"t{i}", slug=f"t{i}",
+               view_count=10)
+        for i in range(2)
+    ]
+    session.add_all(rows)
+    await session.commit()
+    return rows
+
+
+async def test_flush_writes_summed_deltas(session, threads):
+    buffer = CounterBuffer(Thread, ("view_count",), flush_threshold=100)
+    for _ in range(3):
+        buffer.add(threads[0].id, "view_count")
+    buffer.add(threads[1].id, "view_count")
+    assert buffer.stats()["pending_increments"] == 4
+
+    assert await buffer.flush(session) == 4
+    assert buffer.stats()["pending_increments"] == 0
+
+    for thread in threads:
+        await session.refresh(thread)
+    assert [t.view_count for t in threads] == [13, 11]
+
+
+async def test_apply_pending_does_not_dirty_rows(session, threads):
+    buffer = CounterBuffer(Thread, ("view_count",), flush_threshold=100)
+    buffer.add(threads[0].id, "view_count", 5)
+
+    buffer.apply_pending(threads)
+    assert threads[0].view_count == 15
+    assert not session.dirty
+
+    await session.refresh(threads[0])
+    assert threads[0].view_count == 10
+
+
+async def test_threshold_requests_flush(threads):
+    buffer = CounterBuffer(Thread, ("view_count",), flush_threshold=2)
+    buffer.add(threads[0].id, "view_count")
+    buffer.add(threads[0].id, "view_count")
+    assert not buffer._flush_needed.is_set()
+
+    buffer.add(threads[1].id, "view_count")
+    await buffer.wait_for_flush(timeout=1)
+    assert not buffer._flush_needed.is_set()
+
+
+async def test_failed_flush_keeps_deltas(session, threads):
+    buffer = CounterBuffer(Thread, ("view_count",), flush_threshold=100)
+    thread_id = threads[0].id
+    buffer.add(thread_id, "view_count", 2)
+    await session.exec(text("DROP TABLE threads"))
+
+    with pytest.raises(Exception):
+        await buffer.flush(session)
+    assert buffer.pending(thread_id, "view_count") == 2
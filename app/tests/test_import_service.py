@@ -0,0 +1,120 @@
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+
+from app.models.category import Category
+from app.models.post import Post
+from app.models.thread import Thread
+from app.models.user import User
+from app.services.import_service import ImportService
+from app.services.search_service import SearchService
+from app.utils.search import POST, SearchIndex
+from app.utils.streaming import iter_lines
+
+
+def jsonl(*records) -> list[bytes]:
+    return [orjson.dumps(record) for record in records]
+
+
+async def from_list(lines):
+    for line in lines:
+        yield line
+
+
+USER = {"type": "user", "id": 70, "username": "old", "email": "o@x.y",
+        "password_hash": "$2b$12$hash"}
+CATEGORY = {"type": "category", "id": 5, "name": "Old", "slug": "old"}
+THREAD = {"type": "thread", "id": 9, "user_id": 70, "category_id": 5,
+          "title": "Archive", "slug": "archive"}
+
+
+def posts(*ids):
+    return [{"type": "post", "id": i, "user_id": 70, "thread_id": 9,
+             "content": f"post {i}"} for i in ids]
+
+
+async def test_import_remaps_ids_and_recomputes_stats(session):
+    # An existing user takes id 1, so imported ids have to move
+    session.add(User(username="local", email="l@x.y", password_hash="x"))
+    await session.commit()
+
+    lines = jsonl(USER, CATEGORY, THREAD, *posts(1, 2, 3))
+    result = await ImportService(session).run(
+        "forum", from_list(lines), chunk_size=2)
+
+    assert result.inserted == {
+        "user": 1, "category": 1, "thread": 1, "post": 3}
+    assert result.skipped == 0
+    user = (await session.exec(select(User).where(User.username == "old"))
+            ).one()
+    assert user.id == 2
+    thread = (await session.exec(select(Thread))).one()
+    assert thread.user_id == user.id
+    assert thread.post_count == 3
+    category = (await session.exec(select(Category))).one()
+    assert (category.thread_count, category.post_count) == (1, 3)
+    assert {p.thread_id for p in (await session.exec(select(Post))).all()} \
+        == {thread.id}
+
+
+async def test_invalid_and_dangling_lines_are_reported(session):
+    lines = jsonl(USER, CATEGORY, THREAD, *posts(1))
+    lines += [b"not json", orjson.dumps({"type": "post", "id": 2})]
+    lines += jsonl({**posts(3)[0], "thread_id": 404}, *posts(1))
+
+    result = await ImportService(session).run("bad", from_list(lines))
+
+    assert result.inserted["post"] == 1
+    assert result.skipped == 4
+    assert [error.line for error in result.errors] == [5, 6, 7, 8]
+    assert result.errors[2].message == "Unknown thread 404"
+    assert result.errors[3].message == "Duplicate post 1"
+
+
+async def test_resumes_after_last_committed_chunk(session):
+    lines = jsonl(USER, CATEGORY, THREAD, *posts(1, 2, 3, 4))
+
+    first = await ImportService(session).run(
+        "resume", from_list(lines[:5]), chunk_size=2)
+    assert first.lines == 5
+
+    second = await ImportService(session).run(
+        "resume", from_list(lines), chunk_size=2)
+    assert second.resumed_from == 5
+    assert second.inserted == {
+        "user": 0, "category": 0, "thread": 0, "post": 2}
+    thread = (await session.exec(select(Thread))).one()
+    assert thread.post_count == 4
+    assert len((await session.exec(select(User))).all()) == 1
+
+
+async def test_imported_rows_reach_synced_search_indexes(session):
+    # A worker's index, synced before the import
+    index = SearchIndex()
+    await SearchService(session).index_changes(index)
+
+    history = {"created_at": "2019-05-01T10:00:00",
+               "updated_at": "2019-05-01T10:00:00"}
+    lines = jsonl(USER, CATEGORY, {**THREAD, **history},
+                  {**posts(1)[0], **history, "content": "vintage reel"})
+    await ImportService(session).run("search", from_list(lines))
+
+    await SearchService(session).index_changes(index)
+    post = (await session.exec(select(Post))).one()
+    total, page = index.search("reel")
+    assert total == 1
+    assert page[0][0] == (POST, post.id)
+    assert index.search("archive")[0] == 1
+
+
+async def test_rejects_invalid_job(session):
+    with pytest.raises(HTTPException) as exc:
+        await ImportService(session).run("", from_list([]))
+    assert exc.value.status_code == 400
+
+
+async def test_iter_lines_splits_across_chunks():
+    chunks = [b'{"a"', b':1}\n{"b":2}\n{"c"', b":3}"]
+    assert [line async for line in iter_lines(from_list(chunks))] == [
+        b'{"a":1}', b'{"b":2}', b'{"c":3}']
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import HTTPException
+
+from app.models.user import User
+from app.services.user_service import UserService
+from app.utils.loaders import UserLoader, embed_authors
+from app.utils.service_cache import user_cache
+
+
+async def add_users(session, count):
+    users = [User(username=f"u{i}", email=f"u{i}@x.y", password_hash="x")
+             for i in range(count)]
+    session.add_all(users)
+    await session.commit()
+    return users
+
+
+async def test_load_many_batches_and_caches(session):
+    users = await add_users(session, 3)
+    loader = UserLoader(session)
+
+    found = await loader.load_many(
+        [users[0].id, users[1].id, users[0].id, None, 999])
+    assert set(found) == {users[0].id, users[1].id}
+    assert found[users[1].id].username == "u1"
+    assert loader.batches == 1
+
+    # Cached ids, known missing ones included, are not queried again
+    await loader.load_many([users[1].id, 999])
+    assert loader.batches == 1
+    assert (await loader.load(users[2].id)).username == "u2"
+    assert loader.batches == 2
+    assert await loader.load(999) is None
+    assert loader.batches == 2
+
+
+async def test_embed_authors_uses_one_batch(session):
+    users = await add_users(session, 5)
+    items = [{"id": i, "user_id": users[i % 5].id} for i in range(50)]
+    items.append({"id": 50, "user_id": 999})
+    loader = UserLoader(session)
+
+    await embed_authors(loader, items)
+
+    assert loader.batches == 1
+    assert items[7]["author"]["username"] == "u2"
+    assert set(items[7]["author"]) == {
+        "id", "username", "avatar_url", "level", "reputation"}
+    assert items[50]["author"] is None
+
+
+async def test_profiles_are_cached_across_requests(session):
+    users = await add_users(session, 2)
+    service = UserService(session)
+    await service.get_profiles([users[0].id])
+
+    hits = user_cache.hits
+    profiles = await service.get_profiles([users[0].id, users[1].id])
+    assert user_cache.hits == hits + 1
+    assert profiles[users[1].id]["username"] == "u1"
+
+    await service.delete_user(users[0].id)
+    with pytest.raises(HTTPException) as exc:
+        await service.get_public_profile(users[0].id)
+    assert exc.value.status_code == 404
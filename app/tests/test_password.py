@@ -0,0 +1,41 @@
+import os
+import signal
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.password import PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=1, rounds=4)
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_hash_and_verify(hasher):
+    hashed = await hasher.hash("secret")
+    assert await hasher.verify_and_update("secret", hashed) == (True, None)
+    assert (await hasher.verify_and_update("wrong", hashed))[0] is False
+    assert hasher.stats()["completed"] == 3
+
+
+async def test_rejects_when_queue_full(hasher):
+    hasher.pending = hasher.max_pending
+    with pytest.raises(HTTPException) as exc:
+        await hasher.hash("secret")
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+    assert hasher.stats()["rejected"] == 1
+
+
+async def test_replaces_a_pool_whose_worker_died(hasher):
+    hashed = await hasher.hash("secret")
+    for process in list(hasher._executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+    assert await hasher.verify_and_update("secret", hashed) == (True, None)
+    assert hasher.stats()["restarts"] == 1
+    assert (await hasher.verify_and_update("secret", hashed))[0]
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.pool_metrics import InstrumentedQueuePool, get_pool_metrics
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    await engine.dispose()
+
+
+async def test_records_checkouts(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        metrics = get_pool_metrics(engine.pool)
+        assert metrics["checked_out"] == 1
+
+    metrics = get_pool_metrics(engine.pool)
+    assert metrics["checked_out"] == 0
+    assert metrics["checkouts"] == 1
+    assert metrics["timeouts"] == 0
+
+
+async def test_records_timeouts(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            async with engine.connect():
+                pass
+
+    metrics = get_pool_metrics(engine.pool)
+    assert metrics["timeouts"] == 1
+    assert metrics["wait_max_ms"] >= 50
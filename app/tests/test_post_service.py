@@ -12,77 +12,127 @@ def post_service(session):
     return PostService(session)
 
 
-def test_create_post(post_service):
+async def test_create_post(post_service):
     data = PostCreate(thread_id=1, content="Test Content")
-    post = post_service.create(data, user_id=1)
+    post = await post_service.create(data, user_id=1)
     assert post.id is not None
     assert post.thread_id == 1
     assert post.content == "Test Content"
     assert post.user_id == 1
 
 
-def test_get_by_id(post_service):
+async def test_get_by_id(post_service):
     data = PostCreate(thread_id=1, content="Some Content")
-    created = post_service.create(data, user_id=2)
-    found = post_service.get_by_id(created.id)
+    created = await post_service.create(data, user_id=2)
+    found = await post_service.get_by_id(created.id)
     assert found.id == created.id
     assert found.thread_id == 1
     assert found.content == "Some Content"
 
 
-def test_get_by_id_not_found_raises(post_service):
+async def test_get_by_id_not_found_raises(post_service):
     with pytest.raises(HTTPException) as exc:
-        post_service.get_by_id(999)
+        await post_service.get_by_id(999)
     assert exc.value.status_code == 404
 
 
-def test_get_all(post_service):
-    post_service.create(PostCreate(
+async def test_get_all(post_service):
+    await post_service.create(PostCreate(
         thread_id=1, content="Content1"), user_id=1)
-    post_service.create(PostCreate(
+    await post_service.create(PostCreate(
         thread_id=2, content="Content2"), user_id=1)
-    posts = post_service.get_all()
+    posts = await post_service.get_all()
     assert len(posts) == 2
 
 
-def test_get_paginated(post_service):
+async def test_get_paginated(post_service):
     for i in range(15):
-        post_service.create(PostCreate(
+        await post_service.create(PostCreate(
             thread_id=1, content=f"Content{i}"), user_id=1)
-    posts = post_service.get_paginated(skip=5, limit=5)
+    posts = await post_service.get_paginated(skip=5, limit=5)
     assert len(posts) == 5
     assert posts[0].thread_id == 1
 
 
-def test_update_post(post_service):
-    created = post_service.create(PostCreate(
+async def test_update_post(post_service):
+    created = await post_service.create(PostCreate(
         thread_id=1, content="Old Content"), user_id=1)
     update_data = PostUpdate(content="Updated Content")
-    updated = post_service.update(created.id, update_data, user_id=1)
+    updated = await post_service.update(created.id, update_data, user_id=1)
     assert updated.thread_id == 1
     assert updated.content == "Updated Content"
 
 
-def test_update_post_unauthorized(post_service):
-    created = post_service.create(PostCreate(
+async def test_update_post_unauthorized(post_service):
+    created = await post_service.create(PostCreate(
         thread_id=1, content="Content"), user_id=1)
     update_data = PostUpdate(content="Hacked Title")
     with pytest.raises(HTTPException) as exc:
-        post_service.update(created.id, update_data, user_id=2)
+        await post_service.update(created.id, update_data, user_id=2)
     assert exc.value.status_code == 403
 
 
-def test_delete_post(post_service, session):
-    created = post_service.create(PostCreate(
+async def test_delete_post(post_service, session):
+    created = await post_service.create(PostCreate(
         thread_id=1, content="DeleteMe"), user_id=1)
-    post_service.delete(created.id, user_id=1)
-    result = session.exec(select(Post).where(Post.id == created.id)).first()
+    await post_service.delete(created.id, user_id=1)
+    result = (await session.exec(select(Post).where(Post.id == created.id))).first()
     assert result is None
 
 
-def test_delete_post_unauthorized(post_service):
-    created = post_service.create(PostCreate(
+async def test_delete_post_unauthorized(post_service):
+    created = await post_service.create(PostCreate(
         thread_id=1, content="Content"), user_id=1)
     with pytest.raises(HTTPException) as exc:
-        post_service.delete(created.id, user_id=2)
+        await post_service.delete(created.id, user_id=2)
     assert exc.value.status_code == 403
+
+
+async def test_get_by_cursor(post_service):
+    for i in range(7):
+        await post_service.create(PostCreate(
+            thread_id=1, content=f"Content{i}"), user_id=1)
+    first = await post_service.get_by_cursor(limit=5)
+    assert [p.content for p in first.items] == [
+        f"Content{i}" for i in range(6, 1, -1)]
+    second = await post_service.get_by_cursor(cursor=first.next_cursor, limit=5)
+    assert [p.content for p in second.items] == ["Content1", "Content0"]
+    assert second.next_cursor is None
+
+
+async def test_get_by_thread_pages_both_ways(post_service):
+    for i in range(5):
+        await post_service.create(PostCreate(
+            thread_id=1, content=f"Reply{i}"), user_id=1)
+        await post_service.create(PostCreate(
+            thread_id=2, content=f"Other{i}"), user_id=1)
+
+    first = await post_service.get_by_thread(1, limit=2)
+    assert [p.content for p in first.items] == ["Reply0", "Reply1"]
+    assert first.prev_cursor is None
+
+    second = await post_service.get_by_thread(1, after=first.next_cursor, limit=2)
+    assert [p.content for p in second.items] == ["Reply2", "Reply3"]
+
+    back = await post_service.get_by_thread(1, before=second.prev_cursor, limit=2)
+    assert [p.content for p in back.items] == ["Reply0", "Reply1"]
+    assert back.prev_cursor is None
+
+    last = await post_service.get_by_thread(1, after=second.next_cursor, limit=2)
+    assert [p.content for p in last.items] == ["Reply4"]
+    assert last.next_cursor is None
+
+
+async def test_get_by_thread_rejects_both_cursors(post_service):
+    with pytest.raises(HTTPException) as exc:
+        await post_service.get_by_thread(1, after="x", before="y")
+    assert exc.value.status_code == 400
+
+
+async def test_stream_all_yields_batches(post_service):
+    for i in range(5):
+        await post_service.create(PostCreate(
+            thread_id=1, content=f"Content{i}"), user_id=1)
+    batches = [batch async for batch in post_service.stream_all(batch_size=2)]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0][0].content == "Content0"
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import Request
+
+from app.db.replicas import (
+    STICKY_COOKIE,
+    ReplicaSet,
+    RoutingSession,
+    is_sticky,
+    sticky_users
+)
+from app.models.user import User
+
+
+@pytest.fixture
+async def databases(tmp_path):
+    """A primary and a replica that has drifted from it."""
+    engines = []
+    for name in ("primary", "replica"):
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add(User(username=name, email=f"{name}@x.y",
+                             password_hash="x"))
+            await session.commit()
+        engines.append(engine)
+    yield engines
+    for engine in engines:
+        await engine.dispose()
+
+
+def request(cookie: str = "", user_id=None) -> Request:
+    scope = {"type": "http", "headers": [], "state": {}}
+    if cookie:
+        scope["headers"].append((b"cookie", cookie.encode()))
+    if user_id is not None:
+        scope["state"]["user_id"] = user_id
+    return Request(scope)
+
+
+async def test_round_robin_skips_failed_replicas(databases):
+    primary, replica = databases
+    replicas = ReplicaSet([primary, replica], "round_robin", retry_after=60)
+    assert [replicas.pick() for _ in range(4)] == [
+        primary, replica, primary, replica]
+
+    replicas.mark_failed(replica)
+    assert {replicas.pick() for _ in range(3)} == {primary}
+    replicas.mark_failed(primary)
+    assert replicas.pick() is None
+
+
+async def test_least_connections(databases):
+    first, second = databases
+    replicas = ReplicaSet([first, second], "least_connections", 60)
+    async with first.connect():
+        assert replicas.pick() is second
+
+
+async def test_replica_errors_take_it_out(databases):
+    _, replica = databases
+    replicas = ReplicaSet([replica], "round_robin", retry_after=60)
+    async with replica.connect() as conn:
+        with pytest.raises(OperationalError):
+            await conn.execute(text("SELECT * FROM missing_table"))
+    assert replicas.pick() is None
+    assert replicas.stats()[0]["failures"] == 1
+    # Metrics name replicas by position, not by URL
+    assert replica.url.database not in str(replicas.stats())
+
+
+async def test_reads_use_replica_until_the_session_writes(databases):
+    primary, replica = databases
+    async with AsyncSession(primary, sync_session_class=RoutingSession) \
+            as session:
+        session.info["replica"] = replica
+        names = (await session.exec(select(User.username))).all()
+        assert names == ["replica"]
+
+        session.add(User(username="new", email="n@x.y", password_hash="x"))
+        await session.commit()
+        names = (await session.exec(select(User.username))).all()
+        assert names == ["primary", "new"]
+
+
+async def test_sticky_cookie_and_user():
+    assert not is_sticky(request())
+    assert is_sticky(request(f"{STICKY_COOKIE}={int(time.time()) + 5}"))
+    assert not is_sticky(request(f"{STICKY_COOKIE}={int(time.time()) - 1}"))
+    assert not is_sticky(request(f"{STICKY_COOKIE}=junk"))
+
+    sticky_users.set(42, True)
+    assert is_sticky(request(user_id=42))
+    assert not is_sticky(request(user_id=43))
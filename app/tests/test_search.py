@@ -0,0 +1,201 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import delete, select
+
+from app.models.category import Category
+from app.models.post import Post
+from app.models.search_tombstone import SearchTombstone
+from app.models.thread import Thread
+from app.schemas.post import PostCreate, PostUpdate
+from app.schemas.thread import ThreadCreate, ThreadUpdate
+from app.services.post_service import PostService
+from app.services.search_service import SearchService
+from app.services.thread_service import ThreadService
+from app.utils.search import POST, THREAD, SearchIndex, search_index
+
+
+@pytest.fixture(autouse=True)
+def empty_index():
+    search_index.clear()
+    yield
+    search_index.clear()
+
+
+@pytest.fixture
+async def categories(session):
+    rows = [Category(name=f"c{i}", slug=f"c{i}") for i in range(2)]
+    session.add_all(rows)
+    await session.commit()
+    return rows
+
+
+def test_bm25_ranks_rarer_and_denser_matches_first():
+    index = SearchIndex()
+    index.add((POST, 1), "the cat sat on the mat", 1)
+    index.add((POST, 2), "cat cat cat", 1)
+    index.add((POST, 3), "the dog", 1)
+
+    total, page = index.search("cat")
+    assert total == 2
+    assert [key for key, _ in page] == [(POST, 2), (POST, 1)]
+
+    # "dog" is rarer than "the", so post 3 wins on both terms
+    total, page = index.search("the dog")
+    assert total == 2
+    assert page[0][0] == (POST, 3)
+
+
+def test_remove_and_re_add_keep_stats_consistent():
+    index = SearchIndex()
+    index.add((POST, 1), "alpha beta", 1)
+    index.add((POST, 1), "gamma", 1)
+    assert index.search("alpha") == (0, [])
+    assert index.search("gamma")[0] == 1
+
+    index.remove((POST, 1))
+    assert len(index) == 0
+    assert index.stats()["terms"] == 0
+
+
+def test_category_filter_follows_thread_moves():
+    index = SearchIndex()
+    thread = Thread(id=1, user_id=1, category_id=1, title="Guitars",
+                    slug="g")
+    index.add_thread(thread)
+    index.add_post(Post(id=1, user_id=1, thread_id=1, content="guitars"))
+
+    assert index.search("guitars", category_id=1)[0] == 2
+    thread.category_id = 2
+    index.add_thread(thread)
+    assert index.search("guitars", category_id=1)[0] == 0
+    assert index.search("guitars", category_id=2)[0] == 2
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = SearchIndex()
+    index.add_thread(Thread(id=1, user_id=1, category_id=3, title="Synths",
+                            slug="s"))
+    index.add_post(Post(id=2, user_id=1, thread_id=1, content="modular synths"))
+    index.watermark = datetime(2026, 1, 1, 12, 30)
+    path = str(tmp_path / "index.json")
+    index.save(path)
+
+    loaded = SearchIndex()
+    assert loaded.load(path)
+    assert loaded.watermark == index.watermark
+    assert loaded.search("synths", category_id=3) == index.search(
+        "synths", category_id=3)
+    assert not SearchIndex().load(str(tmp_path / "missing.json"))
+
+
+async def test_writes_update_the_index(session, categories):
+    thread = await ThreadService(session).create(
+        ThreadCreate(title="Drum machines", slug="d",
+                     category_id=categories[0].id),
+        user_id=1)
+    post = await PostService(session).create(
+        PostCreate(thread_id=thread.id, content="Which drum machine?"),
+        user_id=1)
+
+    results = await SearchService(session).search("drum")
+    assert {(hit.type, hit.id) for hit in results.items} == {
+        (THREAD, thread.id), (POST, post.id)}
+    hit = next(hit for hit in results.items if hit.type == POST)
+    assert (hit.title, hit.category_id) == ("Drum machines", categories[0].id)
+    assert hit.snippet == "Which drum machine?"
+
+    await PostService(session).update(
+        post.id, PostUpdate(content="Samplers instead"), user_id=1)
+    await ThreadService(session).update(thread.id, ThreadUpdate(
+        title="Samplers", category_id=categories[1].id,
+        updated_at=thread.updated_at), user_id=1)
+    assert (await SearchService(session).search("drum")).total == 0
+    results = await SearchService(session).search(
+        "samplers", category_id=categories[1].id)
+    assert results.total == 2
+
+    await PostService(session).delete(post.id, user_id=1)
+    assert (await SearchService(session).search("samplers")).total == 1
+
+
+async def test_rows_deleted_elsewhere_are_dropped(session, categories):
+    thread = await ThreadService(session).create(
+        ThreadCreate(title="Tape loops", slug="t",
+                     category_id=categories[0].id),
+        user_id=1)
+    post = await PostService(session).create(
+        PostCreate(thread_id=thread.id, content="tape loops"), user_id=1)
+
+    await session.exec(delete(Post).where(Post.id == post.id))
+    await session.commit()
+
+    results = await SearchService(session).search("tape")
+    assert [(hit.type, hit.id) for hit in results.items] == [
+        (THREAD, thread.id)]
+    assert results.total == 1
+    assert len(search_index) == 1
+
+
+async def test_index_changes_catches_up_from_watermark(session, categories):
+    session.add(Thread(user_id=1, category_id=categories[0].id,
+                       title="Field recordings", slug="f"))
+    await session.commit()
+
+    index = SearchIndex()
+    assert await SearchService(session).index_changes(index) == 1
+    assert index.search("field")[0] == 1
+
+    session.add(Thread(user_id=1, category_id=categories[0].id,
+                       title="Field mics", slug="m"))
+    await session.commit()
+    await SearchService(session).index_changes(index)
+    assert index.search("field")[0] == 2
+
+
+async def test_index_changes_drops_rows_deleted_by_other_workers(
+        session, categories):
+    thread = await ThreadService(session).create(
+        ThreadCreate(title="Modular patches", slug="p",
+                     category_id=categories[0].id),
+        user_id=1)
+    post = await PostService(session).create(
+        PostCreate(thread_id=thread.id, content="modular patches"),
+        user_id=1)
+    other = await PostService(session).create(
+        PostCreate(thread_id=thread.id, content="cables"), user_id=1)
+
+    # The index of another worker, synced before the deletes
+    index = SearchIndex()
+    await SearchService(session).index_changes(index)
+    await PostService(session).delete(post.id, user_id=1)
+    await SearchService(session).index_changes(index)
+
+    # Same hits and scores as the index of the worker that deleted it
+    assert index.search("modular") == search_index.search("modular")
+    assert index.search("modular")[0] == 1
+    assert len(index) == len(search_index) == 2
+
+    await PostService(session).delete(other.id, user_id=1)
+    await ThreadService(session).delete(thread.id, user_id=1)
+    await SearchService(session).index_changes(index)
+    assert len(index) == 0
+
+
+async def test_reap_tombstones_keeps_recent_ones(session):
+    old = SearchTombstone(kind=POST, row_id=1,
+                          deleted_at=datetime(2000, 1, 1))
+    recent = SearchTombstone(kind=POST, row_id=2)
+    session.add_all([old, recent])
+    await session.commit()
+
+    await SearchService(session).reap_tombstones()
+    rows = (await session.exec(select(SearchTombstone.row_id))).all()
+    assert rows == [2]
+
+
+async def test_search_rejects_empty_query(session):
+    with pytest.raises(HTTPException) as exc:
+        await SearchService(session).search("  ?! ")
+    assert exc.value.status_code == 400
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from app.models.post import Post
+from app.models.thread import Thread
+from app.schemas.pagination import CursorPage
+from app.utils.serialization import (
+    FastJSONResponse,
+    page_to_dict,
+    rows_to_dicts
+)
+
+
+def make_posts():
+    return [
+        Post(id=1, user_id=1, thread_id=1, content="héllo \"world\"",
+             created_at=datetime(2026, 1, 1, 12, 0, 0, 123456)),
+        Post(id=2, user_id=2, thread_id=1, content="second", is_edited=True,
+             edited_at=datetime(2026, 1, 2), edited_by=2, upvote_count=3),
+    ]
+
+
+def fastapi_body(model, content):
+    # What FastAPI does for a response_model: validate, then encode
+    adapter = TypeAdapter(model)
+    validated = adapter.validate_python(content, from_attributes=True)
+    return json.loads(JSONResponse(
+        jsonable_encoder(adapter.dump_python(validated))).body)
+
+
+def fast_body(content):
+    return json.loads(FastJSONResponse(content).body)
+
+
+async def test_rows_match_response_model_output(session):
+    posts = make_posts()
+    session.add_all(posts)
+    session.add(Thread(id=1, user_id=1, category_id=1, title="t", slug="t"))
+    await session.commit()
+
+    assert fast_body(rows_to_dicts(posts, Post)) == \
+        fastapi_body(List[Post], posts)
+
+    thread = await session.get(Thread, 1)
+    assert fast_body(rows_to_dicts([thread], Thread)[0]) == \
+        fastapi_body(Thread, thread)
+
+
+def test_page_matches_response_model_output():
+    page = CursorPage[Post](items=make_posts(), next_cursor="abc")
+    assert fast_body(page_to_dict(page, Post)) == \
+        fastapi_body(CursorPage[Post], page)
@@ -0,0 +1,90 @@
+import pytest
+from sqlmodel import update
+
+from app.models.category import Category
+from app.models.post import Post
+from app.models.thread import Thread
+from app.models.vote import PostVote
+from app.schemas.post import PostCreate
+from app.schemas.thread import ThreadCreate, ThreadUpdate
+from app.services.post_service import PostService
+from app.services.stats_service import StatsService
+from app.services.thread_service import ThreadService
+
+
+@pytest.fixture
+async def categories(session):
+    rows = [Category(name=f"c{i}", slug=f"c{i}") for i in range(2)]
+    session.add_all(rows)
+    await session.commit()
+    return rows
+
+
+async def test_posts_update_thread_and_category(session, categories):
+    thread = await ThreadService(session).create(
+        ThreadCreate(title="t", slug="t", category_id=categories[0].id),
+        user_id=1)
+    first = await PostService(session).create(
+        PostCreate(thread_id=thread.id, content="first"), user_id=1)
+    second = await PostService(session).create(
+        PostCreate(thread_id=thread.id, content="second"), user_id=2)
+
+    await session.refresh(thread)
+    await session.refresh(categories[0])
+    assert thread.post_count == 2
+    assert thread.last_post_at == second.created_at
+    assert thread.last_post_user_id == 2
+    assert (categories[0].thread_count, categories[0].post_count) == (1, 2)
+
+    await PostService(session).delete(second.id, user_id=2)
+    await session.refresh(thread)
+    assert thread.post_count == 1
+    assert thread.last_post_at == first.created_at
+    assert thread.last_post_user_id == 1
+
+
+async def test_moving_thread_moves_counts(session, categories):
+    thread = await ThreadService(session).create(
+        ThreadCreate(title="t", slug="t", category_id=categories[0].id),
+        user_id=1)
+    await PostService(session).create(
+        PostCreate(thread_id=thread.id, content="post"), user_id=1)
+    await session.refresh(thread)
+
+    await ThreadService(session).update(thread.id, ThreadUpdate(
+        title="t", category_id=categories[1].id,
+        updated_at=thread.updated_at), user_id=1)
+
+    for category in categories:
+        await session.refresh(category)
+    assert (categories[0].thread_count, categories[0].post_count) == (0, 0)
+    assert (categories[1].thread_count, categories[1].post_count) == (1, 1)
+
+
+async def test_recompute_repairs_counters(session, categories):
+    thread = Thread(user_id=1, category_id=categories[0].id,
+                    title="t", slug="t")
+    session.add(thread)
+    await session.commit()
+    posts = [Post(user_id=i, thread_id=thread.id, content=f"p{i}")
+             for i in range(1, 4)]
+    session.add_all(posts)
+    await session.commit()
+    session.add_all([
+        PostVote(post_id=posts[0].id, user_id=1, value=1),
+        PostVote(post_id=posts[0].id, user_id=2, value=-1),
+    ])
+    await session.exec(update(Category).values(post_count=42))
+    await session.commit()
+
+    await StatsService(session).recompute(batch_size=1)
+
+    await session.refresh(thread)
+    for category in categories:
+        await session.refresh(category)
+    await session.refresh(posts[0])
+    assert thread.post_count == 3
+    assert thread.last_post_user_id == 3
+    assert (categories[0].thread_count, categories[0].post_count) == (1, 3)
+    assert categories[1].post_count == 0
+    assert (posts[0].upvote_count, posts[0].downvote_count) == (1, 1)
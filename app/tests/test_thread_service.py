@@ -1,9 +1,12 @@
 from datetime import datetime
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event
 from sqlmodel import SQLModel, Session, create_engine, select
 from app.services.thread_service import ThreadService
+from app.models.post import Post
 from app.models.thread import Thread
+from app.models.user import User
 from app.schemas.thread import ThreadCreate, ThreadUpdate
 
 
@@ -12,21 +15,21 @@ def thread_service(session):
     return ThreadService(session)
 
 
-def test_create_thread(thread_service):
+async def test_create_thread(thread_service):
     data = ThreadCreate(title="Test Thread", category_id=1,
                         slug="thread-content")
-    thread = thread_service.create(data, user_id=1)
+    thread = await thread_service.create(data, user_id=1)
     assert thread.id is not None
     assert thread.title == "Test Thread"
     assert thread.slug == "thread-content"
     assert thread.user_id == 1
 
 
-def test_get_by_id(thread_service):
+async def test_get_by_id(thread_service):
     data = ThreadCreate(title="GetById Thread", category_id=1,
                         slug="thread-content")
-    created = thread_service.create(data, user_id=2)
-    found = thread_service.get_by_id(created.id)
+    created = await thread_service.create(data, user_id=2)
+    found = await thread_service.get_by_id(created.id)
     assert found.id == created.id
     assert found.title == "GetById Thread"
     assert found.slug == "thread-content"
@@ -34,63 +37,132 @@ def test_get_by_id(thread_service):
     assert found.category_id == 1
 
 
-def test_get_by_id_not_found_raises(thread_service):
+async def test_get_by_id_not_found_raises(thread_service):
     with pytest.raises(HTTPException) as exc:
-        thread_service.get_by_id(999)
+        await thread_service.get_by_id(999)
     assert exc.value.status_code == 404
 
 
-def test_get_all(thread_service):
-    thread_service.create(ThreadCreate(
+async def test_get_all(thread_service):
+    await thread_service.create(ThreadCreate(
         title="GetById Thread", category_id=1,
         slug="thread-content"), user_id=1)
-    thread_service.create(ThreadCreate(
+    await thread_service.create(ThreadCreate(
         title="Thread2", category_id=1, slug="thread2"), user_id=1)
-    threads = thread_service.get_all()
+    threads = await thread_service.get_all()
     assert len(threads) == 2
 
 
-def test_get_paginated(thread_service):
+async def test_get_paginated(thread_service):
     for i in range(15):
-        thread_service.create(ThreadCreate(
+        await thread_service.create(ThreadCreate(
             title=f"Thread{i}", category_id=1, slug=f"thread{i}"), user_id=1)
-    threads = thread_service.get_paginated(skip=5, limit=5)
+    threads = await thread_service.get_paginated(skip=5, limit=5)
     assert len(threads) == 5
     assert threads[0].title == "Thread5"
 
 
-def test_update_thread(thread_service):
-    created = thread_service.create(ThreadCreate(
+async def test_update_thread(thread_service):
+    created = await thread_service.create(ThreadCreate(
         title="Old Title", category_id=1, slug="old-title"), user_id=1)
     update_data = ThreadUpdate(
         title="New Title", category_id=1, updated_at=datetime.now())
-    updated = thread_service.update(created.id, update_data, user_id=1)
+    updated = await thread_service.update(created.id, update_data, user_id=1)
     assert updated.title == "New Title"
     assert updated.category_id == 1
 
 
-def test_update_thread_unauthorized(thread_service):
-    created = thread_service.create(ThreadCreate(
+async def test_update_thread_unauthorized(thread_service):
+    created = await thread_service.create(ThreadCreate(
         title="Title", category_id=1, slug="title-thread"), user_id=1)
     update_data = ThreadUpdate(
         title="Hacked Title", category_id=1, updated_at=datetime.now())
     with pytest.raises(HTTPException) as exc:
-        thread_service.update(created.id, update_data, user_id=2)
+        await thread_service.update(created.id, update_data, user_id=2)
     assert exc.value.status_code == 403
 
 
-def test_delete_thread(thread_service, session):
-    created = thread_service.create(ThreadCreate(
+async def test_delete_thread(thread_service, session):
+    created = await thread_service.create(ThreadCreate(
         title="ToDelete", category_id=1, slug="to-delete"), user_id=1)
-    thread_service.delete(created.id, user_id=1)
-    result = session.exec(select(Thread).where(
-        Thread.id == created.id)).first()
+    await thread_service.delete(created.id, user_id=1)
+    result = (await session.exec(select(Thread).where(
+        Thread.id == created.id))).first()
     assert result is None
 
 
-def test_delete_thread_unauthorized(thread_service):
-    created = thread_service.create(ThreadCreate(
+async def test_delete_thread_unauthorized(thread_service):
+    created = await thread_service.create(ThreadCreate(
         title="Title", category_id=1, slug="title-thread"), user_id=1)
     with pytest.raises(HTTPException) as exc:
-        thread_service.delete(created.id, user_id=2)
+        await thread_service.delete(created.id, user_id=2)
     assert exc.value.status_code == 403
+
+
+async def test_get_by_cursor(thread_service):
+    for i in range(15):
+        await thread_service.create(ThreadCreate(
+            title=f"Thread{i}", category_id=1, slug=f"thread{i}"), user_id=1)
+    first = await thread_service.get_by_cursor(limit=10)
+    assert len(first.items) == 10
+    assert first.items[0].title == "Thread14"
+    assert first.next_cursor is not None
+
+    second = await thread_service.get_by_cursor(cursor=first.next_cursor, limit=10)
+    assert [t.title for t in second.items] == [
+        f"Thread{i}" for i in range(4, -1, -1)]
+    assert second.next_cursor is None
+
+
+async def test_get_by_cursor_last_post_at_nulls_last(thread_service, session):
+    for i in range(4):
+        await thread_service.create(ThreadCreate(
+            title=f"Thread{i}", category_id=1, slug=f"thread{i}"), user_id=1)
+    active = await thread_service.get_by_id(2)
+    active.last_post_at = datetime.now()
+    session.add(active)
+    await session.commit()
+
+    first = await thread_service.get_by_cursor(limit=2, order_by="last_post_at")
+    assert [t.id for t in first.items] == [2, 4]
+    second = await thread_service.get_by_cursor(
+        cursor=first.next_cursor, limit=2, order_by="last_post_at")
+    assert [t.id for t in second.items] == [3, 1]
+
+
+async def test_get_by_cursor_invalid_raises(thread_service):
+    with pytest.raises(HTTPException) as exc:
+        await thread_service.get_by_cursor(cursor="not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+async def test_get_full_uses_three_queries(thread_service, session):
+    users = [User(username=f"u{i}", email=f"u{i}@x.y", password_hash="x",
+                  reputation=i) for i in range(10)]
+    session.add_all(users)
+    await session.commit()
+    thread = await thread_service.create(ThreadCreate(
+        title="Busy", category_id=1, slug="busy"), user_id=users[0].id)
+    session.add_all([
+        Post(thread_id=thread.id, user_id=users[i % 10].id, content=str(i))
+        for i in range(100)
+    ])
+    await session.commit()
+    session.expunge_all()
+
+    statements = []
+    engine = session.bind.sync_engine
+    listener = (lambda conn, cursor, statement, *args:
+                statements.append(statement))
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        full = await thread_service.get_full(thread.id, limit=100)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 3
+    assert full.thread.id == thread.id
+    assert len(full.posts.items) == 100
+    assert sorted(full.authors) == sorted(user.id for user in users)
+    assert full.authors[users[3].id].username == "u3"
+    assert full.authors[users[3].id].reputation == 3
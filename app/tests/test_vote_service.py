@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.category import Category
+from app.models.post import Post
+from app.models.thread import Thread
+from app.models.user import User
+from app.models.vote import PostVote
+from app.services.post_service import PostService
+from app.services.vote_service import VoteService
+from app.utils.counters import post_votes
+
+
+@pytest.fixture
+def vote_service(service_factory):
+    post_votes._pending.clear()
+    yield service_factory(VoteService)
+    post_votes._pending.clear()
+
+
+@pytest.fixture
+async def post(session):
+    post = Post(user_id=1, thread_id=1, content="Vote on me")
+    session.add(post)
+    await session.commit()
+    return post
+
+
+async def test_vote_records_one_vote_per_user(vote_service, session, post):
+    await vote_service.vote(post.id, user_id=1, value=1)
+    result = await vote_service.vote(post.id, user_id=1, value=1)
+    assert result.upvote_count == 1
+
+    votes = (await session.exec(select(PostVote))).all()
+    assert [(v.user_id, v.value) for v in votes] == [(1, 1)]
+
+
+async def test_changing_vote_moves_counters(vote_service, post):
+    await vote_service.vote(post.id, user_id=1, value=1)
+    await vote_service.vote(post.id, user_id=2, value=1)
+    result = await vote_service.vote(post.id, user_id=1, value=-1)
+    assert (result.upvote_count, result.downvote_count) == (1, 1)
+
+    result = await vote_service.vote(post.id, user_id=2, value=0)
+    assert (result.upvote_count, result.downvote_count) == (0, 1)
+
+
+async def test_votes_are_flushed_in_batches(vote_service, session, post):
+    for user_id in range(1, 4):
+        await vote_service.vote(post.id, user_id=user_id, value=1)
+
+    # Nothing is written to the post row until the buffer is flushed
+    await session.refresh(post)
+    assert post.upvote_count == 0
+
+    await post_votes.flush(session)
+    await session.refresh(post)
+    assert post.upvote_count == 3
+
+
+async def test_vote_missing_post(vote_service):
+    with pytest.raises(HTTPException) as exc:
+        await vote_service.vote(999, user_id=1, value=1)
+    assert exc.value.status_code == 404
+
+
+@pytest.fixture
+async def file_engine(tmp_path):
+    # Separate sessions need a database they can all see
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/votes.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.parametrize("previous, value", [(0, 1), (1, -1), (1, 0)])
+async def test_concurrent_votes_count_once(vote_service, file_engine,
+                                           previous, value):
+    async with AsyncSession(file_engine, expire_on_commit=False) as session:
+        post = Post(user_id=1, thread_id=1, content="Vote on me")
+        session.add(post)
+        if previous:
+            session.add(PostVote(post_id=1, user_id=1, value=previous))
+        await session.commit()
+
+    async def vote():
+        async with AsyncSession(file_engine, expire_on_commit=False) as session:
+            await VoteService(session).vote(1, user_id=1, value=value)
+
+    post_votes._pending.clear()
+    await asyncio.gather(vote(), vote())
+
+    # Counters move exactly as far as the row did
+    assert post_votes.pending(1, "upvote_count") == (
+        (value == 1) - (previous == 1))
+    assert post_votes.pending(1, "downvote_count") == (
+        (value == -1) - (previous == -1))
+
+
+async def test_deleting_a_voted_post(vote_service, tmp_path):
+    # Foreign keys enforced, as MySQL does
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/fk.db")
+    event.listen(engine.sync_engine, "connect",
+                 lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(User(username="u", email="u@x.y", password_hash="x"))
+        session.add(Category(name="c", slug="c"))
+        await session.flush()
+        session.add(Thread(user_id=1, category_id=1, title="t", slug="t"))
+        await session.flush()
+        session.add(Post(user_id=1, thread_id=1, content="Vote on me"))
+        await session.commit()
+
+        await VoteService(session).vote(1, user_id=1, value=1)
+        await PostService(session).delete(1, user_id=1)
+
+        assert (await session.exec(select(PostVote))).all() == []
+        assert post_votes.pending(1, "upvote_count") == 0
+    await engine.dispose()
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from app.core.config import (
+    ADMISSION_AUTH_CONCURRENCY,
+    ADMISSION_AUTH_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ADMISSION_READ_CONCURRENCY,
+    ADMISSION_READ_QUEUE,
+    ADMISSION_WRITE_CONCURRENCY,
+    ADMISSION_WRITE_QUEUE
+)
+
+AUTH = "auth"
+READ = "read"
+WRITE = "write"
+
+AUTH_PREFIX = "/api/v1/auth/"
+# Left unlimited so metrics stay reachable during an overload
+EXEMPT_PREFIXES = ("/api/v1/internal/",)
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    if path.startswith(AUTH_PREFIX):
+        return AUTH
+    return READ if method in READ_METHODS else WRITE
+
+
+class AdmissionLimiter:
+    """
+    Runs at most `limit` requests at once. Up to `max_queue` more wait in
+    FIFO order for at most `timeout` seconds, and the rest are turned
+    away at once, so an overloaded class sheds load instead of building
+    a backlog that would time out anyway.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int,
+                 timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._waiters: deque[asyncio.Future] = deque()
+        self.active = 0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.max_queued = 0
+        self.wait_total = 0.0
+
+    async def acquire(self) -> bool:
+        """Whether the request got a slot; it must then call `release`."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_full += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_queued = max(self.max_queued, len(self._waiters))
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            # A slot handed over in the tick the deadline passed is kept,
+            # as nothing else would give it back
+            if not waiter.done() or waiter.cancelled():
+                self._discard(waiter)
+                self.rejected_timeout += 1
+                return False
+        except asyncio.CancelledError:
+            # The client went away, possibly right after being handed a slot
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        finally:
+            self.wait_total += time.perf_counter() - start
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        # The slot passes straight to the next live waiter
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_total": self.wait_total,
+        }
+
+
+def create_limiters(limits: dict[str, tuple[int, int]],
+                    timeout: float) -> dict[str, AdmissionLimiter]:
+    return {
+        name: AdmissionLimiter(name, limit, max_queue, timeout)
+        for name, (limit, max_queue) in limits.items()
+        if limit > 0
+    }
+
+
+admission_limiters = create_limiters({
+    AUTH: (ADMISSION_AUTH_CONCURRENCY, ADMISSION_AUTH_QUEUE),
+    READ: (ADMISSION_READ_CONCURRENCY, ADMISSION_READ_QUEUE),
+    WRITE: (ADMISSION_WRITE_CONCURRENCY, ADMISSION_WRITE_QUEUE),
+}, timeout=ADMISSION_QUEUE_TIMEOUT_SECONDS)
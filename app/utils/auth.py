@@ -1,8 +1,19 @@
 from datetime import datetime, timedelta
 from jose import jwt
-from app.core.config import SECRET_KEY, ALGORITHM
+from app.core.config import (
+    SECRET_KEY,
+    ALGORITHM,
+    AUTH_CACHE_MAX_ENTRIES,
+    AUTH_CACHE_TTL_SECONDS
+)
+from app.utils.cache import TTLCache
 import hashlib
 
+# (user_id, session_id) -> user snapshot for sessions that have already
+# been validated
+auth_session_cache = TTLCache(
+    maxsize=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL_SECONDS)
+
 def create_token(data: dict, expires_delta: timedelta) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
@@ -10,5 +21,11 @@ def create_token(data: dict, expires_delta: timedelta) -> str:
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return token, expire
 
-def get_token_hash(token: str) -> str:
-    return hashlib.sha256(token.encode()).hexdigest()
+def get_token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def snapshot_user(user) -> dict:
+    return user.model_dump(exclude={"password_hash"})
+
+def invalidate_cached_session(user_id: int, session_id: int) -> None:
+    auth_session_cache.delete((user_id, session_id))
@@ -0,0 +1,155 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries also expire after `ttl` seconds,
+    or earlier when the caller passes an absolute `expires_at` timestamp.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        deadline, value = entry
+        if deadline <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict[Hashable, Any]:
+        """The entries found, by key."""
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        expires_at: Optional[float] = None
+    ) -> None:
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+
+        self._data[key] = (deadline, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [k for k in self._data if predicate(k)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class CacheNamespace:
+    """
+    One kind of entries in a cache backend (TTLCache or SharedCache),
+    dropped together by `invalidate`. Keys carry the namespace version,
+    which lives in the backend too, so an invalidation reaches every
+    process sharing the backend.
+
+    Callers that load rows on a miss should read `version()` before
+    loading and pass it to `set`, so a value loaded before a concurrent
+    invalidation is stored under the retired version.
+    """
+
+    def __init__(self, backend, name: str, ttl: Optional[float] = None):
+        self.backend = backend
+        self.name = name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def version(self) -> int:
+        version = self.backend.get(("namespace", self.name))
+        if version is None:
+            # A new version also retires entries of one that was evicted
+            version = time.time_ns()
+            self.backend.set(("namespace", self.name), version)
+        return version
+
+    def invalidate(self) -> None:
+        self.backend.set(("namespace", self.name), time.time_ns())
+        self.invalidations += 1
+
+    def get(self, key: Hashable, version: Optional[int] = None) -> Optional[Any]:
+        if version is None:
+            version = self.version()
+        value = self.backend.get((self.name, version, key))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_many(
+        self,
+        keys: Iterable[Hashable],
+        version: Optional[int] = None
+    ) -> dict[Hashable, Any]:
+        if version is None:
+            version = self.version()
+        keys = [(self.name, version, key) for key in keys]
+        found = self.backend.get_many(keys)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return {key: value for (_, _, key), value in found.items()}
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        version: Optional[int] = None
+    ) -> None:
+        if version is None:
+            version = self.version()
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        self.backend.set((self.name, version, key), value, expires_at)
+
+    def delete(self, key: Hashable) -> None:
+        self.backend.delete((self.name, self.version(), key))
+
+    def stats(self) -> dict:
+        """Counts of this process; the backend's cover all its users."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
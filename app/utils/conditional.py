@@ -0,0 +1,133 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, NamedTuple, Optional
+
+from fastapi import Request, Response, status
+
+from app.core.config import COMPRESSION_MIN_SIZE
+from app.utils.compression import choose_encoding, compress_cached
+from app.utils.counters import CounterBuffer
+
+# Columns that change whenever the serialized row does. Threads leave out
+# view_count, which changes on every read, so their ETags are weak.
+THREAD_VERSION_FIELDS = (
+    "id", "title", "category_id", "updated_at", "post_count", "last_post_at")
+POST_VERSION_FIELDS = ("id", "updated_at", "upvote_count", "downvote_count")
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    validators: Validators
+    # Content-Encoding -> compressed body, filled on first use
+    encoded: dict[str, bytes]
+
+
+def make_etag(data: bytes, weak: bool = False) -> str:
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def get_validators(
+    rows: Iterable,
+    fields: tuple[str, ...],
+    weak: bool = False,
+    pending: Optional[CounterBuffer] = None,
+    extra: tuple = (),
+    with_last_modified: bool = True
+) -> Validators:
+    """
+    Validators for a row or page of rows, computed from the version
+    fields alone so they can come from a narrow metadata query. Rows may
+    be ORM objects or result rows with the same attribute names. `extra`
+    covers the rest of the body, such as a page's cursors.
+
+    The API passes `with_last_modified=False`: counters such as votes and
+    post_count change without moving updated_at, a delete can move
+    last_post_at back, and a row leaving a page moves nothing at all.
+    Only the ETag covers every field.
+    """
+    parts = [extra]
+    last_modified = None
+    for row in rows:
+        values = []
+        for field in fields:
+            value = getattr(row, field)
+            if pending is not None and field in pending.columns:
+                value += pending.pending(row.id, field)
+            if isinstance(value, datetime):
+                last_modified = max(last_modified or value, value)
+            values.append(value)
+        parts.append(values)
+    if not with_last_modified:
+        last_modified = None
+    return Validators(make_etag(repr(parts).encode(), weak), last_modified)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    # If-Modified-Since is ignored when If-None-Match is present
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, validators.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or validators.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    # HTTP dates have no sub-second precision
+    return validators.last_modified.replace(microsecond=0) <= since
+
+
+def get_validator_headers(validators: Validators) -> dict[str, str]:
+    headers = {"ETag": validators.etag}
+    if validators.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            validators.last_modified.replace(tzinfo=timezone.utc),
+            usegmt=True
+        )
+    return headers
+
+
+def not_modified(validators: Validators) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=get_validator_headers(validators)
+    )
+
+
+def cached_response(request: Request, cached: CachedBody) -> Response:
+    if is_not_modified(request, cached.validators):
+        return not_modified(cached.validators)
+
+    body = cached.body
+    headers = get_validator_headers(cached.validators)
+    headers["Vary"] = "Accept-Encoding"
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    # Sent as is by CompressionMiddleware since it is already encoded
+    if encoding and len(body) >= COMPRESSION_MIN_SIZE:
+        body = compress_cached(body, cached.encoded, encoding)
+        headers["Content-Encoding"] = encoding
+        if not headers["ETag"].startswith("W/"):
+            headers["ETag"] = "W/" + headers["ETag"]
+    return Response(body, media_type="application/json", headers=headers)
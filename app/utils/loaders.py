@@ -0,0 +1,52 @@
+import asyncio
+from typing import Iterable, Optional
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.schemas.user import UserSummary
+from app.services.user_service import UserService
+
+
+class UserLoader:
+    """
+    Request-scoped batching loader for author summaries. Every id asked
+    for is fetched at most once per request, and each call to `load_many`
+    resolves all of its new ids with a single IN query.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        # None marks ids that do not exist, so they are not asked again
+        self._cache: dict[int, Optional[UserSummary]] = {}
+        # AsyncSession does not allow concurrent queries
+        self._lock = asyncio.Lock()
+        self.batches = 0
+
+    async def load_many(
+        self,
+        user_ids: Iterable[Optional[int]]
+    ) -> dict[int, UserSummary]:
+        wanted = {user_id for user_id in user_ids if user_id is not None}
+        async with self._lock:
+            missing = wanted - self._cache.keys()
+            if missing:
+                found = await UserService(self.session).get_summaries(missing)
+                self.batches += 1
+                for user_id in missing:
+                    self._cache[user_id] = found.get(user_id)
+        return {
+            user_id: self._cache[user_id]
+            for user_id in wanted
+            if self._cache[user_id] is not None
+        }
+
+    async def load(self, user_id: int) -> Optional[UserSummary]:
+        return (await self.load_many([user_id])).get(user_id)
+
+
+async def embed_authors(loader: UserLoader, items: list[dict]) -> None:
+    """Adds an `author` summary, or None, to serialized rows in place."""
+    authors = await loader.load_many(item["user_id"] for item in items)
+    for item in items:
+        author = authors.get(item["user_id"])
+        item["author"] = dict(author) if author is not None else None
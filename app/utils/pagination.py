@@ -0,0 +1,64 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort: str, value: Optional[datetime], row_id: int) -> str:
+    payload = {
+        "s": sort,
+        "v": value.isoformat() if value is not None else None,
+        "i": row_id,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple[Optional[datetime], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort:
+            raise ValueError("cursor sort mismatch")
+        value = payload["v"]
+        return (
+            datetime.fromisoformat(value) if value is not None else None,
+            int(payload["i"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def seek_before(
+    column,
+    id_column,
+    value: Optional[datetime],
+    row_id: int,
+    nullable: bool = False
+):
+    """
+    WHERE clause for the rows after (value, row_id) when ordering by
+    (column DESC, id DESC). For nullable columns NULL values come last,
+    as they do in MySQL and SQLite for descending order.
+    """
+    if value is None:
+        return and_(column.is_(None), id_column < row_id)
+
+    clause = or_(column < value, and_(column == value, id_column < row_id))
+    if nullable:
+        clause = or_(clause, column.is_(None))
+    return clause
+
+
+def seek_after(column, id_column, value: datetime, row_id: int):
+    """
+    WHERE clause for the rows after (value, row_id) when ordering by
+    (column ASC, id ASC) on a non-nullable column.
+    """
+    return or_(column > value, and_(column == value, id_column > row_id))
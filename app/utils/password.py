@@ -0,0 +1,142 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import (
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_WORKERS
+)
+
+
+# ---------- Worker process side ----------
+@lru_cache
+def _get_context(rounds: int) -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def _hash(password: str, rounds: int) -> str:
+    return _get_context(rounds).hash(password)
+
+
+def _verify_and_update(
+    password: str,
+    hashed_password: str,
+    rounds: int
+) -> tuple[bool, Optional[str]]:
+    return _get_context(rounds).verify_and_update(password, hashed_password)
+
+
+# ---------- Event loop side ----------
+class PasswordHasher:
+    """
+    Runs bcrypt in a shared process pool so it neither blocks the event
+    loop nor competes for the GIL. Calls beyond `max_pending` in flight
+    are rejected with 503 instead of queueing behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor: ProcessPoolExecutor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> None:
+        # Calls in flight all see the same broken pool; the first replaces it
+        if self._executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.restarts += 1
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password operations in progress",
+                headers={"Retry-After": "1"}
+            )
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                # A worker died, e.g. OOM killed, which leaves the pool
+                # unusable for good; retried once on a new one
+                self._replace_executor(executor)
+                return await loop.run_in_executor(
+                    self._get_executor(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.pending -= 1
+            self.completed += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify_and_update(
+        self,
+        password: str,
+        hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Returns whether the password matches and, when the stored hash
+        was made with other cost parameters, a replacement hash.
+        """
+        return await self._run(
+            _verify_and_update, password, hashed_password, self.rounds)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "latency_avg_ms": (
+                self.latency_total / self.completed * 1000
+                if self.completed else 0.0
+            ),
+            "latency_max_ms": self.latency_max * 1000,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    rounds=BCRYPT_ROUNDS
+)
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+
+class RevocationList:
+    """
+    Expiring set of revoked session ids. An id only has to stay in the
+    set until the last access token issued for that session expires.
+    """
+
+    def __init__(self):
+        self._revoked: dict[int, datetime] = {}
+        self.last_sync: datetime | None = None
+
+    def revoke(self, session_id: int, until: datetime) -> None:
+        current = self._revoked.get(session_id)
+        if current is None or current < until:
+            self._revoked[session_id] = until
+
+    def is_revoked(self, session_id: int) -> bool:
+        until = self._revoked.get(session_id)
+        if until is None:
+            return False
+        if until <= datetime.utcnow():
+            del self._revoked[session_id]
+            return False
+        return True
+
+    def purge(self) -> None:
+        now = datetime.utcnow()
+        for session_id in [s for s, u in self._revoked.items() if u <= now]:
+            del self._revoked[session_id]
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revoked_sessions = RevocationList()
@@ -0,0 +1,227 @@
+import heapq
+import math
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+import orjson
+
+from app.models.post import Post
+from app.models.thread import Thread
+
+FORMAT_VERSION = 2
+
+# cache_versions row bumped by writes that bypass the updated_at
+# watermark, such as bulk imports; indexes that saw another version
+# are rebuilt
+SEARCH_VERSION = "search"
+
+# Documents are keyed by (kind, row id)
+THREAD = "thread"
+POST = "post"
+DocKey = tuple[str, int]
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def make_snippet(text: str, query: str, width: int = 200) -> str:
+    """`width` characters of `text` starting shortly before the first match."""
+    terms = set(tokenize(query))
+    start = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        if match.group().casefold() in terms:
+            start = max(0, match.start() - width // 4)
+            break
+    snippet = text[start:start + width]
+    if start > 0:
+        snippet = "..." + snippet
+    if start + width < len(text):
+        snippet += "..."
+    return snippet
+
+
+def write_snapshot(path: str, data: bytes) -> None:
+    # Readers only ever see a complete snapshot, even with several
+    # workers saving at once
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over thread titles and post content, ranked
+    with BM25. Post documents resolve their category through their
+    thread's document, so moving a thread never touches its posts.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.clear()
+        self.searches = 0
+
+    def clear(self) -> None:
+        self._postings: dict[str, dict[DocKey, int]] = {}
+        self._terms: dict[DocKey, dict[str, int]] = {}
+        self._lengths: dict[DocKey, int] = {}
+        self._total_length = 0
+        # Thread of every document, and category of every thread
+        self._thread_ids: dict[DocKey, int] = {}
+        self._categories: dict[int, int] = {}
+        # Rows updated before this time are in the index
+        self.watermark: Optional[datetime] = None
+        self.version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    # ---------- Updates ----------
+    def add(self, key: DocKey, text: str, thread_id: int) -> None:
+        self.remove(key)
+        terms = Counter(tokenize(text))
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[key] = frequency
+        self._terms[key] = dict(terms)
+        self._lengths[key] = length = sum(terms.values())
+        self._total_length += length
+        self._thread_ids[key] = thread_id
+
+    def remove(self, key: DocKey) -> None:
+        terms = self._terms.pop(key, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(key)
+        del self._thread_ids[key]
+
+    def add_thread(self, thread: Thread) -> None:
+        self._categories[thread.id] = thread.category_id
+        self.add((THREAD, thread.id), thread.title, thread.id)
+
+    def remove_thread(self, thread_id: int) -> None:
+        self.remove((THREAD, thread_id))
+        self._categories.pop(thread_id, None)
+
+    def add_post(self, post: Post) -> None:
+        self.add((POST, post.id), post.content, post.thread_id)
+
+    def remove_post(self, post_id: int) -> None:
+        self.remove((POST, post_id))
+
+    def replace(self, other: "SearchIndex") -> None:
+        """Swaps in an index built on the side, e.g. by a rebuild."""
+        self._postings = other._postings
+        self._terms = other._terms
+        self._lengths = other._lengths
+        self._total_length = other._total_length
+        self._thread_ids = other._thread_ids
+        self._categories = other._categories
+        self.watermark = other.watermark
+        self.version = other.version
+
+    # ---------- Queries ----------
+    def search(
+        self,
+        query: str,
+        category_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> tuple[int, list[tuple[DocKey, float]]]:
+        """
+        Returns the number of matching documents and one page of
+        (key, score) pairs, best first.
+        """
+        self.searches += 1
+        count = len(self._terms)
+        if not count:
+            return 0, []
+
+        average_length = self._total_length / count
+        scores: dict[DocKey, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(
+                1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self._lengths[key] / average_length)
+                scores[key] = scores.get(key, 0.0) + idf * (
+                    frequency * (self.k1 + 1) / (frequency + norm))
+
+        if category_id is not None:
+            scores = {
+                key: score for key, score in scores.items()
+                if self._categories.get(self._thread_ids[key]) == category_id
+            }
+
+        page = heapq.nlargest(
+            skip + limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return len(scores), page[skip:]
+
+    # ---------- Persistence ----------
+    def dump(self) -> bytes:
+        return orjson.dumps({
+            "format": FORMAT_VERSION,
+            "watermark": self.watermark,
+            "version": self.version,
+            "categories": list(self._categories.items()),
+            "documents": [
+                (kind, row_id, self._thread_ids[(kind, row_id)], terms)
+                for (kind, row_id), terms in self._terms.items()
+            ],
+        })
+
+    def save(self, path: str) -> None:
+        write_snapshot(path, self.dump())
+
+    def load(self, path: str) -> bool:
+        """Replaces the contents with a saved index, if there is one."""
+        try:
+            with open(path, "rb") as file:
+                data = orjson.loads(file.read())
+        except FileNotFoundError:
+            return False
+        if data.get("format") != FORMAT_VERSION:
+            return False
+
+        self.clear()
+        for kind, row_id, thread_id, terms in data["documents"]:
+            key = (kind, row_id)
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[key] = frequency
+            self._terms[key] = terms
+            self._lengths[key] = length = sum(terms.values())
+            self._total_length += length
+            self._thread_ids[key] = thread_id
+        self._categories = dict(map(tuple, data["categories"]))
+        if data["watermark"]:
+            self.watermark = datetime.fromisoformat(data["watermark"])
+        self.version = data["version"]
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self._terms),
+            "terms": len(self._postings),
+            "watermark": self.watermark,
+            "version": self.version,
+            "searches": self.searches,
+        }
+
+
+search_index = SearchIndex()
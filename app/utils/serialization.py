@@ -0,0 +1,48 @@
+from typing import Any, Iterable
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+from sqlmodel import SQLModel
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for data the server already trusts, encoded with
+    orjson. Returning it from an endpoint skips FastAPI's validation
+    against `response_model`, which still documents the schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def rows_to_dicts(
+    rows: Iterable[SQLModel],
+    model: type[SQLModel]
+) -> list[dict]:
+    """
+    Plain dicts with the model's fields in declaration order, read
+    straight from the loaded rows without building new model instances.
+    Loaded values come from the instance `__dict__`, skipping the ORM
+    descriptors; expired or deferred columns still go through getattr.
+    """
+    fields = tuple(model.model_fields)
+    content = []
+    for row in rows:
+        values = row.__dict__
+        try:
+            content.append({field: values[field] for field in fields})
+        except KeyError:
+            content.append({field: getattr(row, field) for field in fields})
+    return content
+
+
+def page_to_dict(page: BaseModel, model: type[SQLModel]) -> dict:
+    content = {"items": rows_to_dicts(page.items, model)}
+    for field in type(page).model_fields:
+        if field != "items":
+            content[field] = getattr(page, field)
+    return content
@@ -0,0 +1,34 @@
+from app.core.config import (
+    CACHE_BACKEND,
+    CACHE_MAX_ENTRIES,
+    CACHE_TTL_SECONDS,
+    SHARED_CACHE_PATH,
+    SHARED_CACHE_SLOT_SIZE,
+    SHARED_CACHE_SLOTS,
+    THREAD_PAGE_CACHE_TTL_SECONDS,
+    USER_CACHE_TTL_SECONDS
+)
+from app.utils.cache import CacheNamespace, TTLCache
+from app.utils.shared_cache import SharedCache
+
+
+def create_backend(name: str):
+    if name == "local":
+        return TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+    if name == "shared":
+        return SharedCache(
+            SHARED_CACHE_PATH,
+            slots=SHARED_CACHE_SLOTS,
+            slot_size=SHARED_CACHE_SLOT_SIZE,
+            ttl=CACHE_TTL_SECONDS
+        )
+    raise ValueError(f"Unknown cache backend {name}")
+
+
+service_cache = create_backend(CACHE_BACKEND)
+
+# Public profile fields (UserRead) by user id
+user_cache = CacheNamespace(service_cache, "users", ttl=USER_CACHE_TTL_SECONDS)
+# Rendered GET /threads pages by query
+thread_page_cache = CacheNamespace(
+    service_cache, "thread_pages", ttl=THREAD_PAGE_CACHE_TTL_SECONDS)
@@ -0,0 +1,220 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import stat
+import struct
+import time
+from contextlib import contextmanager
+from typing import Any, Hashable, Iterable, Optional
+
+MAGIC = b"LSCACHE1"
+# magic, slot count, slot size, then the hit, miss and eviction counters
+HEADER = struct.Struct("<8sIIQQQ")
+COUNTERS = struct.Struct("<QQQ")
+COUNTERS_OFFSET = 16
+# key digest, expires at, last used, value length
+SLOT = struct.Struct("<16sddI")
+LAST_USED = struct.Struct("<d")
+LAST_USED_OFFSET = 24
+EMPTY = bytes(16)
+# Slots a key can be stored in; when all are taken the least recently
+# used one is evicted
+WAYS = 8
+
+
+def key_digest(key: Hashable) -> bytes:
+    # repr is stable across processes for the str, int and tuple keys
+    # used here, unlike hash()
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+
+class SharedCache:
+    """
+    LRU cache in a memory-mapped file, shared by all processes of a host
+    that open the same path. The file is split into fixed-size slots and
+    values are pickled into them, so a value that does not fit a slot is
+    not cached. Every access holds an flock on the file.
+
+    All processes must use the same `slots` and `slot_size`; a file laid
+    out differently is emptied and reformatted. Values are unpickled, so
+    only a regular file owned by the current user and not accessible to
+    others is used.
+    """
+
+    def __init__(self, path: str, slots: int, slot_size: int, ttl: float):
+        if slot_size <= SLOT.size:
+            raise ValueError(f"slot_size must be over {SLOT.size} bytes")
+        self.path = path
+        self.slots = max(WAYS, slots - slots % WAYS)
+        self.slot_size = slot_size
+        self.ttl = ttl
+        self.size = HEADER.size + self.slots * slot_size
+        self.oversized = 0
+        self._pid = None
+        self._open()
+
+    def _open(self) -> None:
+        self._fd = os.open(
+            self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        info = os.fstat(self._fd)
+        if (not stat.S_ISREG(info.st_mode) or info.st_uid != os.geteuid()
+                or info.st_mode & 0o077):
+            os.close(self._fd)
+            raise PermissionError(
+                f"{self.path} must be a regular file owned by this user "
+                f"with mode 0600")
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self._fd, HEADER.size, 0)
+            if (len(header) < HEADER.size
+                    or HEADER.unpack(header)[:3]
+                    != (MAGIC, self.slots, self.slot_size)
+                    or os.fstat(self._fd).st_size != self.size):
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, self.size)
+                os.pwrite(self._fd, HEADER.pack(
+                    MAGIC, self.slots, self.slot_size, 0, 0, 0), 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, self.size)
+        self._pid = os.getpid()
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+    @contextmanager
+    def _locked(self):
+        # A forked child shares the parent's open file, and with it the
+        # flock, so it opens its own in place of the inherited one
+        if self._pid != os.getpid():
+            self.close()
+            self._open()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, index: int) -> int:
+        return HEADER.size + index * self.slot_size
+
+    def _bucket(self, digest: bytes) -> range:
+        start = int.from_bytes(digest[:8], "little") % (self.slots // WAYS) * WAYS
+        return range(start, start + WAYS)
+
+    def _find(self, digest: bytes) -> Optional[int]:
+        for index in self._bucket(digest):
+            offset = self._offset(index)
+            if self._map[offset:offset + 16] == digest:
+                return index
+        return None
+
+    def _count(self, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+        counters = COUNTERS.unpack_from(self._map, COUNTERS_OFFSET)
+        COUNTERS.pack_into(
+            self._map, COUNTERS_OFFSET,
+            counters[0] + hits, counters[1] + misses, counters[2] + evictions)
+
+    # ---------- Cache interface ----------
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict[Hashable, Any]:
+        """The entries found, by key, read under a single lock."""
+        now = time.time()
+        found = {}
+        misses = 0
+        with self._locked():
+            for key in keys:
+                index = self._find(key_digest(key))
+                if index is None:
+                    misses += 1
+                    continue
+                offset = self._offset(index)
+                _, expires_at, _, length = SLOT.unpack_from(self._map, offset)
+                if expires_at <= now:
+                    self._map[offset:offset + 16] = EMPTY
+                    misses += 1
+                    continue
+                LAST_USED.pack_into(self._map, offset + LAST_USED_OFFSET, now)
+                start = offset + SLOT.size
+                found[key] = self._map[start:start + length]
+            self._count(hits=len(found), misses=misses)
+        return {key: pickle.loads(data) for key, data in found.items()}
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        expires_at: Optional[float] = None
+    ) -> None:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.slot_size - SLOT.size:
+            self.oversized += 1
+            # An older value that fitted must not be served instead
+            self.delete(key)
+            return
+
+        now = time.time()
+        deadline = now + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        digest = key_digest(key)
+        with self._locked():
+            index = self._find(digest)
+            if index is None:
+                index = self._free_slot(digest, now)
+            offset = self._offset(index)
+            SLOT.pack_into(self._map, offset, digest, deadline, now, len(data))
+            start = offset + SLOT.size
+            self._map[start:start + len(data)] = data
+
+    def _free_slot(self, digest: bytes, now: float) -> int:
+        oldest, oldest_used = None, None
+        for index in self._bucket(digest):
+            offset = self._offset(index)
+            slot_digest, expires_at, last_used, _ = SLOT.unpack_from(
+                self._map, offset)
+            if slot_digest == EMPTY or expires_at <= now:
+                return index
+            if oldest is None or last_used < oldest_used:
+                oldest, oldest_used = index, last_used
+        self._count(evictions=1)
+        return oldest
+
+    def delete(self, key: Hashable) -> None:
+        with self._locked():
+            index = self._find(key_digest(key))
+            if index is not None:
+                offset = self._offset(index)
+                self._map[offset:offset + 16] = EMPTY
+
+    def clear(self) -> None:
+        with self._locked():
+            for index in range(self.slots):
+                offset = self._offset(index)
+                self._map[offset:offset + 16] = EMPTY
+
+    def stats(self) -> dict:
+        """Hits, misses and evictions are totals of all processes."""
+        now = time.time()
+        with self._locked():
+            size = 0
+            for index in range(self.slots):
+                slot_digest, expires_at, _, _ = SLOT.unpack_from(
+                    self._map, self._offset(index))
+                if slot_digest != EMPTY and expires_at > now:
+                    size += 1
+            hits, misses, evictions = COUNTERS.unpack_from(
+                self._map, COUNTERS_OFFSET)
+        return {
+            "size": size,
+            "slots": self.slots,
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "oversized": self.oversized,
+        }
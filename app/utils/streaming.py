@@ -0,0 +1,74 @@
+from typing import AsyncIterable, AsyncIterator, Optional, Sequence
+
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from sqlmodel import SQLModel
+
+from app.utils.serialization import rows_to_dicts
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+
+# Rows fetched per server-side cursor round trip and written per chunk
+STREAM_BATCH_SIZE = 500
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Splits a streamed body into lines without reading all of it."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+def get_stream_media_type(request: Request, stream: bool) -> Optional[str]:
+    if NDJSON_MEDIA_TYPE in request.headers.get("Accept", ""):
+        return NDJSON_MEDIA_TYPE
+    if stream:
+        return JSON_MEDIA_TYPE
+    return None
+
+
+def _dump_batch(batch: Sequence[SQLModel]) -> list[bytes]:
+    return [orjson.dumps(row) for row in rows_to_dicts(batch, type(batch[0]))]
+
+
+async def _ndjson_chunks(
+    batches: AsyncIterable[Sequence[SQLModel]]
+) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        if batch:
+            yield b"".join(row + b"\n" for row in _dump_batch(batch))
+
+
+async def _json_array_chunks(
+    batches: AsyncIterable[Sequence[SQLModel]]
+) -> AsyncIterator[bytes]:
+    yield b"["
+    separator = b""
+    async for batch in batches:
+        if not batch:
+            continue
+        yield separator + b",".join(_dump_batch(batch))
+        separator = b","
+    yield b"]"
+
+
+def stream_rows(
+    batches: AsyncIterable[Sequence[SQLModel]],
+    media_type: str
+) -> StreamingResponse:
+    """
+    Writes rows straight from the table models, one chunk per batch,
+    without building the full list or validating it again.
+    """
+    if media_type == NDJSON_MEDIA_TYPE:
+        chunks = _ndjson_chunks(batches)
+    else:
+        chunks = _json_array_chunks(batches)
+    return StreamingResponse(chunks, media_type=media_type)
@@ -1,16 +1,59 @@
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from app.services.user_service import UserService
 from app.models.user import User
+from app.core.config import ADMIN_USER_IDS
 from app.db.database import get_session
-from sqlmodel import Session
+from app.utils.auth import auth_session_cache, snapshot_user
+from app.utils.loaders import UserLoader
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_current_user(
+async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ) -> User:
+    # AuthMiddleware has already verified the token, and may have found
+    # the user in the session cache
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
 
-    return UserService(session).get_current_user(token)
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is None:
+        return await UserService(session).get_current_user(token)
+
+    user = await UserService(session).get_by_id(user_id)
+    auth_session_cache.set(
+        (user_id, request.state.session_id),
+        snapshot_user(user),
+        expires_at=request.state.token_expires_at
+    )
+    request.state.user = user
+    return user
+
+
+async def get_admin_user(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    if current_user.id not in ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+async def get_user_loader(
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+) -> UserLoader:
+    # One loader, and so one cache, per request
+    loader = getattr(request.state, "user_loader", None)
+    if loader is None:
+        loader = UserLoader(session)
+        request.state.user_loader = loader
+    return loader
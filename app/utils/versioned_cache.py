@@ -0,0 +1,70 @@
+import time
+from typing import Any, Hashable, Optional
+
+from app.core.config import (
+    CATEGORY_CACHE_CHECK_SECONDS,
+    CATEGORY_CACHE_TTL_SECONDS
+)
+from app.utils.cache import CacheNamespace
+from app.utils.service_cache import service_cache
+
+
+class VersionedCache:
+    """
+    Cache for one table, emptied whenever the version kept in
+    cache_versions moves. Each worker compares versions at most every
+    `check_interval` seconds, and drops the entries right after a local
+    write. The last version seen is kept next to the entries, so workers
+    sharing the backend empty it once per change.
+    """
+
+    def __init__(self, namespace: CacheNamespace, check_interval: float):
+        self.name = namespace.name
+        self.namespace = namespace
+        self.check_interval = check_interval
+        self.version: Optional[int] = None
+        self._checked_at = float("-inf")
+        self.version_checks = 0
+        self.invalidations = 0
+
+    def needs_check(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.check_interval
+
+    def sync(self, version: int) -> None:
+        self._checked_at = time.monotonic()
+        self.version_checks += 1
+        marker = ("table_version", self.name)
+        if self.namespace.backend.get(marker) != version:
+            self.namespace.invalidate()
+            self.namespace.backend.set(marker, version)
+        if version != self.version:
+            if self.version is not None:
+                self.invalidations += 1
+            self.version = version
+
+    def invalidate(self) -> None:
+        # The next read re-checks the version, which also catches entries
+        # stored by requests that loaded rows before the write committed
+        self.namespace.invalidate()
+        self._checked_at = float("-inf")
+        self.invalidations += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.namespace.get(key)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.namespace.set(key, value)
+
+    def stats(self) -> dict:
+        return {
+            **self.namespace.stats(),
+            "version": self.version,
+            "version_checks": self.version_checks,
+            "invalidations": self.invalidations,
+        }
+
+
+category_cache = VersionedCache(
+    CacheNamespace(service_cache, "categories", ttl=CATEGORY_CACHE_TTL_SECONDS),
+    check_interval=CATEGORY_CACHE_CHECK_SECONDS
+)
@@ -0,0 +1,177 @@
+"""
+Latency of the auth + timing middleware stack under concurrent load,
+with every request validating its session against the database.
+
+Compares the previous BaseHTTPMiddleware implementations, looking the
+session up with a blocking synchronous Session, against the pure ASGI
+ones on the AsyncSession, on a trivial endpoint. Both use the same
+SQLite file, and the session cache is disabled so no request skips the
+lookup. A local SQLite file answers far faster than a database server,
+so `latency` seconds (0 by default) can be added to each lookup as a
+network round trip: slept through by the legacy stack, awaited by the
+ASGI one.
+
+    python -m benchmarks.bench_middleware [requests] [concurrency] [latency]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DATABASE_PATH = os.path.join(
+    tempfile.gettempdir(), f"loopsociety-bench-{os.getpid()}.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ["AUTH_VERIFY_MODE"] = "session"
+os.environ["AUTH_CACHE_TTL_SECONDS"] = "0"
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlmodel import Session, SQLModel, create_engine, select
+from starlette.middleware.base import BaseHTTPMiddleware
+
+import app.models  # noqa: F401
+from app.middlewares.auth_middleware import AuthMiddleware
+from app.middlewares.db_session import DBSessionMiddleware
+from app.middlewares.process_header import ProcessHeader
+from app.models.user import User
+from app.models.user_session import UserSession
+from app.utils.auth import create_token
+
+sync_engine = create_engine(os.environ["DATABASE_URL"])
+LATENCY = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+
+class LegacyProcessHeader(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.perf_counter()
+        response = await call_next(request)
+        process_time = time.perf_counter() - start_time
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    # The lookup as it was reported: synchronous calls on the event loop
+    async def dispatch(self, request: Request, call_next):
+        middleware = AuthMiddleware(None)
+        user_id, session_id, _ = middleware.decode_token(
+            middleware.extract_token(request))
+        with Session(sync_engine) as session:
+            time.sleep(LATENCY)
+            active = session.exec(select(UserSession.id).where(
+                UserSession.id == session_id,
+                UserSession.user_id == user_id,
+                UserSession.is_active == True
+            )).first()
+            user = session.exec(
+                select(User).where(User.id == user_id)).first()
+        if active is None or user is None:
+            return JSONResponse(status_code=401, content={})
+        request.state.user = user
+        return await call_next(request)
+
+
+class SlowAuthMiddleware(AuthMiddleware):
+    async def is_valid_session(self, session, user_id, session_id):
+        await asyncio.sleep(LATENCY)
+        return await super().is_valid_session(session, user_id, session_id)
+
+
+def build_app(process_header, auth, db_session=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(process_header)
+    app.add_middleware(auth)
+    if db_session is not None:
+        app.add_middleware(db_session)
+    return app
+
+
+def create_database() -> str:
+    SQLModel.metadata.create_all(sync_engine)
+    with Session(sync_engine) as session:
+        session.add(User(username="bench", email="bench@example.com",
+                         password_hash="x"))
+        session.add(UserSession(
+            user_id=1, refresh_token_digest=bytes(32),
+            expires_at=datetime.utcnow() + timedelta(days=1)))
+        session.commit()
+    token, _ = create_token(
+        {"sub": "1", "sid": 1, "type": "access"}, timedelta(minutes=15))
+    return token
+
+
+async def run(
+    app: FastAPI,
+    token: str,
+    total: int,
+    concurrency: int
+) -> tuple[list, float]:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/ping", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return latencies, elapsed
+
+
+def report(name: str, result: tuple[list, float]) -> None:
+    latencies, elapsed = result
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    rps = len(latencies) / elapsed
+    print(f"{name:<20} p50={p50:7.2f} ms  p99={p99:7.2f} ms  {rps:8.0f} req/s")
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    from app.db.database import engine
+    token = create_database()
+    legacy = build_app(LegacyProcessHeader, LegacyAuthMiddleware)
+    asgi = build_app(ProcessHeader, SlowAuthMiddleware, DBSessionMiddleware)
+
+    try:
+        print(f"{total} requests, concurrency {concurrency}, "
+              f"{LATENCY * 1000:g} ms per lookup")
+        report("BaseHTTPMiddleware",
+               asyncio.run(run(legacy, token, total, concurrency)))
+
+        async def run_asgi():
+            try:
+                return await run(asgi, token, total, concurrency)
+            finally:
+                await engine.dispose()
+
+        report("pure ASGI", asyncio.run(run_asgi()))
+    finally:
+        sync_engine.dispose()
+        os.remove(DATABASE_PATH)
+
+
+if __name__ == "__main__":
+    main()
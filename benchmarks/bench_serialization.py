@@ -0,0 +1,94 @@
+"""
+Time to turn a page of 1,000 posts into a response.
+
+Compares FastAPI's response_model path (validate every row into a new
+model, then dump it with pydantic-core) with returning FastJSONResponse
+built from the loaded rows, both through a real endpoint.
+
+    python -m benchmarks.bench_serialization [rows] [requests]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx
+from fastapi import FastAPI
+
+from app.models.post import Post
+from app.utils.serialization import FastJSONResponse, rows_to_dicts
+
+
+def make_posts(count: int) -> list[Post]:
+    now = datetime.utcnow()
+    return [
+        Post(
+            id=i,
+            user_id=i % 50,
+            thread_id=i % 20,
+            content=f"Post number {i} " * 10,
+            upvote_count=i % 7,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(minutes=i),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def build_app(posts: list[Post]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/response-model", response_model=List[Post])
+    async def response_model():
+        return posts
+
+    @app.get("/fast", response_model=List[Post])
+    async def fast():
+        return FastJSONResponse(rows_to_dicts(posts, Post))
+
+    return app
+
+
+async def run(app: FastAPI, path: str, total: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    timings = []
+    async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench") as client:
+        # Warm up
+        await client.get(path)
+        for _ in range(total):
+            start = time.perf_counter()
+            response = await client.get(path)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200
+    return timings
+
+
+def report(name: str, timings: list[float]) -> float:
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1000
+    p99 = timings[int(len(timings) * 0.99) - 1] * 1000
+    print(f"{name:<18} p50={p50:7.2f} ms  p99={p99:7.2f} ms")
+    return p50
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    app = build_app(make_posts(rows))
+    print(f"{rows} posts, {total} requests each")
+    before = report("response_model",
+                    asyncio.run(run(app, "/response-model", total)))
+    after = report("FastJSONResponse", asyncio.run(run(app, "/fast", total)))
+    print(f"{before / after:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()